@@ -5,13 +5,35 @@ Created on Thu Jun 26 15:14:42 2025
 @author: jahop
 """
 
-import streamlit as st
-import pandas as pd
-import plotly.express as px
 import numpy as np
+import streamlit as st
 from datetime import datetime
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from functools import partial
+from price_engine import SEMILLA_DEFAULT
+from market_data import STORE_DIR
+from live_feed import FUENTE_EN_VIVO, INTERVALO_REFRESCO
+from downsampling import downsample_indices, MAX_PUNTOS_GRAFICA
+from rollups import RESOLUCIONES
+from figures import (VELAS, FigureCache, price_figure, buyback_figure, buyback_heatmap, sector_radar_figure,
+                     correlation_heatmap, rolling_metric_figure, revenue_waterfall_figure)
+from cross_section import SECTORES
+from disk_cache import shared_cache
+from financials import ANIOS_HISTORIA, CONSOLIDADO, MAX_BARRAS_CASCADA, SEGMENTOS, financial_summary
+from table_view import FILAS_POR_PAGINA, download_formats, export_table
+from monte_carlo import N_SIMULACIONES
+from buyback_scenarios import PORCENTAJE_MIN, PORCENTAJE_MAX, PASO_PORCENTAJE
+from reports import TIPOS_INFORME, render_report, report_context
+from startup import (ANCHO_LOGO, ANIOS_INICIALES, LOGO, SECTORES_INICIALES, asset_bytes, mark_first_rerun,
+                     stylesheet)
+from profiling import (REGISTRY, RERUN_TOTAL, RerunTimer, histogram_counts, start_profile,
+                       stop_profile)
+from metrics import beta_window, latest_change, price_returns
+from data_layer import (load_price_data, load_indicators, load_benchmark, load_market_benchmark,
+                        load_beta_series, load_market_beta_series, load_roic_series, get_live_feed,
+                        load_confidence_bands, load_sector_trends, load_financials, load_financial_table,
+                        get_market_store,
+                        load_sector_correlation, load_rollups, load_market_rollups,
+                        load_market_prices, load_market_indicators, load_buyback_scenarios)
 
 # Configuración de la página
 st.set_page_config(
@@ -21,69 +43,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-
-# Estilo de fondo
-page_bg_img = """
-<style>
-[data-testid="stAppViewContainer"]{
-background:
-radial-gradient(black 15%, transparent 16%) 0 0,
-radial-gradient(black 15%, transparent 16%) 8px 8px,
-radial-gradient(rgba(255,255,255,.1) 15%, transparent 20%) 0 1px,
-radial-gradient(rgba(255,255,255,.1) 15%, transparent 20%) 8px 9px;
-background-color:#282828;
-background-size:16px 16px;
-</style>
-"""
-
-st.markdown(page_bg_img, unsafe_allow_html=True)
-
+# Instrumentación del rerun (y captura de perfil si se solicitó en el rerun anterior)
+perfil_activo = start_profile() if st.session_state.pop("capturar_perfil", False) else None
+perf = RerunTimer()
+perf.section("Estilos y controles")
 
 
-
-# Estilos CSS personalizados
-st.markdown("""
-<style>
-    .header-style {
-        font-size: 26px;
-        font-weight: bold;
-        color: #2c3e50;
-        border-bottom: 2px solid #3498db;
-        padding-bottom: 5px;
-    }
-    .subheader-style {
-        font-size: 20px;
-        font-weight: bold;
-        color: #2980b9;
-        margin-top: 20px;
-    }
-    .metric-box {
-        background-color: #f8f9fa;
-        border-radius: 10px;
-        padding: 15px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        margin-bottom: 20px;
-    }
-    .stButton>button {
-        background-color: #3498db;
-        color: white;
-        border-radius: 5px;
-        padding: 8px 16px;
-        border: none;
-    }
-    .stButton>button:hover {
-        background-color: #2980b9;
-    }
-    .stDataFrame {
-        border-radius: 10px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }
-</style>
-""", unsafe_allow_html=True)
+# Estilo de fondo y estilos CSS personalizados (hoja leída una vez por proceso)
+st.markdown(stylesheet(), unsafe_allow_html=True)
 
 # Sidebar para filtros y controles
 with st.sidebar:
-    st.image("logo.png", width=150)
+    st.image(asset_bytes(LOGO, ANCHO_LOGO), width=ANCHO_LOGO)
     st.markdown("## Controles de Análisis")
     
     # Selector de período de análisis
@@ -92,16 +63,54 @@ with st.sidebar:
         ["Últimos 3 meses", "Últimos 6 meses", "Último año", "Personalizado"]
     )
     
+    # Fuente de datos: simulada o histórica (si hay emisoras en el almacén)
+    emisoras_disponibles = get_market_store(STORE_DIR).tickers
+    fuente_datos = "Simulada"
+    if emisoras_disponibles:
+        fuente_datos = st.radio("Fuente de Datos", ["Simulada", "Histórica"])
+        if fuente_datos == "Histórica":
+            emisora = st.selectbox("Emisora", emisoras_disponibles)
+
     # Selector de tipo de visualización
     chart_type = st.radio(
         "Tipo de Visualización",
-        ["Gráfico de Línea", "Gráfico de Barras", "Gráfico de Área"]
+        ["Gráfico de Línea", "Gráfico de Barras", "Gráfico de Área", "Gráfico de Velas"]
+    )
+    resolucion = st.selectbox(
+        "Resolución del desempeño",
+        ["Automática", *RESOLUCIONES.values()],
+        help="Automática agrega a barras semanales o mensuales cuando el período es largo"
     )
     
     st.markdown("---")
     st.markdown("**Configuración Avanzada**")
     show_annotations = st.checkbox("Mostrar anotaciones", value=True)
     show_confidence = st.checkbox("Mostrar bandas de confianza", value=False)
+    n_simulaciones = st.select_slider(
+        "Simulaciones Monte Carlo",
+        [1_000, 10_000, 100_000, 1_000_000],
+        value=N_SIMULACIONES,
+        format_func=lambda n: f"{n:,}",
+        disabled=not show_confidence
+    )
+    max_points = st.select_slider(
+        "Puntos máximos por gráfica",
+        [500, 1000, 2000, 5000, 10000],
+        value=MAX_PUNTOS_GRAFICA,
+        help="Las series más largas se reducen en el servidor conservando máximos y mínimos"
+    )
+    downsample_method = st.radio("Método de reducción", ["lttb", "minmax"], horizontal=True,
+                                 format_func=lambda m: "LTTB" if m == "lttb" else "Mín/Máx")
+    modo_en_vivo = st.checkbox("Modo en vivo", value=False,
+                               help=f"Cotizaciones desde la fuente '{FUENTE_EN_VIVO}'")
+    intervalo_refresco = st.select_slider(
+        "Refresco en vivo (s)",
+        [1.0, 2.0, 5.0, 10.0],
+        value=INTERVALO_REFRESCO,
+        disabled=not modo_en_vivo
+    )
+    show_performance = st.checkbox("Mostrar panel de rendimiento", value=False)
+    seed = st.number_input("Semilla de simulación", min_value=0, value=SEMILLA_DEFAULT, step=1)
     
     st.markdown("---")
     st.markdown("""
@@ -111,6 +120,8 @@ with st.sidebar:
     Versión 1.0
     """)
 
+perf.section("Datos")
+
 # Título principal con estilo ejecutivo
 st.markdown("""
 <div style="background-color:#3498db;padding:20px;border-radius:10px;margin-bottom:30px">
@@ -129,68 +140,153 @@ elif analysis_period == "Último año":
 else:
     periods = st.slider("Seleccione número de días", 30, 730, 120)
 
-price_data = pd.DataFrame({
-    'Fecha': pd.date_range(end=datetime.today(), periods=periods, freq='D'),
-    'Precio Acción ($MXN)': pd.Series(
-        90 + (pd.Series(range(periods)).apply(lambda x: 5 * (x/periods)**0.5) + 
-              pd.Series(np.random.normal(0, 2, periods)).values
-    ))
-})
-
-# Calcular métricas dinámicas
-rendimiento_promedio = price_data['Precio Acción ($MXN)'].pct_change().mean() * 100
-volatilidad = price_data['Precio Acción ($MXN)'].pct_change().std() * 100
-roic_simulado = np.random.uniform(12, 18)  # Simulamos un ROIC entre 12% y 18%
-beta_simulado = np.random.uniform(0.8, 1.5)  # Simulamos un Beta entre 0.8 y 1.5
+seed = int(seed)
+if fuente_datos == "Histórica":
+    price_data = load_market_prices(STORE_DIR, emisora, periods)
+    if len(price_data) < 2:
+        st.error(f"No hay suficientes datos históricos de {emisora} para el período seleccionado.")
+        # ``st.stop`` termina el rerun aquí: la captura de perfil se cierra antes
+        if perfil_activo is not None:
+            st.session_state["perfil_texto"] = stop_profile(perfil_activo)
+        st.stop()
+    indicadores = load_market_indicators(STORE_DIR, emisora, periods)
+    barras_ohlc = load_market_rollups(STORE_DIR, emisora, periods)
+    indice = load_market_benchmark(STORE_DIR, emisora, periods, seed)
+    beta_movil = load_market_beta_series(STORE_DIR, emisora, periods, seed)
+else:
+    fecha_fin = datetime.today().date()
+    price_data = load_price_data(periods, seed, end=fecha_fin)
+    indicadores = load_indicators(periods, seed, end=fecha_fin)
+    barras_ohlc = load_rollups(periods, seed, end=fecha_fin)
+    indice = load_benchmark(periods, seed, end=fecha_fin)
+    beta_movil = load_beta_series(periods, seed, end=fecha_fin)
+roic_movil = load_roic_series(seed)
 
-# Tendencia (comparación con período anterior)
-tendencia_rendimiento = "↑" if rendimiento_promedio > 10 else "↓"
-tendencia_volatilidad = "↓" if volatilidad < 10 else "↑"
-tendencia_roic = "↑" if roic_simulado > 15 else "↓"
-tendencia_beta = "↓" if beta_simulado < 1.2 else "↑"
+perf.section("Métricas")
 
-# Sección de métricas clave dinámicas
-st.markdown("## 📊 Métricas Clave")
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.markdown(f"""
+# Calcular métricas dinámicas
+rendimiento_promedio = indicadores.mean_return_pct
+volatilidad = indicadores.volatility_pct
+rendimientos_indice = price_returns(indice)
+rendimiento_indice = rendimientos_indice.mean() * 100
+volatilidad_indice = rendimientos_indice.std(ddof=1) * 100
+# ROIC del último trimestre vs el anterior; beta actual vs hace (hasta) 30 días
+roic_actual, cambio_roic = latest_change(roic_movil, lag=1)
+dias_beta = max(1, min(30, int(np.count_nonzero(~np.isnan(beta_movil))) - 1))
+beta_actual, cambio_beta = latest_change(beta_movil, lag=dias_beta)
+
+# Tendencia (comparación con el índice y con el período anterior)
+tendencia_rendimiento = "↑" if rendimiento_promedio > rendimiento_indice else "↓"
+tendencia_volatilidad = "↓" if volatilidad < volatilidad_indice else "↑"
+tendencia_roic = "↑" if cambio_roic > 0 else "↓"
+tendencia_beta = "↓" if cambio_beta < 0 else "↑"
+
+# Modo en vivo: las tarjetas de rendimiento y volatilidad, fig1 y fig2 se dibujan
+# en fragmentos que se vuelven a ejecutar cada ``intervalo_refresco`` segundos
+# leyendo el buffer circular del consumidor; el resto del tablero no se vuelve a
+# ejecutar. Las figuras se sirven del caché de la sesión mientras no lleguen
+# ticks nuevos.
+feed = get_live_feed(FUENTE_EN_VIVO) if modo_en_vivo else None
+if modo_en_vivo and "cache_en_vivo" not in st.session_state:
+    st.session_state.cache_en_vivo = FigureCache(maxsize=8)
+
+
+def snapshot_en_vivo(feed, avisar=True):
+    """Instantánea del buffer en vivo, o ``None`` mientras no haya dos cotizaciones."""
+    if avisar and feed.error is not None:
+        st.error(f"La fuente de cotizaciones se detuvo: {feed.error}")
+    snapshot = feed.ring.snapshot()
+    if snapshot.prices.size < 2:
+        if avisar:
+            st.info("Esperando cotizaciones...")
+        return None
+    return snapshot
+
+
+def tarjeta(titulo, valor, detalle, color, nota=None):
+    """HTML de una tarjeta de métrica clave."""
+    pie = "" if nota is None else f"""
+        <p style="text-align:center;color:#7f8c8d;font-size:12px;">
+        {nota}</p>"""
+    return f"""
     <div class="metric-box">
-        <h3 style="color:#3498db;margin-top:0;">Rendimiento</h3>
-        <h1 style="text-align:center;color:#2c3e50;">{rendimiento_promedio:.2f}%</h1>
-        <p style="text-align:center;color:{'#27ae60' if tendencia_rendimiento == '↑' else '#e74c3c'}">
-        {tendencia_rendimiento} {abs(rendimiento_promedio - 10):.2f}% vs benchmark</p>
+        <h3 style="color:#3498db;margin-top:0;">{titulo}</h3>
+        <h1 style="text-align:center;color:#2c3e50;">{valor}</h1>
+        <p style="text-align:center;color:{color}">
+        {detalle}</p>{pie}
     </div>
-    """, unsafe_allow_html=True)
+    """
 
-with col2:
-    st.markdown(f"""
-    <div class="metric-box">
-        <h3 style="color:#3498db;margin-top:0;">Volatilidad</h3>
-        <h1 style="text-align:center;color:#2c3e50;">{volatilidad:.2f}%</h1>
-        <p style="text-align:center;color:{'#27ae60' if tendencia_volatilidad == '↓' else '#e74c3c'}">
-        {tendencia_volatilidad} {abs(volatilidad - 10):.2f}% vs benchmark</p>
-    </div>
-    """, unsafe_allow_html=True)
 
-with col3:
-    st.markdown(f"""
-    <div class="metric-box">
-        <h3 style="color:#3498db;margin-top:0;">ROIC</h3>
-        <h1 style="text-align:center;color:#2c3e50;">{roic_simulado:.2f}%</h1>
-        <p style="text-align:center;color:{'#27ae60' if tendencia_roic == '↑' else '#e74c3c'}">
-        {tendencia_roic} {abs(roic_simulado - 15):.2f}% vs período anterior</p>
-    </div>
-    """, unsafe_allow_html=True)
+perf.section("Tarjetas")
 
-with col4:
-    st.markdown(f"""
-    <div class="metric-box">
-        <h3 style="color:#3498db;margin-top:0;">Beta</h3>
-        <h1 style="text-align:center;color:#2c3e50;">{beta_simulado:.2f}</h1>
-        <p style="text-align:center;color:{'#27ae60' if tendencia_beta == '↓' else '#e74c3c'}">
-        {tendencia_beta} {abs(beta_simulado - 1.2):.2f} vs período anterior</p>
-    </div>
-    """, unsafe_allow_html=True)
+# Sección de métricas clave dinámicas
+st.markdown("## 📊 Métricas Clave")
+tarjetas_periodo = [
+    tarjeta("Rendimiento", f"{rendimiento_promedio:.2f}%",
+            f"{tendencia_rendimiento} {abs(rendimiento_promedio - rendimiento_indice):.2f}% vs benchmark",
+            '#27ae60' if tendencia_rendimiento == '↑' else '#e74c3c'),
+    tarjeta("Volatilidad", f"{volatilidad:.2f}%",
+            f"{tendencia_volatilidad} {abs(volatilidad - volatilidad_indice):.2f}% vs benchmark",
+            '#27ae60' if tendencia_volatilidad == '↓' else '#e74c3c'),
+]
+# ROIC (trimestral) y beta (diaria contra el índice) no cambian con los ticks
+tarjetas_fijas = [
+    tarjeta("ROIC", f"{roic_actual:.2f}%", f"{tendencia_roic} {abs(cambio_roic):.2f}% vs trimestre anterior",
+            '#27ae60' if tendencia_roic == '↑' else '#e74c3c',
+            nota=f"Rango {len(roic_movil)} trim.: {roic_movil.min():.2f}% - {roic_movil.max():.2f}%"),
+    tarjeta("Beta", f"{beta_actual:.2f}", f"{tendencia_beta} {abs(cambio_beta):.2f} vs hace {dias_beta} días",
+            '#27ae60' if tendencia_beta == '↓' else '#e74c3c',
+            nota=f"Ventana móvil: {beta_window(len(beta_movil))} días"),
+]
+
+
+def mostrar_tarjetas(tarjetas):
+    for columna, html in zip(st.columns(len(tarjetas)), tarjetas):
+        with columna:
+            st.markdown(html, unsafe_allow_html=True)
+
+
+@st.fragment(run_every=intervalo_refresco)
+def tarjetas_en_vivo(feed):
+    """Rendimiento y volatilidad de la sesión en vivo; las del período hasta recibir ticks."""
+    perf_fragmento = RerunTimer(total_label="Fragmento En Vivo")
+    perf_fragmento.section("En vivo tarjetas")
+    snapshot = snapshot_en_vivo(feed, avisar=False)
+    if snapshot is None:
+        mostrar_tarjetas(tarjetas_periodo + tarjetas_fijas)
+        perf_fragmento.finish()
+        return
+    ring = feed.ring
+    variacion = ring.change_pct
+    mostrar_tarjetas([
+        tarjeta("Rendimiento", f"{variacion:+.2f}%",
+                f"{'↑' if variacion >= 0 else '↓'} vs apertura {ring.first_price:,.2f}",
+                '#27ae60' if variacion >= 0 else '#e74c3c',
+                nota=f"En vivo: ${ring.last_price:,.2f} | {ring.version:,} ticks"),
+        tarjeta("Volatilidad", f"{ring.volatility_pct:.4f}%", "Por tick en la sesión en vivo", '#7f8c8d',
+                nota=f"Máx. {ring.max_price:,.2f} / Mín. {ring.min_price:,.2f}"),
+    ] + tarjetas_fijas)
+    perf_fragmento.finish()
+
+
+if modo_en_vivo:
+    tarjetas_en_vivo(feed)
+else:
+    mostrar_tarjetas(tarjetas_periodo + tarjetas_fijas)
+
+with st.expander("📉 Evolución de ROIC y Beta"):
+    col_roic, col_beta = st.columns(2)
+    with col_roic:
+        st.plotly_chart(rolling_metric_figure(roic_movil.index.astype(str).to_numpy(), roic_movil.to_numpy(),
+                                              "ROIC Móvil (4 trimestres)", "ROIC (%)"),
+                        use_container_width=True)
+    with col_beta:
+        fechas_beta = price_data['Fecha'].to_numpy()
+        idx_beta = downsample_indices(fechas_beta, beta_movil, max_points=max_points, method=downsample_method)
+        st.plotly_chart(rolling_metric_figure(fechas_beta[idx_beta], beta_movil[idx_beta],
+                                              "Beta Móvil vs Índice", "Beta", reference=1.0),
+                        use_container_width=True)
 
 # Sección de perfil profesional
 st.markdown("## 👤 Perfil Profesional")
@@ -209,301 +305,290 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+perf.section("fig1 Desempeño")
+
 # Sección de análisis bursátil con datos dinámicos
 st.markdown("## 💹 Análisis del Desempeño Bursátil de la Emisora")
 
-# Gráfico interactivo con selección de tipo
-if chart_type == "Gráfico de Línea":
-    fig1 = px.line(price_data, x='Fecha', y='Precio Acción ($MXN)', 
-                  title=f'Desempeño de la Acción - {analysis_period}',
-                  labels={'Precio Acción ($MXN)': 'Precio ($MXN)'})
-elif chart_type == "Gráfico de Barras":
-    fig1 = px.bar(price_data, x='Fecha', y='Precio Acción ($MXN)', 
-                 title=f'Desempeño de la Acción - {analysis_period}',
-                 labels={'Precio Acción ($MXN)': 'Precio ($MXN)'})
-else:
-    fig1 = px.area(price_data, x='Fecha', y='Precio Acción ($MXN)', 
-                  title=f'Desempeño de la Acción - {analysis_period}',
-                  labels={'Precio Acción ($MXN)': 'Precio ($MXN)'})
-
-# Añadir anotaciones si está seleccionado
-if show_annotations:
-    max_price = price_data['Precio Acción ($MXN)'].max()
-    min_price = price_data['Precio Acción ($MXN)'].min()
-    max_date = price_data.loc[price_data['Precio Acción ($MXN)'].idxmax(), 'Fecha']
-    min_date = price_data.loc[price_data['Precio Acción ($MXN)'].idxmin(), 'Fecha']
-    
-    fig1.add_annotation(x=max_date, y=max_price,
-                       text=f"Máximo: {max_price:.2f}",
-                       showarrow=True,
-                       arrowhead=1)
-    fig1.add_annotation(x=min_date, y=min_price,
-                       text=f"Mínimo: {min_price:.2f}",
-                       showarrow=True,
-                       arrowhead=1)
-
-# Añadir bandas de confianza si está seleccionado
-if show_confidence:
-    price_data['MA_20'] = price_data['Precio Acción ($MXN)'].rolling(window=20).mean()
-    price_data['Upper'] = price_data['MA_20'] + price_data['Precio Acción ($MXN)'].rolling(window=20).std()
-    price_data['Lower'] = price_data['MA_20'] - price_data['Precio Acción ($MXN)'].rolling(window=20).std()
-    
-    fig1.add_trace(go.Scatter(
-        x=price_data['Fecha'],
-        y=price_data['Upper'],
-        line=dict(color='rgba(0,0,0,0)'),
-        showlegend=False,
-        name='Banda Superior'
-    ))
-    
-    fig1.add_trace(go.Scatter(
-        x=price_data['Fecha'],
-        y=price_data['Lower'],
-        line=dict(color='rgba(0,0,0,0)'),
-        fill='tonexty',
-        fillcolor='rgba(52, 152, 219, 0.2)',
-        showlegend=False,
-        name='Banda Inferior'
-    ))
-
-fig1.update_layout(
-    hovermode="x unified",
-    xaxis_title="Fecha",
-    yaxis_title="Precio ($MXN)",
-    height=500
-)
-st.plotly_chart(fig1, use_container_width=True)
-
-# Sección: Evaluación fondo de recompra con análisis interactivo
-st.markdown("## 🔄 Evaluación del Fondo de Recompra")
-
-# Slider para simular diferentes escenarios de recompra
-buyback_percentage = st.slider(
-    "Porcentaje de acciones para recompra simulada",
-    0.0, 10.0, 5.0, 0.5,
-    help="Simula el impacto en el precio según diferentes porcentajes de recompra"
-)
-
-price_data['Recompra Impacto (%)'] = (price_data['Precio Acción ($MXN)'].pct_change().rolling(window=5).mean() * 100 * 
-                                    (1 + buyback_percentage/10))
 
-fig2 = make_subplots(specs=[[{"secondary_y": True}]])
-
-# Añadir trazas según tipo de gráfico seleccionado
-if chart_type == "Gráfico de Línea":
-    fig2.add_trace(
-        go.Scatter(x=price_data['Fecha'], y=price_data['Precio Acción ($MXN)'], 
-                  name="Precio Acción", line=dict(color='#3498db')),
-        secondary_y=False,
-    )
-    fig2.add_trace(
-        go.Scatter(x=price_data['Fecha'], y=price_data['Recompra Impacto (%)'], 
-                  name="Impacto Recompra (%)", line=dict(color='#e74c3c')),
-        secondary_y=True,
-    )
-elif chart_type == "Gráfico de Barras":
-    fig2.add_trace(
-        go.Bar(x=price_data['Fecha'], y=price_data['Precio Acción ($MXN)'], 
-               name="Precio Acción", marker_color='#3498db'),
-        secondary_y=False,
-    )
-    fig2.add_trace(
-        go.Bar(x=price_data['Fecha'], y=price_data['Recompra Impacto (%)'], 
-               name="Impacto Recompra (%)", marker_color='#e74c3c'),
-        secondary_y=True,
-    )
+@st.fragment(run_every=intervalo_refresco)
+def desempeno_en_vivo(feed, chart_type, show_annotations, max_points, downsample_method):
+    """fig1 con las cotizaciones en vivo (sin barras OHLC ni bandas, que son diarias)."""
+    perf_fragmento = RerunTimer(total_label="Fragmento En Vivo")
+    perf_fragmento.section("En vivo fig1")
+    snapshot = snapshot_en_vivo(feed)
+    if snapshot is None:
+        perf_fragmento.finish()
+        return
+    idx_vivo = downsample_indices(snapshot.dates, snapshot.prices,
+                                  max_points=max_points, method=downsample_method)
+    fechas_vivo, precios_vivo = snapshot.dates[idx_vivo], snapshot.prices[idx_vivo]
+    anotaciones_vivo = []
+    if show_annotations:
+        i_max, i_min = int(np.argmax(precios_vivo)), int(np.argmin(precios_vivo))
+        anotaciones_vivo = [(fechas_vivo[i_max], float(precios_vivo[i_max]), f"Máximo: {precios_vivo[i_max]:.2f}"),
+                            (fechas_vivo[i_min], float(precios_vivo[i_min]), f"Mínimo: {precios_vivo[i_min]:.2f}")]
+    fig1_vivo = price_figure(fechas_vivo, precios_vivo, chart_type, "Desempeño de la Acción - En Vivo",
+                             annotations=anotaciones_vivo, cache=st.session_state.cache_en_vivo)
+    perf_fragmento.section("En vivo serialización")
+    st.plotly_chart(fig1_vivo, use_container_width=True)
+    perf_fragmento.finish()
+
+
+# Reducir puntos enviados al navegador (se conservan los extremos de las anotaciones)
+idx_precio = downsample_indices(price_data['Fecha'].to_numpy(), indicadores.prices,
+                                max_points=max_points, method=downsample_method)
+fechas = price_data['Fecha'].to_numpy()
+
+if modo_en_vivo:
+    desempeno_en_vivo(feed, chart_type, show_annotations, max_points, downsample_method)
 else:
-    fig2.add_trace(
-        go.Scatter(x=price_data['Fecha'], y=price_data['Precio Acción ($MXN)'], 
-                  name="Precio Acción", fill='tozeroy', line=dict(color='#3498db')),
-        secondary_y=False,
+    # La gráfica de desempeño usa barras OHLC precalculadas a la resolución del período
+    if resolucion == "Automática":
+        dias_periodo = (fechas[-1] - fechas[0]) / np.timedelta64(1, "D") + 1
+        barras = barras_ohlc.for_span(dias_periodo)
+    else:
+        barras = barras_ohlc.get({v: k for k, v in RESOLUCIONES.items()}[resolucion])
+    idx_barras = downsample_indices(barras.dates, barras.close, max_points=max_points, method=downsample_method)
+    fechas_grafica = barras.dates[idx_barras]
+
+    # Añadir anotaciones si está seleccionado; los extremos se toman de las barras
+    # graficadas (cierres, o máximos y mínimos de barra en velas) para que coincidan
+    # con la serie a cualquier resolución
+    anotaciones = []
+    if show_annotations:
+        if chart_type == VELAS:
+            serie_max, serie_min = barras.high[idx_barras], barras.low[idx_barras]
+        else:
+            serie_max = serie_min = barras.close[idx_barras]
+        i_max, i_min = int(np.argmax(serie_max)), int(np.argmin(serie_min))
+        max_price, min_price = float(serie_max[i_max]), float(serie_min[i_min])
+        anotaciones = [(fechas_grafica[i_max], max_price, f"Máximo: {max_price:.2f}"),
+                       (fechas_grafica[i_min], min_price, f"Mínimo: {min_price:.2f}")]
+
+    # Añadir bandas de confianza (percentiles 5-95 de Monte Carlo) si está seleccionado
+    bandas = None
+    if show_confidence:
+        bandas_mc = load_confidence_bands(indicadores.prices, seed, n_paths=n_simulaciones)
+        banda_inferior, banda_superior = bandas_mc.band(5, 95)
+        # Banda del último día de cada barra
+        dias_banda = barras.last_idx[idx_barras]
+        bandas = (fechas_grafica, banda_superior[dias_banda], banda_inferior[dias_banda])
+
+    # Gráfico interactivo con selección de tipo
+    fig1 = price_figure(fechas_grafica, barras.close[idx_barras], chart_type,
+                        f'Desempeño de la Acción - {analysis_period} ({RESOLUCIONES[barras.freq]})',
+                        annotations=anotaciones, bands=bandas,
+                        ohlc=(barras.open[idx_barras], barras.high[idx_barras],
+                              barras.low[idx_barras], barras.close[idx_barras]))
+    perf.section("fig1 serialización")
+    st.plotly_chart(fig1, use_container_width=True)
+
+# Las secciones siguientes se ejecutan como fragmentos: un widget dentro de un
+# fragmento solo vuelve a ejecutar ese fragmento. Los contenedores se crean
+# primero para conservar el orden de la página, ya que el fragmento de
+# recompra también escribe el informe ejecutivo al final.
+contenedor_recompra = st.container()
+contenedor_mercado = st.container()
+contenedor_financiero = st.container()
+contenedor_informe = st.container()
+
+
+def mostrar_informe(report_type, analysis_period, buyback_percentage, impacto_promedio,
+                    indicadores, tendencias):
+    """Informe ejecutivo del tipo seleccionado (plantillas compartidas con report_batch)."""
+    contexto = report_context(analysis_period, indicadores, tendencias, buyback_percentage,
+                              impacto_promedio)
+    st.markdown(render_report(report_type, contexto), unsafe_allow_html=True)
+
+
+@st.fragment(run_every=intervalo_refresco)
+def recompra_en_vivo(feed, buyback_percentage, chart_type, max_points, downsample_method):
+    """fig2 con las cotizaciones en vivo; el slider de recompra vuelve a llamarlo con su valor."""
+    perf_fragmento = RerunTimer(total_label="Fragmento En Vivo")
+    perf_fragmento.section("En vivo fig2")
+    snapshot = snapshot_en_vivo(feed, avisar=False)
+    if snapshot is None:
+        perf_fragmento.finish()
+        return
+    idx_vivo = downsample_indices(snapshot.dates, snapshot.prices,
+                                  max_points=max_points, method=downsample_method)
+    idx_impacto_vivo = downsample_indices(snapshot.dates, snapshot.impact_base,
+                                          max_points=max_points, method=downsample_method)
+    fig2_vivo = buyback_figure(snapshot.dates[idx_vivo], snapshot.prices[idx_vivo],
+                               snapshot.dates[idx_impacto_vivo], snapshot.impact_base[idx_impacto_vivo],
+                               buyback_percentage, chart_type, cache=st.session_state.cache_en_vivo)
+    perf_fragmento.section("En vivo serialización")
+    st.plotly_chart(fig2_vivo, use_container_width=True)
+    perf_fragmento.finish()
+
+
+@st.fragment
+def seccion_recompra(indicadores, fechas, idx_precio, chart_type, max_points, downsample_method,
+                     analysis_period, tendencias):
+    """Slider de recompra, fig2, mapa de escenarios e informe ejecutivo."""
+    perf_fragmento = RerunTimer(total_label="Fragmento Recompra")
+    perf_fragmento.section("fig2 Recompra")
+
+    # Sección: Evaluación fondo de recompra con análisis interactivo
+    st.markdown("## 🔄 Evaluación del Fondo de Recompra")
+
+    # Slider para simular diferentes escenarios de recompra
+    buyback_percentage = st.slider(
+        "Porcentaje de acciones para recompra simulada",
+        PORCENTAJE_MIN, PORCENTAJE_MAX, 5.0, PASO_PORCENTAJE,
+        key="porcentaje_recompra",
+        help="Simula el impacto en el precio según diferentes porcentajes de recompra"
     )
-    fig2.add_trace(
-        go.Scatter(x=price_data['Fecha'], y=price_data['Recompra Impacto (%)'], 
-                  name="Impacto Recompra (%)", fill='tozeroy', line=dict(color='#e74c3c')),
-        secondary_y=True,
-    )
-
-fig2.update_layout(
-    title=f"Impacto Estimado de Recompra ({buyback_percentage}% de acciones) en Precio",
-    xaxis_title="Fecha",
-    yaxis_title="Precio ($MXN)",
-    yaxis2_title="Impacto (%)",
-    hovermode="x unified",
-    height=500
-)
-st.plotly_chart(fig2, use_container_width=True)
-
-# Sección: Inteligencia de mercado con filtros interactivos
-st.markdown("## 📈 Análisis de Tendencias e Inteligencia de Mercado")
-
-# Selector de sectores para análisis comparativo
-selected_sectors = st.multiselect(
-    "Seleccione sectores para comparar",
-    ["Energía", "Químico", "Plásticos", "Empaque", "Textil", "Tecnología", "Salud", "Financiero"],
-    default=["Químico", "Plásticos", "Empaque"]
-)
-
-# Generar datos dinámicos basados en selección
-tendencias = pd.DataFrame({
-    "Sector": selected_sectors,
-    "Crecimiento Anual (%)": np.random.uniform(1.5, 6.0, len(selected_sectors)),
-    "Margen EBITDA (%)": np.random.uniform(12, 25, len(selected_sectors))
-})
-
-# Gráfico de radar para comparación multidimensional
-fig3 = go.Figure()
-
-for i, sector in enumerate(tendencias["Sector"]):
-    fig3.add_trace(go.Scatterpolar(
-        r=[tendencias.loc[i, "Crecimiento Anual (%)"], 
-           tendencias.loc[i, "Margen EBITDA (%)"]],
-        theta=["Crecimiento Anual", "Margen EBITDA"],
-        fill='toself',
-        name=sector
-    ))
-
-fig3.update_layout(
-    polar=dict(
-        radialaxis=dict(
-            visible=True,
-            range=[0, 30]
-        )),
-    showlegend=True,
-    title="Comparativa de Sectores - Múltiples Métricas",
-    height=500
-)
-
-st.plotly_chart(fig3, use_container_width=True)
-
-# Sección: Datos financieros con capacidad de descarga
-st.markdown("## 🧾 Datos Financieros Interactivos")
-
-# Generar datos trimestrales con variabilidad
-trimestres = ["Q1", "Q2", "Q3", "Q4"]
-base_ingresos = 1200
-base_costos = 800
-
-datos_fin = pd.DataFrame({
-    "Trimestre": trimestres * 2,
-    "Tipo": ["Ingresos"] * 4 + ["Costos"] * 4,
-    "Monto (M MXN)": [
-        base_ingresos * (1 + np.random.uniform(-0.05, 0.1)),
-        base_ingresos * (1 + np.random.uniform(-0.03, 0.12)),
-        base_ingresos * (1 + np.random.uniform(-0.07, 0.08)),
-        base_ingresos * (1 + np.random.uniform(-0.02, 0.15)),
-        base_costos * (1 + np.random.uniform(-0.03, 0.08)),
-        base_costos * (1 + np.random.uniform(-0.05, 0.1)),
-        base_costos * (1 + np.random.uniform(-0.07, 0.07)),
-        base_costos * (1 + np.random.uniform(-0.04, 0.09))
-    ]
-})
-
-# Mostrar datos con estilo
-styled_df = datos_fin.pivot(index="Trimestre", columns="Tipo", values="Monto (M MXN)")
-styled_df["Utilidad"] = styled_df["Ingresos"] - styled_df["Costos"]
-styled_df["Margen"] = (styled_df["Utilidad"] / styled_df["Ingresos"]) * 100
-
-st.dataframe(
-    styled_df.style
-    .format("{:.1f}")
-    .background_gradient(subset=["Margen"], cmap="RdYlGn")
-    .highlight_max(subset=["Utilidad"], color="#27ae60")
-    .highlight_min(subset=["Utilidad"], color="#e74c3c")
-)
 
-# Gráfico de cascada para flujo financiero
-fig4 = go.Figure(go.Waterfall(
-    name="Flujo Financiero",
-    orientation="v",
-    measure=["absolute", "relative", "relative", "relative", "total"],
-    x=trimestres + ["Total"],
-    y=[base_ingresos, 
-       styled_df.loc["Q2", "Ingresos"] - styled_df.loc["Q1", "Ingresos"],
-       styled_df.loc["Q3", "Ingresos"] - styled_df.loc["Q2", "Ingresos"],
-       styled_df.loc["Q4", "Ingresos"] - styled_df.loc["Q3", "Ingresos"],
-       0],
-    connector={"line":{"color":"rgb(63, 63, 63)"}},
-))
-
-fig4.update_layout(
-    title="Flujo de Ingresos Trimestral",
-    showlegend=False,
-    height=400
-)
-
-st.plotly_chart(fig4, use_container_width=True)
-
-# Sección: Informe ejecutivo generativo
-st.markdown("## 🧠 Informe Ejecutivo Automatizado")
-
-# Selector de tipo de informe
-report_type = st.radio(
-    "Tipo de Informe",
-    ["Resumen Ejecutivo", "Análisis Detallado", "Recomendaciones Estratégicas"],
-    horizontal=True
-)
-
-# Helper function para formato de porcentaje
-def format_percentage(value):
-    return f"{value:.2f}%"
+    # Todos los escenarios se precalculan; el slider solo selecciona una fila
+    impacto_base = indicadores.buyback_impact(0.0)
+    escenarios = load_buyback_scenarios(impacto_base)
+    impacto_promedio = escenarios.mean(buyback_percentage)
+
+    # El escalamiento por porcentaje no cambia los puntos seleccionados: se reduce la base una vez
+    idx_impacto = downsample_indices(fechas, impacto_base, max_points=max_points, method=downsample_method)
+
+    if modo_en_vivo:
+        recompra_en_vivo(feed, buyback_percentage, chart_type, max_points, downsample_method)
+    else:
+        fig2 = buyback_figure(fechas[idx_precio], indicadores.prices[idx_precio],
+                              fechas[idx_impacto], impacto_base[idx_impacto],
+                              buyback_percentage, chart_type,
+                              impact=escenarios.row(buyback_percentage)[idx_impacto])
+        perf_fragmento.section("fig2 serialización")
+        st.plotly_chart(fig2, use_container_width=True)
+
+    perf_fragmento.section("Mapa de escenarios")
+    with st.expander("Mapa de escenarios de recompra"):
+        fig_escenarios = buyback_heatmap(fechas[idx_impacto], escenarios.grid,
+                                         escenarios.impact[:, idx_impacto])
+        st.plotly_chart(fig_escenarios, use_container_width=True)
+
+    # Sección: Informe ejecutivo generativo (depende del porcentaje de recompra)
+    perf_fragmento.section("Informe ejecutivo")
+    with contenedor_informe:
+        # Selector de tipo de informe
+        report_type = st.radio(
+            "Tipo de Informe",
+            list(TIPOS_INFORME),
+            horizontal=True
+        )
+        mostrar_informe(report_type, analysis_period, buyback_percentage, impacto_promedio,
+                        indicadores, tendencias)
+    perf_fragmento.finish()
+
+
+@st.fragment
+def seccion_financiera(seed):
+    """Tabla de datos financieros y cascada de ingresos."""
+    perf_fragmento = RerunTimer(total_label="Fragmento Financiero")
+    perf_fragmento.section("Tabla financiera")
+
+    # Sección: Datos financieros con capacidad de descarga
+    st.markdown("## 🧾 Datos Financieros Interactivos")
+
+    col_horizonte, col_segmento = st.columns(2)
+    with col_horizonte:
+        anios = st.slider("Horizonte (años)", min_value=1, max_value=ANIOS_HISTORIA, value=ANIOS_INICIALES)
+    with col_segmento:
+        segmento = st.selectbox("Segmento de negocio", [CONSOLIDADO, *SEGMENTOS])
+
+    estados = load_financials(seed, years=anios)
+
+    # Mostrar datos con estilo: los estilos vienen del caché y solo se envía la página visible
+    tabla = load_financial_table(seed, years=anios, segment=segmento)
+    styled_df = tabla.frame
+    paginas = tabla.n_pages(FILAS_POR_PAGINA)
+    pagina = 1
+    if paginas > 1:
+        pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1)
+    inicio, fin = tabla.page_bounds(pagina, FILAS_POR_PAGINA)
+    st.dataframe(tabla.page(pagina, FILAS_POR_PAGINA))
+    st.caption(f"Filas {inicio + 1}-{fin} de {len(tabla)}")
+
+    # Descarga completa: el archivo se genera solo al hacer clic
+    formatos = download_formats()
+    for col, (formato, mime) in zip(st.columns(len(formatos)), formatos.items()):
+        with col:
+            st.download_button(
+                f"📥 Descargar {formato.upper()}",
+                data=partial(export_table, styled_df, formato),
+                file_name=f"estados_financieros_{anios}a.{formato}",
+                mime=mime,
+                on_click="ignore",
+                key=f"descarga_financiera_{formato}",
+            )
+
+    perf_fragmento.section("fig4 Cascada")
+
+    # Gráfico de cascada para flujo financiero; en horizontes largos, por año
+    if len(estados) > MAX_BARRAS_CASCADA:
+        cascada = financial_summary(estados.annual(), segmento)
+        titulo = "Flujo de Ingresos Anual"
+    else:
+        cascada = styled_df
+        titulo = "Flujo de Ingresos Trimestral"
+    fig4 = revenue_waterfall_figure(cascada.index, cascada["Ingresos"], title=titulo)
+
+    perf_fragmento.section("fig4 serialización")
+    st.plotly_chart(fig4, use_container_width=True)
+    perf_fragmento.finish()
+
+
+perf.section("fig3 Sectores")
+
+# Sección: Inteligencia de mercado con filtros interactivos. El selector de
+# sectores alimenta también el informe, por lo que provoca un rerun completo
+# (los datos y las figuras de las demás secciones se sirven desde caché).
+with contenedor_mercado:
+    st.markdown("## 📈 Análisis de Tendencias e Inteligencia de Mercado")
+
+    # Selector de sectores para análisis comparativo
+    selected_sectors = st.multiselect(
+        "Seleccione sectores para comparar",
+        SECTORES,
+        default=list(SECTORES_INICIALES)
+    )
 
-# Generar informe basado en selecciones
-if report_type == "Resumen Ejecutivo":
-    st.markdown(f"""
-    <div style="background-color:#f8f9fa;padding:20px;border-radius:10px;">
-        <h3 style="color:#2c3e50;">Resumen Ejecutivo - {analysis_period}</h3>
-        <p>El análisis del período seleccionado muestra un <strong>rendimiento promedio del {format_percentage(rendimiento_promedio)}</strong>, 
-        con una volatilidad del {format_percentage(volatilidad)}.</p>
-        <p>La simulación de recompra del <strong>{buyback_percentage}%</strong> sugiere un impacto positivo potencial 
-        del {format_percentage(price_data['Recompra Impacto (%)'].mean())} en el precio de la acción.</p>
-        <p>Los sectores <strong>{tendencias.loc[tendencias['Crecimiento Anual (%)'].idxmax(), 'Sector']}</strong> 
-        y <strong>{tendencias.loc[tendencias['Margen EBITDA (%)'].idxmax(), 'Sector']}</strong> presentan los mejores 
-        indicadores de crecimiento y rentabilidad respectivamente.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-elif report_type == "Análisis Detallado":
-    st.markdown(f"""
-    <div style="background-color:#f8f9fa;padding:20px;border-radius:10px;">
-        <h3 style="color:#2c3e50;">Análisis Detallado - {analysis_period}</h3>
-        <h4 style="color:#3498db;">Desempeño Bursátil</h4>
-        <p>La acción mostró un rango de precios entre {price_data['Precio Acción ($MXN)'].min():.2f} MXN y 
-        {price_data['Precio Acción ($MXN)'].max():.2f} MXN durante el período analizado, con una tendencia 
-        {'alcista' if price_data['Precio Acción ($MXN)'].iloc[-1] > price_data['Precio Acción ($MXN)'].iloc[0] else 'bajista'} 
-        general.</p>
-        
-        <h4 style="color:#3498db;">Impacto de Recompra</h4>
-        <p>La estrategia de recompra del {buyback_percentage}% muestra correlación con mejoras en el desempeño, 
-        particularmente en períodos de alta volatilidad. El impacto promedio estimado es del 
-        {format_percentage(price_data['Recompra Impacto (%)'].mean())}.</p>
-        
-        <h4 style="color:#3498db;">Inteligencia de Mercado</h4>
-        <p>El sector {tendencias.loc[tendencias['Crecimiento Anual (%)'].idxmax(), 'Sector']} lidera el crecimiento 
-        con {format_percentage(tendencias['Crecimiento Anual (%)'].max())}, mientras que {tendencias.loc[tendencias['Margen EBITDA (%)'].idxmax(), 'Sector']} 
-        presenta el mayor margen EBITDA con {format_percentage(tendencias['Margen EBITDA (%)'].max())}.</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-else:
-    st.markdown(f"""
-    <div style="background-color:#f8f9fa;padding:20px;border-radius:10px;">
-        <h3 style="color:#2c3e50;">Recomendaciones Estratégicas</h3>
-        <h4 style="color:#3498db;">Acciones Recomendadas</h4>
-        <ul>
-            <li>Considerar implementación de programa de recompra de acciones en el rango del {buyback_percentage-1:.1f}% al {buyback_percentage+1:.1f}%</li>
-            <li>Diversificar exposición hacia el sector {tendencias.loc[tendencias['Crecimiento Anual (%)'].idxmax(), 'Sector']} para aprovechar tendencias de crecimiento</li>
-            <li>Optimizar estructura de costos para alcanzar márgenes comparables a los del sector {tendencias.loc[tendencias['Margen EBITDA (%)'].idxmax(), 'Sector']}</li>
-        </ul>
-        
-        <h4 style="color:#3498db;">Riesgos a Monitorear</h4>
-        <ul>
-            <li>Volatilidad del mercado actual: {format_percentage(volatilidad)}</li>
-            <li>Presión competitiva en sectores con menor margen EBITDA</li>
-            <li>Condiciones macroeconómicas que puedan afectar el crecimiento sectorial</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    # Generar datos dinámicos basados en selección
+    tendencias = load_sector_trends(tuple(selected_sectors), seed)
+
+    # Gráfico de radar para comparación multidimensional
+    fig3 = sector_radar_figure(tendencias)
+
+    perf.section("fig3 serialización")
+    st.plotly_chart(fig3, use_container_width=True)
+
+    perf.section("Comparativa transversal")
+    with st.expander("📊 Métricas por sector y correlaciones"):
+        st.dataframe(
+            tendencias.style.format({
+                "Crecimiento Anual (%)": "{:.2f}%",
+                "Margen EBITDA (%)": "{:.2f}%",
+                "Volatilidad (%)": "{:.2f}%",
+                "Beta": "{:.2f}",
+                "Correlación": "{:.2f}",
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+        if len(selected_sectors) > 1:
+            st.plotly_chart(correlation_heatmap(load_sector_correlation(tuple(selected_sectors), seed)),
+                            use_container_width=True)
+
+perf.section("Fragmento Recompra")
+with contenedor_informe:
+    st.markdown("## 🧠 Informe Ejecutivo Automatizado")
+with contenedor_recompra:
+    seccion_recompra(indicadores, fechas, idx_precio, chart_type, max_points, downsample_method,
+                     analysis_period, tendencias)
+
+perf.section("Fragmento Financiero")
+with contenedor_financiero:
+    seccion_financiera(seed)
+
+perf.section("Contacto y pie")
 
 # Sección de contacto profesional
 st.markdown("---")
@@ -539,3 +624,42 @@ st.markdown(f"""
     <p>Portafolio interactivo desarrollado con Python | Última actualización: {datetime.now().strftime("%d/%m/%Y")}</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Panel de rendimiento (al final para incluir todas las secciones del rerun)
+tiempos_rerun = perf.finish()
+mark_first_rerun()
+if perfil_activo is not None:
+    st.session_state["perfil_texto"] = stop_profile(perfil_activo)
+
+if show_performance:
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("## ⏱️ Rendimiento")
+        st.caption(f"Este rerun: {tiempos_rerun[RERUN_TOTAL] * 1e3:.0f} ms")
+        resumen_tiempos = REGISTRY.summary()
+        st.dataframe(
+            [{"Sección": r["section"], "Último (ms)": round(r["last_ms"], 1),
+              "p50 (ms)": round(r["p50_ms"], 1), "p95 (ms)": round(r["p95_ms"], 1),
+              "Reruns": r["count"]} for r in resumen_tiempos],
+            hide_index=True
+        )
+        st.markdown("**Histograma de reruns (ms)**")
+        st.bar_chart(histogram_counts(REGISTRY.histogram(RERUN_TOTAL)))
+        cache_disco = shared_cache()
+        if cache_disco is not None:
+            uso = cache_disco.stats()
+            st.caption(f"Caché en disco: {uso['entries']} entradas, {uso['bytes'] / 2**20:.1f} MiB, "
+                       f"{uso['hits']} aciertos / {uso['misses']} fallos en este proceso")
+
+        col_json, col_prom = st.columns(2)
+        if col_json.button("Exportar JSON"):
+            st.success(f"Guardado en {REGISTRY.export('json')}")
+        if col_prom.button("Exportar Prometheus"):
+            st.success(f"Guardado en {REGISTRY.export('prometheus')}")
+
+        st.button("Perfilar siguiente rerun",
+                  on_click=lambda: st.session_state.update(capturar_perfil=True),
+                  help="Captura el siguiente rerun con pyinstrument (si está instalado) o cProfile")
+        if "perfil_texto" in st.session_state:
+            with st.expander("Último perfil capturado"):
+                st.code(st.session_state["perfil_texto"], language=None)
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de las rutas de cálculo del tablero, sin sesión de navegador.
+
+Las clases siguen la convención de asv (``params``, ``setup``, métodos
+``time_*``). También se pueden ejecutar directamente; el ejecutor propio
+mide el tiempo (mínimo de varias repeticiones) y el pico de memoria con
+``tracemalloc``::
+
+    python -m benchmarks.bench_compute
+    python -m benchmarks.bench_compute --max-periods 730 --json bench.json
+
+Las funciones del data layer se llaman mediante ``__wrapped__`` para medir
+el cálculo y no el caché de Streamlit.
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from startup import quiet_streamlit_logs
+
+# Se mide el cálculo: sin el caché en disco compartido
+os.environ.setdefault("ALPEK_DISK_CACHE", "0")
+quiet_streamlit_logs(bare=True)
+
+from buyback_scenarios import BuybackScenarios
+from cross_section import (DIAS_ANIO, SECTORES, aggregate_by_sector, rolling_beta, simple_returns,
+                           synthetic_universe, ticker_metrics)
+from data_layer import load_sector_trends
+from downsampling import downsample_indices, MAX_PUNTOS_GRAFICA
+from figures import (VELAS, FigureCache, price_figure, buyback_figure, sector_radar_figure,
+                     revenue_waterfall_figure)
+from financials import ANIOS_HISTORIA, financial_summary, operating_statements, synthetic_financials
+from indicators import IndicatorSet
+from live_feed import CAPACIDAD_BUFFER, QuoteRing
+from metrics import roic_series, rolling_ols
+from monte_carlo import confidence_bands
+from price_engine import build_price_frame, generate_prices
+from rollups import RollupSet
+from table_view import StyledTable, export_table
+
+PERIODOS = [90, 365, 730, 10**5, 10**6]
+
+
+def _frame(periods):
+    return build_price_frame(periods, seed=0)
+
+
+class PriceGeneration:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def time_generate_prices(self, periods):
+        generate_prices(periods, seed=0)
+
+    def time_build_price_frame(self, periods):
+        build_price_frame(periods, seed=0)
+
+
+class Metrics:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def setup(self, periods):
+        self.frame = _frame(periods)
+        self.indicators = IndicatorSet.from_frame(self.frame)
+
+    def time_indicator_set(self, periods):
+        IndicatorSet.from_frame(self.frame)
+
+    def time_append_point(self, periods):
+        self.indicators.append(100.0, np.datetime64("2100-01-01"))
+
+
+class Rollups:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def setup(self, periods):
+        self.frame = _frame(periods)
+        self.rollups = RollupSet.from_frame(self.frame)
+
+    def time_rollup_set(self, periods):
+        RollupSet.from_frame(self.frame)
+
+    def time_candlestick_figure(self, periods):
+        bars = self.rollups.for_span(periods)
+        price_figure(bars.dates, bars.close, VELAS, "bench",
+                     ohlc=(bars.open, bars.high, bars.low, bars.close), cache=FigureCache())
+
+
+class ConfidenceBands:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def setup(self, periods):
+        self.prices = generate_prices(periods, seed=0)
+
+    def time_monte_carlo_bands(self, periods):
+        confidence_bands(self.prices, n_paths=10_000, seed=0, workers=1)
+
+
+class BuybackImpact:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def setup(self, periods):
+        self.impact_base = IndicatorSet.from_frame(_frame(periods)).buyback_impact(0.0)
+        self.scenarios = BuybackScenarios(self.impact_base)
+
+    def time_scenario_grid(self, periods):
+        BuybackScenarios(self.impact_base)
+
+    def time_scenario_lookup(self, periods):
+        self.scenarios.row(7.5)
+
+
+class Downsampling:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def setup(self, periods):
+        frame = _frame(periods)
+        self.x = frame["Fecha"].to_numpy()
+        self.y = frame["Precio Acción ($MXN)"].to_numpy()
+
+    def time_lttb(self, periods):
+        downsample_indices(self.x, self.y, MAX_PUNTOS_GRAFICA, "lttb")
+
+    def time_minmax(self, periods):
+        downsample_indices(self.x, self.y, MAX_PUNTOS_GRAFICA, "minmax")
+
+
+class FigureConstruction:
+    params = PERIODOS
+    param_names = ["periods"]
+
+    def setup(self, periods):
+        frame = _frame(periods)
+        indicators = IndicatorSet.from_frame(frame)
+        x = frame["Fecha"].to_numpy()
+        idx = downsample_indices(x, indicators.prices)
+        self.x = x[idx]
+        self.y = indicators.prices[idx]
+        self.impact = indicators.buyback_impact(0.0)[idx]
+        self.patch_cache = FigureCache()
+        buyback_figure(self.x, self.y, self.x, self.impact, 5.0, "Gráfico de Línea",
+                       cache=self.patch_cache)
+
+    def time_price_figure(self, periods):
+        price_figure(self.x, self.y, "Gráfico de Línea", "bench", cache=FigureCache())
+
+    def time_buyback_figure(self, periods):
+        buyback_figure(self.x, self.y, self.x, self.impact, 5.0, "Gráfico de Barras",
+                       cache=FigureCache())
+
+    def time_buyback_figure_patch(self, periods):
+        # Solo cambia el porcentaje: la figura base ya está en caché
+        buyback_figure(self.x, self.y, self.x, self.impact, 5.5, "Gráfico de Línea",
+                       cache=self.patch_cache)
+
+
+class SectorRadar:
+    params = [3, 8]
+    param_names = ["sectors"]
+
+    def setup(self, sectors):
+        self.sectors = tuple(SECTORES[:sectors])
+        self.trends = load_sector_trends.__wrapped__(self.sectors, 0)
+
+    def time_sector_trends(self, sectors):
+        load_sector_trends.__wrapped__(self.sectors, 0)
+
+    def time_radar_figure(self, sectors):
+        sector_radar_figure(self.trends)
+
+
+class CrossSection:
+    params = [40, 250]
+    param_names = ["per_sector"]
+
+    def setup(self, per_sector):
+        self.universe = synthetic_universe(per_sector=per_sector, seed=0)
+        self.metrics = ticker_metrics(self.universe)
+        self.returns = simple_returns(self.universe.prices)
+        self.bench = simple_returns(self.universe.benchmark)
+
+    def time_ticker_metrics(self, per_sector):
+        ticker_metrics(self.universe)
+
+    def time_aggregate_by_sector(self, per_sector):
+        aggregate_by_sector(self.metrics)
+
+    def time_rolling_beta(self, per_sector):
+        rolling_beta(self.returns, self.bench)
+
+
+class RollingRiskMetrics:
+    """Beta móvil sobre 10 años de historia diaria para varias emisoras."""
+    params = [1, 100, 1000]
+    param_names = ["tickers"]
+
+    def setup(self, tickers):
+        rng = np.random.default_rng(0)
+        self.bench = rng.normal(0.0003, 0.01, 10 * DIAS_ANIO)
+        self.returns = self.bench[:, None] * rng.uniform(0.6, 1.5, tickers) \
+            + rng.normal(0.0, 0.01, (self.bench.size, tickers))
+        self.statements = operating_statements(synthetic_financials(ANIOS_HISTORIA, seed=0))
+
+    def time_rolling_ols(self, tickers):
+        rolling_ols(self.returns, self.bench)
+
+    def time_rolling_roic(self, tickers):
+        roic_series(self.statements)
+
+
+class LiveBuffer:
+    """Una sesión completa de ticks en el buffer circular (la memoria no debe crecer)."""
+    params = [CAPACIDAD_BUFFER, 4 * CAPACIDAD_BUFFER]
+    param_names = ["ticks"]
+
+    def setup(self, ticks):
+        self.dates = np.datetime64("2026-01-02T08:30") + np.arange(ticks).astype("timedelta64[s]")
+        self.prices = generate_prices(ticks, seed=0)
+        self.ring = QuoteRing()
+        self.ring.extend(self.dates, self.prices)
+
+    def time_append_session(self, ticks):
+        QuoteRing().extend(self.dates, self.prices)
+
+    def time_snapshot(self, ticks):
+        self.ring.snapshot()
+
+
+class Financials:
+    params = [1, 25]
+    param_names = ["years"]
+
+    def setup(self, years):
+        self.statements = synthetic_financials(years, seed=0)
+        self.summary = financial_summary(self.statements)
+        self.table = StyledTable.build(self.summary, gradient=["Margen"], highlight=["Utilidad"])
+
+    def time_statements_generation(self, years):
+        synthetic_financials(years, seed=0)
+
+    def time_financials_summary(self, years):
+        financial_summary(self.statements)
+
+    def time_pandas_styler_baseline(self, years):
+        # Línea base: el Styler de pandas sobre la tabla completa, como antes de table_view
+        (self.summary.style
+         .format("{:.1f}", na_rep="—")
+         .background_gradient(subset=["Margen"], cmap="RdYlGn")
+         .highlight_max(subset=["Utilidad"], color="#27ae60")
+         .highlight_min(subset=["Utilidad"], color="#e74c3c")
+         .to_html())
+
+    def time_table_styles(self, years):
+        StyledTable.build(self.summary, gradient=["Margen"], highlight=["Utilidad"])
+
+    def time_table_page(self, years):
+        self.table.page(1).to_html()
+
+    def time_table_export_csv(self, years):
+        export_table(self.summary, "csv")
+
+    def time_waterfall_figure(self, years):
+        revenue_waterfall_figure(self.summary.index, self.summary["Ingresos"])
+
+
+BENCHMARKS = [PriceGeneration, Metrics, Rollups, ConfidenceBands, BuybackImpact, Downsampling,
+              FigureConstruction, SectorRadar, CrossSection,
+              RollingRiskMetrics, LiveBuffer, Financials]
+
+
+def _measure(method, args, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        method(*args)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    method(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run(max_periods=None, name_filter=None, repeat=3, out=sys.stdout):
+    """Ejecuta los benchmarks y devuelve una lista de resultados."""
+    results = []
+    for cls in BENCHMARKS:
+        params = getattr(cls, "params", [None])
+        for param in params:
+            if max_periods is not None and getattr(cls, "param_names", None) == ["periods"] \
+                    and param > max_periods:
+                continue
+            args = () if param is None else (param,)
+            bench = cls()
+            if hasattr(bench, "setup"):
+                bench.setup(*args)
+            for name, method in inspect.getmembers(bench, inspect.ismethod):
+                if not name.startswith("time_"):
+                    continue
+                full_name = f"{cls.__name__}.{name}"
+                if name_filter and name_filter not in full_name:
+                    continue
+                seconds, peak = _measure(method, args, repeat)
+                results.append({"benchmark": full_name, "param": param,
+                                "seconds": seconds, "peak_bytes": peak})
+                print(f"{full_name:<45} {str(param):>8} {seconds * 1e3:>12.3f} ms "
+                      f"{peak / 2**20:>10.2f} MiB", file=out, flush=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de cálculo del tablero")
+    parser.add_argument("--max-periods", type=int, default=None,
+                        help="Omite tamaños de serie mayores a este valor")
+    parser.add_argument("--filter", default=None, help="Subcadena del nombre del benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", default=None, help="Archivo donde guardar los resultados")
+    args = parser.parse_args(argv)
+    results = run(args.max_periods, args.filter, args.repeat)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga del tablero: sesiones concurrentes contra un solo servidor.
+
+Cada nivel de concurrencia levanta un servidor ``python startup.py`` (el
+mismo ``streamlit run`` de producción, con su precalentamiento) y abre
+contra él varias sesiones por el websocket ``/_stcore/stream``, como lo
+haría el navegador: cada sesión envía ``rerun_script`` con el estado de sus
+widgets y espera el ``script_finished`` del servidor. Todas las sesiones
+comparten el proceso del servidor, sus cachés en memoria y el caché en
+disco, así que los resultados responden cuántas sesiones atiende un solo
+proceso. El widget modificado se busca en el árbol de elementos que envía
+el servidor (``parse_tree_from_messages`` de las pruebas de Streamlit); si
+pertenece a un ``st.fragment``, el rerun se pide solo para ese fragmento.
+
+Cada sesión repite una secuencia de interacciones: cambiar el período de
+análisis, recorrer el slider de recompra y alternar el tipo de informe. Se
+mide la duración de cada rerun desde que se envía hasta que llega
+``script_finished``. Toda espera tiene límite: una sesión que no conecta,
+no recibe respuesta en ``TIMEOUT_RERUN`` segundos o pierde la conexión se
+detiene y se reporta como error, igual que un servidor que termina antes de
+tiempo.
+
+Para cada nivel se reportan los percentiles p50/p95/p99 de la latencia de
+rerun (total y por interacción), el uso de CPU del servidor (100 % = un
+núcleo) y su RSS máximo (leídos de ``/proc``; en otros sistemas son NaN)::
+
+    python -m benchmarks.load_test --sessions 1 2 4 8 --rounds 3
+    python -m benchmarks.load_test --sessions 4 --clear-disk-cache --json carga.json
+    ALPEK_PREWARM=0 ALPEK_DISK_CACHE=0 python -m benchmarks.load_test --distinct-seeds
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+from buyback_scenarios import PORCENTAJE_MAX, PORCENTAJE_MIN
+from reports import TIPOS_INFORME
+from startup import quiet_streamlit_logs
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP = os.path.join(BASE_DIR, "startup.py")
+PERIODOS = ("Últimos 3 meses", "Últimos 6 meses", "Último año")
+RECORRIDO_RECOMPRA = (2.0, 3.5, 5.0, 6.5, 8.0)
+TIMEOUT_ARRANQUE = 60
+TIMEOUT_CONEXION = 30
+TIMEOUT_RERUN = 120
+# Últimos bytes de la salida del servidor que se muestran si termina antes de tiempo
+COLA_LOG = 2_000
+
+
+def _widget(widgets, label):
+    widget = next((w for w in widgets if w.label == label), None)
+    if widget is None:
+        raise KeyError(f"Widget '{label}' no encontrado en la página")
+    return widget
+
+
+def _periodo(step):
+    return "selectbox", "Período de Análisis", PERIODOS[step % len(PERIODOS)]
+
+
+def _recompra(step):
+    value = RECORRIDO_RECOMPRA[step % len(RECORRIDO_RECOMPRA)]
+    return ("slider", "Porcentaje de acciones para recompra simulada",
+            min(max(value, PORCENTAJE_MIN), PORCENTAJE_MAX))
+
+
+def _informe(step):
+    tipos = list(TIPOS_INFORME)
+    return "radio", "Tipo de Informe", tipos[step % len(tipos)]
+
+
+# Secuencia de una ronda: (interacción, función que da el widget y su nuevo valor)
+SECUENCIA = (
+    [("periodo", _periodo)]
+    + [("recompra", _recompra)] * len(RECORRIDO_RECOMPRA)
+    + [("informe", _informe)] * len(TIPOS_INFORME)
+)
+
+
+class BrowserSession:
+    """
+    Una sesión del tablero sobre un websocket abierto, con el estado de
+    widgets que mantendría el navegador.
+    """
+
+    def __init__(self, ws, timeout=TIMEOUT_RERUN):
+        self.ws = ws
+        self.timeout = timeout
+        self.tree = None
+        self.page_script_hash = ""
+        # Valores elegidos por la sesión, por (tipo de widget, etiqueta)
+        self.values = {}
+        # Fragmento que contiene cada widget (id de widget -> id de fragmento)
+        self.fragments = {}
+
+    def set(self, kind, label, value):
+        """Elige ``value`` en el widget; devuelve el fragmento que hay que volver a ejecutar."""
+        widget = _widget(getattr(self.tree, kind), label)
+        _widget_state(kind, widget, value)
+        self.values[(kind, label)] = value
+        return self.fragments.get(widget.id, "")
+
+    def widget_states(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetStates
+
+        states = WidgetStates()
+        for (kind, label), value in self.values.items():
+            states.widgets.append(_widget_state(kind, _widget(getattr(self.tree, kind), label), value))
+        return states
+
+    def rerun(self, fragment_id=""):
+        """
+        Pide un rerun (de la página o de ``fragment_id``) y espera su
+        ``script_finished``. Devuelve la duración y los mensajes de las
+        excepciones que mostró el script.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+        back = BackMsg()
+        back.rerun_script.query_string = ""
+        back.rerun_script.page_script_hash = self.page_script_hash
+        back.rerun_script.fragment_id = fragment_id
+        if self.tree is not None:
+            back.rerun_script.widget_states.CopyFrom(self.widget_states())
+
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        self.ws.send(back.SerializeToString())
+        messages = []
+        while True:
+            try:
+                data = self.ws.recv(timeout=max(deadline - time.perf_counter(), 0))
+            except TimeoutError:
+                raise TimeoutError(f"sin script_finished en {self.timeout} s") from None
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = msg.new_session.page_script_hash
+            elif kind == "script_finished":
+                break
+            messages.append(msg)
+        elapsed = time.perf_counter() - start
+
+        status = ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)
+        errors = [] if "SUCCESSFULLY" in status else [f"rerun terminado con {status}"]
+        for message in messages:
+            if message.HasField("delta") and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                if element.WhichOneof("type") == "exception":
+                    errors.append(element.exception.message)
+        # Un rerun de fragmento solo reenvía ese fragmento: se conserva el árbol de la página
+        if not fragment_id:
+            self.tree = parse_tree_from_messages(messages)
+            self.fragments = _widget_fragments(messages)
+        return elapsed, errors
+
+
+def _widget_state(kind, widget, value):
+    """``WidgetState`` que envía el navegador al elegir ``value`` en ``widget``."""
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=widget.id)
+    if kind in ("selectbox", "radio"):
+        if value not in widget.options:
+            raise ValueError(f"'{value}' no es una opción de '{widget.label}'")
+        state.string_value = value
+    elif kind == "slider":
+        state.double_array_value.data[:] = [value]
+    elif kind == "number_input":
+        state.double_value = value
+    else:
+        raise ValueError(f"Tipo de widget no soportado: {kind}")
+    return state
+
+
+def _widget_fragments(messages):
+    """Id de widget -> id del fragmento que lo dibujó, para los widgets dentro de fragmentos."""
+    fragments = {}
+    for msg in messages:
+        if not (msg.HasField("delta") and msg.delta.fragment_id):
+            continue
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind) if kind else None
+        if proto is not None and "id" in proto.DESCRIPTOR.fields_by_name:
+            fragments[proto.id] = msg.delta.fragment_id
+    return fragments
+
+
+def run_session(session, url, rounds, seed, start_barrier, report):
+    """
+    Una sesión (en su propio hilo): conexión, carga inicial y ``rounds``
+    repeticiones de ``SECUENCIA``. Deja en ``report`` las latencias y los
+    errores; ante el primer error de conexión o de tiempo la sesión se
+    detiene.
+    """
+    from websockets.sync.client import connect
+
+    results, errors = report["results"], report["errors"]
+
+    def timed(action, fragment_id=""):
+        elapsed, messages = client.rerun(fragment_id)
+        errors.extend((session, action, message) for message in messages)
+        results.append((action, elapsed))
+
+    action = "conexión"
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None,
+                     open_timeout=TIMEOUT_CONEXION, close_timeout=TIMEOUT_CONEXION) as ws:
+            client = BrowserSession(ws)
+            start_barrier.wait()
+            action = "carga"
+            timed(action)
+            if seed is not None:
+                action = "semilla"
+                timed(action, client.set("number_input", "Semilla de simulación", seed))
+            step = 0
+            for _ in range(rounds):
+                for action, apply in SECUENCIA:
+                    timed(action, client.set(*apply(step)))
+                    step += 1
+    except Exception as exc:  # la sesión se detiene; el error se reporta con el nivel
+        errors.append((session, action, repr(exc)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _log_tail(log):
+    log.seek(0, os.SEEK_END)
+    log.seek(max(log.tell() - COLA_LOG, 0))
+    return log.read().decode("utf-8", errors="replace").strip()
+
+
+def start_server(port, log):
+    """Levanta ``startup.py`` en ``port`` y espera a que responda el health check."""
+    server = subprocess.Popen(
+        [sys.executable, STARTUP, "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+         "--logger.level", "error"],
+        cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.perf_counter() + TIMEOUT_ARRANQUE
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {server.returncode}:\n{_log_tail(log)}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError(f"El servidor no respondió en {TIMEOUT_ARRANQUE} s:\n{_log_tail(log)}")
+
+
+def stop_server(server):
+    if server.poll() is None:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def process_cpu_seconds(pid):
+    """CPU (usuario + sistema) consumida por ``pid``; NaN sin ``/proc``."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as fh:
+            fields = fh.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return float("nan")
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_peak_rss_bytes(pid):
+    """RSS máximo de ``pid`` (``VmHWM``); NaN sin ``/proc``."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def _percentiles_ms(seconds):
+    values = np.asarray(seconds, dtype=np.float64) * 1e3
+    if not values.size:
+        nan = float("nan")
+        return {"count": 0, "p50_ms": nan, "p95_ms": nan, "p99_ms": nan, "max_ms": nan}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": int(values.size), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "max_ms": values.max()}
+
+
+def run_level(sessions, rounds, distinct_seeds=False, clear_disk_cache=False):
+    """Ejecuta ``sessions`` sesiones concurrentes contra un servidor nuevo y devuelve las métricas del nivel."""
+    if clear_disk_cache:
+        from disk_cache import shared_cache
+
+        cache = shared_cache()
+        if cache is not None:
+            cache.clear()
+
+    port = _free_port()
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    reports = [{"results": [], "errors": []} for _ in range(sessions)]
+    errors = []
+    with tempfile.TemporaryFile() as log:
+        server = start_server(port, log)
+        try:
+            barrier = threading.Barrier(sessions + 1, timeout=TIMEOUT_CONEXION)
+            threads = [
+                threading.Thread(target=run_session, name=f"sesion-{i}", daemon=True,
+                                 args=(i, url, rounds, 1000 + i if distinct_seeds else None,
+                                       barrier, reports[i]))
+                for i in range(sessions)
+            ]
+            for thread in threads:
+                thread.start()
+            # Todas las sesiones arrancan juntas, ya conectadas
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass  # cada sesión que no llegó reporta su propio error
+            cpu_start = process_cpu_seconds(server.pid)
+            wall_start = time.perf_counter()
+            # Cada rerun tiene su límite; este solo cubre un hilo que no regresara
+            deadline = wall_start + TIMEOUT_RERUN * (2 + rounds * len(SECUENCIA))
+            for i, thread in enumerate(threads):
+                thread.join(timeout=max(deadline - time.perf_counter(), 0))
+                if thread.is_alive():
+                    errors.append((i, "sesión", "sin terminar al vencer el tiempo del nivel"))
+            wall = time.perf_counter() - wall_start
+            cpu = process_cpu_seconds(server.pid) - cpu_start
+            rss_peak = process_peak_rss_bytes(server.pid)
+            if any(report["errors"] for report in reports):
+                # Una conexión cerrada puede llegar antes de que el servidor caído termine de salir
+                try:
+                    server.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    pass
+            if server.poll() is not None:
+                errors.append(("servidor", "-", f"terminó con código {server.returncode}: "
+                                                f"{_log_tail(log)}"))
+        finally:
+            stop_server(server)
+
+    results = [r for report in reports for r in report["results"]]
+    errors = [e for report in reports for e in report["errors"]] + errors
+    by_action = {}
+    for action, seconds in results:
+        by_action.setdefault(action, []).append(seconds)
+    return {
+        "sessions": sessions,
+        "reruns": len(results),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_s": wall,
+        "reruns_per_s": len(results) / wall if wall else float("nan"),
+        "cpu_pct": cpu / wall * 100 if wall else float("nan"),
+        "rss_peak_mib": rss_peak / 2**20,
+        "latency": _percentiles_ms([seconds for _, seconds in results]),
+        "by_action": {action: _percentiles_ms(values) for action, values in by_action.items()},
+    }
+
+
+def print_level(level, out=sys.stdout):
+    lat = level["latency"]
+    print(f"{level['sessions']:>8} {level['reruns']:>7} {level['reruns_per_s']:>8.1f} "
+          f"{lat['p50_ms']:>9.0f} {lat['p95_ms']:>9.0f} {lat['p99_ms']:>9.0f} "
+          f"{level['cpu_pct']:>7.0f} {level['rss_peak_mib']:>9.0f} {level['errors']:>6}",
+          file=out, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prueba de carga con sesiones concurrentes contra un solo servidor del tablero")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 2, 4, 8],
+                        help="Niveles de concurrencia (sesiones simultáneas)")
+    parser.add_argument("--rounds", type=int, default=2, help="Repeticiones de la secuencia por sesión")
+    parser.add_argument("--distinct-seeds", action="store_true",
+                        help="Cada sesión usa otra semilla (sin aciertos de caché entre sesiones)")
+    parser.add_argument("--clear-disk-cache", action="store_true",
+                        help="Vacía el caché en disco antes de cada nivel")
+    parser.add_argument("--json", default=None, help="Archivo donde guardar los resultados")
+    args = parser.parse_args(argv)
+    quiet_streamlit_logs(bare=True)
+
+    print(f"{'Sesiones':>8} {'Reruns':>7} {'Reruns/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'CPU %':>7} {'RSS MiB':>9} {'Error':>6}")
+    levels = []
+    for sessions in args.sessions:
+        level = run_level(sessions, args.rounds, args.distinct_seeds, args.clear_disk_cache)
+        levels.append(level)
+        print_level(level)
+        for session, action, message in level["error_samples"]:
+            print(f"  ERROR sesión {session} ({action}): {message}", file=sys.stderr)
+
+    print("\np95 por interacción (ms)")
+    actions = list(levels[-1]["by_action"]) if levels else []
+    print(f"{'Sesiones':>8} " + " ".join(f"{a:>10}" for a in actions))
+    for level in levels:
+        print(f"{level['sessions']:>8} " + " ".join(
+            f"{level['by_action'].get(a, {}).get('p95_ms', float('nan')):>10.0f}" for a in actions))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(levels, fh, indent=2, default=float)
+    return 1 if any(level["errors"] for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de escenarios de recompra.
+
+El impacto de recompra es ``impacto_base * (1 + porcentaje / 10)``. En lugar
+de recalcularlo para cada posición del slider, ``BuybackScenarios`` evalúa
+toda la rejilla de porcentajes en una sola operación con broadcasting y
+guarda la matriz (escenario x fecha); mover el slider es una búsqueda de
+índice.
+"""
+
+import numpy as np
+
+PORCENTAJE_MIN = 0.0
+PORCENTAJE_MAX = 10.0
+PASO_PORCENTAJE = 0.5
+
+
+def buyback_grid(start=PORCENTAJE_MIN, stop=PORCENTAJE_MAX, step=PASO_PORCENTAJE):
+    """Porcentajes de recompra de ``start`` a ``stop`` inclusive."""
+    n = int(round((stop - start) / step)) + 1
+    return np.round(start + step * np.arange(n), 10)
+
+
+class BuybackScenarios:
+    """Impacto de recompra para toda una rejilla de porcentajes."""
+
+    def __init__(self, impact_base, grid=None):
+        self.grid = buyback_grid() if grid is None else np.asarray(grid, dtype=np.float64)
+        impact_base = np.asarray(impact_base, dtype=np.float64)
+        factors = 1 + self.grid / 10
+        # (escenario x fecha) en una sola pasada
+        self.impact = factors[:, None] * impact_base[None, :]
+        # La media escala linealmente con el factor: se calcula sobre la base una vez
+        validos = impact_base[~np.isnan(impact_base)]
+        base_mean = validos.mean() if validos.size else np.nan
+        self.mean_impact = factors * base_mean
+
+    def index(self, buyback_percentage):
+        """Índice del escenario más cercano a ``buyback_percentage``."""
+        return int(np.abs(self.grid - buyback_percentage).argmin())
+
+    def row(self, buyback_percentage):
+        """Serie de impacto para el escenario seleccionado."""
+        return self.impact[self.index(buyback_percentage)]
+
+    def mean(self, buyback_percentage):
+        return float(self.mean_impact[self.index(buyback_percentage)])
+
+    def __len__(self):
+        return self.grid.size
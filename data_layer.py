@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Capa de acceso a datos del tablero.
+
+Cada conjunto de datos se memoiza con ``st.cache_data`` usando solo sus
+entradas reales (período, semilla, sectores, horizonte financiero), de
+modo que los cambios cosméticos de widgets no provocan recálculos. El caché
+tiene tamaño acotado y expiración por TTL.
+
+Debajo de ``st.cache_data``, ``persistent`` guarda los resultados en el
+caché en disco compartido (``disk_cache``), así que sobreviven a reinicios
+y se comparten entre procesos. Los datos de mercado no se persisten: se
+leen del almacén con ``memmap`` y cambian con cada ingesta.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import streamlit as st
+
+from cross_section import (DIAS_ANIO, aggregate_by_sector, sector_correlation,
+                           synthetic_universe, ticker_metrics)
+from buyback_scenarios import BuybackScenarios, PASO_PORCENTAJE, buyback_grid
+from disk_cache import persistent
+from indicators import IndicatorSet
+from financials import (ANIOS_HISTORIA, CONSOLIDADO, SEGMENTOS, TRIMESTRES_HISTORIA, financial_summary,
+                        operating_statements, synthetic_financials)
+from live_feed import CAPACIDAD_BUFFER, LiveFeed, source_from_spec
+from market_data import BENCHMARK_TICKER, MarketDataStore
+from metrics import TRIMESTRES_ROIC, VENTANA_BETA, beta_from_prices, roic_series
+from monte_carlo import confidence_bands, N_SIMULACIONES
+from price_engine import DATE_COLUMN, PRICE_COLUMN, build_price_frame, generate_benchmark
+from rollups import RollupSet
+from table_view import StyledTable
+
+# Límites del caché compartido entre sesiones
+CACHE_TTL = 60 * 60
+CACHE_MAX_ENTRIES = 64
+
+# Procesos del pool de Monte Carlo (1 = en el mismo proceso, sin pool)
+MC_WORKERS = int(os.environ.get("ALPEK_MC_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("precios", daily=True)
+def load_price_data(periods, seed, end=None):
+    """Serie de precios para ``periods`` días terminando en ``end``."""
+    return build_price_frame(periods, seed=seed, end=end)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("indicadores", daily=True)
+def load_indicators(periods, seed, end=None):
+    """Indicadores (rendimientos, bandas, extremos) de la serie de precios."""
+    return IndicatorSet.from_frame(load_price_data(periods, seed, end=end))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("barras", daily=True)
+def load_rollups(periods, seed, end=None):
+    """Barras OHLC diarias, semanales y mensuales de la serie simulada."""
+    return RollupSet.from_frame(load_price_data(periods, seed, end=end))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("escenarios_recompra")
+def load_buyback_scenarios(impact_base, step=PASO_PORCENTAJE):
+    """Rejilla completa de escenarios de recompra para una serie de impacto base."""
+    return BuybackScenarios(impact_base, grid=buyback_grid(step=step))
+
+
+@st.cache_resource(show_spinner=False)
+def get_mc_pool(workers=MC_WORKERS):
+    """
+    Pool de procesos de Monte Carlo compartido por el proceso (se crea una
+    vez). Los procesos se inician con ``spawn``: hacer ``fork`` del servidor,
+    que tiene varios hilos, puede heredar locks tomados.
+    """
+    if workers <= 1:
+        return 1
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_market_store(store_dir):
+    """Almacén histórico compartido por el proceso (los memmaps se abren una vez)."""
+    return MarketDataStore(store_dir)
+
+
+@st.cache_resource(show_spinner=False)
+def get_live_feed(spec, capacity=CAPACIDAD_BUFFER):
+    """Consumidor de cotizaciones en vivo compartido por el proceso (se inicia una vez)."""
+    return LiveFeed(source_from_spec(spec), capacity=capacity).start()
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_market_prices(store_dir, ticker, periods):
+    """Últimos ``periods`` días de la emisora desde el almacén histórico."""
+    return get_market_store(store_dir).price_frame(ticker, periods)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_market_rollups(store_dir, ticker, periods):
+    """Barras OHLC de la emisora histórica (usa apertura/máximo/mínimo/volumen si existen)."""
+    return RollupSet.from_frame(get_market_store(store_dir).price_frame(ticker, periods, all_columns=True))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_market_indicators(store_dir, ticker, periods):
+    """Indicadores de la serie histórica de la emisora."""
+    return IndicatorSet.from_frame(load_market_prices(store_dir, ticker, periods))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("indice", daily=True)
+def load_benchmark(periods, seed, end=None):
+    """Índice de referencia sintético alineado con la serie simulada."""
+    prices = load_price_data(periods, seed, end=end)[PRICE_COLUMN].to_numpy()
+    return generate_benchmark(prices, seed=[seed, 5])
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_market_benchmark(store_dir, ticker, periods, seed):
+    """
+    Índice de referencia de la emisora histórica: ``BENCHMARK_TICKER`` del
+    almacén en las mismas fechas, o uno sintético si no cubre el período.
+    """
+    frame = load_market_prices(store_dir, ticker, periods)
+    store = get_market_store(store_dir)
+    if BENCHMARK_TICKER != ticker and BENCHMARK_TICKER in store.tickers:
+        index = store.prices_at(BENCHMARK_TICKER, frame[DATE_COLUMN])
+        if not np.isnan(index).any():
+            return index
+    return generate_benchmark(frame[PRICE_COLUMN].to_numpy(), seed=[seed, 5])
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("beta", daily=True)
+def load_beta_series(periods, seed, end=None, window=VENTANA_BETA):
+    """Beta móvil de la serie simulada contra su índice de referencia."""
+    prices = load_price_data(periods, seed, end=end)[PRICE_COLUMN].to_numpy()
+    return beta_from_prices(prices, load_benchmark(periods, seed, end=end), window)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_market_beta_series(store_dir, ticker, periods, seed, window=VENTANA_BETA):
+    """Beta móvil de la emisora histórica contra su índice de referencia."""
+    prices = load_market_prices(store_dir, ticker, periods)[PRICE_COLUMN].to_numpy()
+    return beta_from_prices(prices, load_market_benchmark(store_dir, ticker, periods, seed), window)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("roic", daily=True)
+def load_roic_series(seed, end=None, window=TRIMESTRES_ROIC, n_quarters=TRIMESTRES_HISTORIA):
+    """
+    ROIC móvil consolidado de los últimos ``n_quarters`` trimestres, sobre los
+    mismos estados que muestra la tabla financiera.
+    """
+    estados = operating_statements(load_financial_history(seed, end=end))
+    return roic_series(estados, window=window).iloc[-n_quarters:]
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("bandas_mc")
+def load_confidence_bands(prices, seed, n_paths=N_SIMULACIONES):
+    """Bandas de percentiles Monte Carlo para la serie de precios."""
+    try:
+        return confidence_bands(prices, n_paths=n_paths, seed=[seed, 3], workers=get_mc_pool())
+    except BrokenProcessPool:
+        # Un proceso del pool murió (p. ej. sin memoria): se descarta el pool para que la
+        # siguiente llamada cree uno nuevo, y esta se calcula en el mismo proceso
+        get_mc_pool.clear()
+        return confidence_bands(prices, n_paths=n_paths, seed=[seed, 3], workers=1)
+
+
+@st.cache_resource(show_spinner=False)
+def load_universe(seed, periods=DIAS_ANIO):
+    """Universo sintético de emisoras por sector (compartido, solo lectura)."""
+    return synthetic_universe(periods=periods, seed=[seed, 4])
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("metricas_emisoras")
+def load_ticker_metrics(seed):
+    """Métricas transversales por emisora del universo."""
+    return ticker_metrics(load_universe(seed))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("tendencias_sector")
+def load_sector_trends(sectors, seed):
+    """Métricas promedio por sector; ``sectors`` debe ser una tupla."""
+    return aggregate_by_sector(load_ticker_metrics(seed), sectors)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("correlacion_sectores")
+def load_sector_correlation(sectors, seed):
+    """Correlación de rendimientos entre los sectores seleccionados."""
+    return sector_correlation(load_universe(seed), sectors)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("estados_financieros", daily=True)
+def load_financial_history(seed, segments=SEGMENTOS, end=None):
+    """
+    Estados trimestrales por segmento de los últimos ``ANIOS_HISTORIA`` años
+    cerrados. La tabla y el ROIC toman sus períodos de aquí, así que comparten
+    cifras para la misma semilla.
+    """
+    return synthetic_financials(ANIOS_HISTORIA, segments=segments, seed=[seed, 2], end=end)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def load_financials(seed, years=1, segments=SEGMENTOS, end=None):
+    """Estados trimestrales por segmento de los últimos ``years`` años cerrados."""
+    return load_financial_history(seed, segments=segments, end=end).last(4 * years)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+@persistent("tabla_financiera", daily=True)
+def load_financial_table(seed, years=1, segment=CONSOLIDADO):
+    """Resumen financiero con los estilos de todas las celdas ya calculados."""
+    resumen = financial_summary(load_financials(seed, years=years), segment)
+    return StyledTable.build(resumen, gradient=["Margen"], highlight=["Utilidad"])
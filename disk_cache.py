@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Caché persistente en disco, compartido entre sesiones, procesos y reinicios.
+
+``st.cache_data`` vive en la memoria de cada proceso: se pierde al reiniciar
+o redesplegar y no se comparte entre procesos (varios workers, el generador
+por lotes). ``DiskCache`` guarda los resultados serializados con ``pickle``
+en una base SQLite (modo WAL, así que varios procesos pueden leer y escribir
+a la vez). La llave es una huella blake2b del contenido de los argumentos
+(los arreglos y DataFrames por sus bytes, no por identidad) y de la versión
+del código (huella de los módulos ``*.py``), de modo que un cambio de código
+no sirve resultados obsoletos.
+
+Cada lectura actualiza la marca de último acceso; al escribir, si el tamaño
+total excede ``max_bytes`` se eliminan las entradas usadas menos
+recientemente (LRU). El tamaño total se lleva como estimación en memoria
+(se suma cada escritura) y solo se recalcula en SQLite cuando la
+estimación rebasa el límite o cada ``REVISION_TAMANO`` escrituras, para
+incluir lo que escriben otros procesos. Un error de SQLite (disco lleno, sistema de archivos de
+solo lectura) se trata como fallo de caché: el resultado se calcula igual.
+
+Los loaders del data layer se envuelven con ``persistent`` debajo de
+``st.cache_data``; ``figures.FIGURE_CACHE`` usa el mismo almacén para las
+figuras serializadas. Para ver el tamaño o vaciarlo::
+
+    python disk_cache.py [--clear]
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import date
+from functools import wraps
+from inspect import signature
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.environ.get("ALPEK_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+CACHE_MAX_MB = float(os.environ.get("ALPEK_CACHE_MAX_MB", 512))
+CACHE_ACTIVO = os.environ.get("ALPEK_DISK_CACHE", "1") != "0"
+ARCHIVO_CACHE = "alpek_cache.sqlite"
+# Escrituras entre recálculos del tamaño total
+REVISION_TAMANO = 256
+
+_FALTANTE = object()
+
+
+def code_version(directory=os.path.dirname(os.path.abspath(__file__))):
+    """Huella de los módulos de cálculo (``*.py`` del directorio, sin el script del tablero)."""
+    h = hashlib.blake2b(digest_size=8)
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        if os.path.basename(path) != "app1.py":
+            with open(path, "rb") as fh:
+                h.update(fh.read())
+    return h.hexdigest()
+
+
+VERSION_CODIGO = code_version()
+
+
+def _update(h, value):
+    # Tipo y contenido; los contenedores se recorren en orden
+    h.update(type(value).__name__.encode())
+    if isinstance(value, np.ndarray):
+        a = np.ascontiguousarray(value)
+        h.update(str((a.dtype.str, a.shape)).encode())
+        h.update(a.view(np.uint8) if a.dtype != object else repr(a.tolist()).encode())
+    elif isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        columns = value.columns if isinstance(value, pd.DataFrame) else [getattr(value, "name", None)]
+        h.update(repr(list(columns)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index)).to_numpy())
+    elif isinstance(value, (list, tuple)):
+        h.update(str(len(value)).encode())
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        for k in sorted(value, key=repr):
+            _update(h, k)
+            _update(h, value[k])
+    else:
+        h.update(repr(value).encode())
+
+
+def content_key(namespace, *parts):
+    """Llave hexadecimal a partir del contenido de ``parts``."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(namespace.encode())
+    for part in parts:
+        _update(h, part)
+    return f"{namespace}:{h.hexdigest()}"
+
+
+class DiskCache:
+    """Almacén llave -> objeto en SQLite con desalojo LRU por tamaño (seguro entre hilos y procesos)."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_MB * 2**20, filename=ARCHIVO_CACHE):
+        self.path = os.path.join(directory, filename)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()
+        self._size_lock = threading.Lock()
+        self._size_estimate = None
+        self._writes = 0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entradas ("
+                         "llave TEXT PRIMARY KEY, valor BLOB NOT NULL, "
+                         "tamano INTEGER NOT NULL, acceso REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON entradas (acceso)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT valor FROM entradas WHERE llave = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE entradas SET acceso = ? WHERE llave = ?", (time.time(), key))
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            row = None
+        if row is None:
+            self.misses += 1
+            return default
+        try:
+            value = pickle.loads(row[0])
+        except Exception:  # entrada ilegible o de otra versión de una clase: se descarta
+            self.errors += 1
+            self.misses += 1
+            self.discard(key)
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return value
+        try:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO entradas (llave, valor, tamano, acceso) "
+                         "VALUES (?, ?, ?, ?)", (key, blob, len(blob), time.time()))
+            if self._should_check_size(len(blob)):
+                self._evict(conn)
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+        return value
+
+    def _should_check_size(self, size):
+        # Un reemplazo cuenta dos veces en la estimación: solo adelanta el recálculo
+        with self._size_lock:
+            self._writes += 1
+            if self._size_estimate is None or self._writes % REVISION_TAMANO == 0:
+                return True
+            self._size_estimate += size
+            return self._size_estimate > self.max_bytes
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM entradas").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            keys = []
+            for key, size in conn.execute("SELECT llave, tamano FROM entradas ORDER BY acceso"):
+                keys.append((key,))
+                total -= size
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM entradas WHERE llave = ?", keys)
+        with self._size_lock:
+            self._size_estimate = total
+
+    def discard(self, key):
+        try:
+            self._connection().execute("DELETE FROM entradas WHERE llave = ?", (key,))
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entradas")
+        with self._size_lock:
+            self._size_estimate = 0
+
+    def stats(self):
+        """Entradas, bytes, aciertos, fallos y errores de este proceso."""
+        try:
+            count, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM entradas").fetchone()
+        except (sqlite3.Error, OSError):
+            count, size = 0, 0
+        return {"entries": count, "bytes": size, "hits": self.hits, "misses": self.misses,
+                "errors": self.errors}
+
+    def memoize(self, namespace, daily=False):
+        """
+        Decorador: memoiza la función por el contenido de sus argumentos
+        (con los valores por defecto aplicados). ``daily=True`` agrega la
+        fecha a la llave, para funciones que usan "hoy" como fecha final.
+        """
+        def decorator(func):
+            sig = signature(func)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                parts = (VERSION_CODIGO, bound.arguments, date.today().isoformat() if daily else None)
+                key = content_key(namespace, *parts)
+                value = self.get(key, _FALTANTE)
+                if value is _FALTANTE:
+                    value = self.set(key, func(*args, **kwargs))
+                return value
+            return wrapper
+        return decorator
+
+
+_compartido = None
+_compartido_lock = threading.Lock()
+
+
+def shared_cache():
+    """Almacén del proceso (``None`` si ``ALPEK_DISK_CACHE=0``)."""
+    global _compartido
+    if not CACHE_ACTIVO:
+        return None
+    with _compartido_lock:
+        if _compartido is None:
+            _compartido = DiskCache()
+        return _compartido
+
+
+def persistent(namespace, daily=False):
+    """``DiskCache.memoize`` sobre el almacén compartido; sin almacén, no hace nada."""
+    cache = shared_cache()
+    if cache is None:
+        return lambda func: func
+    return cache.memoize(namespace, daily=daily)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estado o limpieza del caché en disco.")
+    parser.add_argument("--dir", default=CACHE_DIR)
+    parser.add_argument("--clear", action="store_true", help="Elimina todas las entradas")
+    args = parser.parse_args(argv)
+    cache = DiskCache(args.dir)
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"{cache.path}: {stats['entries']} entradas, {stats['bytes'] / 2**20:.1f} MiB "
+          f"(límite {cache.max_bytes / 2**20:.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
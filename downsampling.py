@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Reducción de puntos antes de graficar.
+
+``lttb`` implementa Largest-Triangle-Three-Buckets y ``minmax_indices`` toma
+el mínimo y el máximo de cada cubeta. Ambas devuelven índices sobre la serie
+original, de modo que el mismo recorte se aplica a la columna de fechas y a
+columnas secundarias. ``downsample_frame`` conserva siempre el primer y el
+último punto y los extremos globales que usan las anotaciones.
+"""
+
+import numpy as np
+
+MAX_PUNTOS_GRAFICA = 2000
+METODOS = ("lttb", "minmax")
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').view(np.int64).astype(np.float64)
+    return x.astype(np.float64, copy=False)
+
+
+def minmax_indices(y, n_out):
+    """Índices de mínimo y máximo por cubeta (``n_out // 2`` cubetas)."""
+    y = _as_float(y)
+    n = y.size
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    # Rellenar NaN para que argmin/argmax ignoren huecos
+    ymin = np.where(np.isnan(y), np.inf, y)
+    ymax = np.where(np.isnan(y), -np.inf, y)
+    mins = np.minimum.reduceat(ymin, edges[:-1])
+    maxs = np.maximum.reduceat(ymax, edges[:-1])
+    # Posición del extremo dentro de cada cubeta
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    is_min = ymin == mins[bucket]
+    is_max = ymax == maxs[bucket]
+    idx_min = np.full(n_buckets, -1)
+    idx_max = np.full(n_buckets, -1)
+    # Primer índice que cumple, por cubeta (recorrido inverso: el último escrito gana)
+    pos = np.arange(n)
+    idx_min[bucket[is_min][::-1]] = pos[is_min][::-1]
+    idx_max[bucket[is_max][::-1]] = pos[is_max][::-1]
+    idx = np.concatenate([idx_min, idx_max])
+    return np.unique(idx[idx >= 0])
+
+
+def lttb(x, y, n_out):
+    """Índices seleccionados por Largest-Triangle-Three-Buckets."""
+    x = _as_float(x)
+    y = _as_float(y)
+    n = y.size
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # NaN (p. ej. inicio de ventanas móviles) se tratan como el valor previo válido
+    if np.isnan(y).any():
+        valid = ~np.isnan(y)
+        if not valid.any():
+            return np.linspace(0, n - 1, n_out).astype(np.int64)
+        fill = np.maximum.accumulate(np.where(valid, np.arange(n), 0))
+        y = y[fill]
+        y[:valid.argmax()] = y[valid.argmax()]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Promedio de cada cubeta (para el tercer vértice del triángulo)
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = avg_x[b + 1], avg_y[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(area.argmax())
+        selected[b + 1] = a
+    return selected
+
+
+def downsample_indices(x, y, max_points=MAX_PUNTOS_GRAFICA, method="lttb"):
+    """Índices a graficar, incluyendo extremos globales de ``y``."""
+    y_arr = _as_float(y)
+    n = y_arr.size
+    if n <= max_points:
+        return np.arange(n)
+    if method == "lttb":
+        idx = lttb(x, y_arr, max_points)
+    elif method == "minmax":
+        idx = minmax_indices(y_arr, max_points)
+    else:
+        raise ValueError(f"Método de reducción desconocido: {method!r}; use uno de {METODOS}")
+    extremos = [0, n - 1]
+    if not np.isnan(y_arr).all():
+        extremos += [int(np.nanargmax(y_arr)), int(np.nanargmin(y_arr))]
+    return np.union1d(idx, extremos)
+
+
+def downsample_frame(frame, x_column, y_column, max_points=MAX_PUNTOS_GRAFICA, method="lttb"):
+    """Filas de ``frame`` seleccionadas a partir de ``y_column``."""
+    if len(frame) <= max_points:
+        return frame
+    idx = downsample_indices(frame[x_column].to_numpy(), frame[y_column].to_numpy(),
+                             max_points=max_points, method=method)
+    return frame.iloc[idx]
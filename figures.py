@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Fábrica de figuras del tablero.
+
+Las variantes de línea, barras y área se generan a partir de una sola
+especificación (``CHART_SPECS``) en lugar de ramas duplicadas. Las figuras
+construidas se guardan en un caché LRU por proceso con llave
+(huella de los datos, tipo de gráfica, opciones), de modo que un rerun con
+las mismas entradas no vuelve a construir ni validar objetos de Plotly; el
+caché global también las guarda serializadas en el caché en disco.
+
+La figura de recompra reutiliza una figura base en caché (traza de precio,
+ejes y estilo) y solo sustituye la traza de impacto y el título cuando
+cambia el porcentaje; las variantes por porcentaje no se guardan. Las
+figuras devueltas desde el caché se comparten entre sesiones: no deben
+modificarse después de obtenerlas.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from disk_cache import VERSION_CODIGO, content_key, shared_cache
+from lazy_imports import lazy_import
+
+# Plotly se carga al construir la primera figura
+go = lazy_import("plotly.graph_objects")
+
+COLOR_PRECIO = '#3498db'
+COLOR_IMPACTO = '#e74c3c'
+COLOR_BANDA = 'rgba(52, 152, 219, 0.2)'
+
+# Tipo de traza (nombre en ``plotly.graph_objects``) y argumentos por variante de gráfica
+CHART_SPECS = {
+    "Gráfico de Línea": {"trace": "Scatter", "kwargs": {"mode": "lines"}},
+    "Gráfico de Barras": {"trace": "Bar", "kwargs": {}},
+    "Gráfico de Área": {"trace": "Scatter", "kwargs": {"mode": "lines", "fill": "tozeroy"}},
+    # Las velas solo aplican a la gráfica de precio con OHLC; las demás series se dibujan como línea
+    "Gráfico de Velas": {"trace": "Scatter", "kwargs": {"mode": "lines"}},
+}
+CHART_TYPES = tuple(CHART_SPECS)
+VELAS = "Gráfico de Velas"
+
+MAX_FIGURAS_CACHE = 128
+
+
+def fingerprint(*arrays):
+    """Huella (blake2b) del contenido de uno o varios arreglos."""
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str((a.dtype.str, a.shape)).encode())
+        h.update(a.view(np.uint8) if a.dtype != object else repr(a.tolist()).encode())
+    return h.hexdigest()
+
+
+class FigureCache:
+    """
+    Caché LRU de figuras, seguro entre hilos (una sesión por hilo en Streamlit).
+
+    Con ``store`` (un ``disk_cache.DiskCache``) las figuras también se guardan
+    serializadas (``to_plotly_json``) en disco; un fallo en memoria busca ahí
+    antes de construir, y reconstruir desde el diccionario es varias veces
+    más rápido que volver a armar la figura. La serialización y la escritura
+    se hacen en un hilo de fondo, fuera del rerun que construyó la figura.
+    """
+
+    def __init__(self, maxsize=MAX_FIGURAS_CACHE, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer = None
+        self.hits = 0
+        self.misses = 0
+
+    def _store_key(self, key):
+        return content_key("figura", VERSION_CODIGO, key)
+
+    def get(self, key):
+        with self._lock:
+            fig = self._data.get(key)
+            if fig is not None:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return fig
+        if self.store is not None:
+            data = self.store.get(self._store_key(key))
+            if data is not None:
+                with self._lock:
+                    self.hits += 1
+                return self._remember(key, go.Figure(data))
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, fig):
+        with self._lock:
+            self._data[key] = fig
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return fig
+
+    def _persist(self, key, fig):
+        self.store.set(self._store_key(key), fig.to_plotly_json())
+
+    def put(self, key, fig):
+        if self.store is not None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="figuras-disco")
+            self._writer.submit(self._persist, key, fig)
+        return self._remember(key, fig)
+
+    def flush(self):
+        """Espera a que terminen las escrituras pendientes en disco."""
+        with self._lock:
+            writer = self._writer
+        if writer is not None:
+            writer.submit(lambda: None).result()
+
+    def get_or_build(self, key, builder):
+        fig = self.get(key)
+        if fig is None:
+            fig = self.put(key, builder())
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+FIGURE_CACHE = FigureCache(store=shared_cache())
+
+
+def series_trace(chart_type, x, y, name, color, **extra):
+    """Traza de una serie según la variante de gráfica seleccionada."""
+    spec = CHART_SPECS[chart_type]
+    style = {"marker_color": color} if spec["trace"] == "Bar" else {"line": dict(color=color)}
+    trace = getattr(go, spec["trace"])
+    return trace(x=x, y=y, name=name, **spec["kwargs"], **style, **extra)
+
+
+def _build_price_figure(x, y, chart_type, title, annotations, bands, ohlc):
+    if chart_type == VELAS and ohlc is not None:
+        open_, high, low, close = ohlc
+        fig = go.Figure(go.Candlestick(x=x, open=open_, high=high, low=low, close=close,
+                                       name='Precio ($MXN)', showlegend=False))
+        fig.update_layout(xaxis_rangeslider_visible=False)
+    else:
+        fig = go.Figure(series_trace(chart_type, x, y, 'Precio ($MXN)', COLOR_PRECIO,
+                                     showlegend=False))
+    for ax, ay, text in annotations:
+        fig.add_annotation(x=ax, y=ay, text=text, showarrow=True, arrowhead=1)
+    if bands is not None:
+        bx, upper, lower = bands
+        fig.add_trace(go.Scatter(
+            x=bx, y=upper,
+            line=dict(color='rgba(0,0,0,0)'),
+            showlegend=False,
+            name='Banda Superior'
+        ))
+        fig.add_trace(go.Scatter(
+            x=bx, y=lower,
+            line=dict(color='rgba(0,0,0,0)'),
+            fill='tonexty',
+            fillcolor=COLOR_BANDA,
+            showlegend=False,
+            name='Banda Inferior'
+        ))
+    fig.update_layout(
+        title=title,
+        hovermode="x unified",
+        xaxis_title="Fecha",
+        yaxis_title="Precio ($MXN)",
+        height=500
+    )
+    return fig
+
+
+def price_figure(x, y, chart_type, title, annotations=(), bands=None, ohlc=None, cache=FIGURE_CACHE):
+    """
+    Figura "Desempeño de la Acción".
+
+    ``annotations`` es una secuencia de tuplas ``(x, y, texto)``, ``bands``
+    una tupla ``(x, superior, inferior)`` o ``None`` y ``ohlc`` una tupla
+    ``(apertura, máximo, mínimo, cierre)`` que se usa con el gráfico de velas.
+    """
+    annotations = tuple(annotations)
+    arrays = (x, y) if bands is None else (x, y) + tuple(bands)
+    if chart_type == VELAS and ohlc is not None:
+        arrays += tuple(ohlc)
+    key = ("precio", fingerprint(*arrays), chart_type, title, annotations, bands is not None,
+           ohlc is not None)
+    return cache.get_or_build(
+        key, lambda: _build_price_figure(x, y, chart_type, title, annotations, bands, ohlc))
+
+
+def _buyback_title(buyback_percentage):
+    return f"Impacto Estimado de Recompra ({buyback_percentage}% de acciones) en Precio"
+
+
+def _build_buyback_base(x_price, y_price, x_impact, impact_base, chart_type):
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(series_trace(chart_type, x_price, y_price, "Precio Acción", COLOR_PRECIO),
+                  secondary_y=False)
+    fig.add_trace(series_trace(chart_type, x_impact, impact_base, "Impacto Recompra (%)", COLOR_IMPACTO),
+                  secondary_y=True)
+    fig.update_layout(
+        title=_buyback_title(0.0),
+        xaxis_title="Fecha",
+        yaxis_title="Precio ($MXN)",
+        yaxis2_title="Impacto (%)",
+        hovermode="x unified",
+        height=500
+    )
+    return fig
+
+
+def buyback_figure(x_price, y_price, x_impact, impact_base, buyback_percentage, chart_type,
+                   impact=None, cache=FIGURE_CACHE):
+    """
+    Figura "Impacto Estimado de Recompra".
+
+    ``impact_base`` es el impacto sin recompra; la traza mostrada es
+    ``impact`` si se proporciona (p. ej. la fila precalculada del escenario)
+    o ``impact_base * (1 + buyback_percentage / 10)``. Solo la figura base
+    se guarda en caché; cada porcentaje es una copia de ella con esa traza y
+    el título sustituidos.
+    """
+    key = ("recompra", fingerprint(x_price, y_price, x_impact, impact_base), chart_type)
+    base = cache.get_or_build(
+        key, lambda: _build_buyback_base(x_price, y_price, x_impact, impact_base, chart_type))
+    if impact is None:
+        impact = np.asarray(impact_base) * (1 + buyback_percentage / 10)
+    # Copia superficial del diccionario de la base: solo se reemplazan la traza
+    # de impacto y el título. Las trazas ya se validaron al construir la base,
+    # así que la figura se arma sin volver a validarlas.
+    spec = base.to_dict()
+    data = list(spec["data"])
+    data[1] = {**data[1], "y": impact}
+    layout = {**spec["layout"], "title": {**spec["layout"].get("title", {}),
+                                          "text": _buyback_title(buyback_percentage)}}
+    return go.Figure(data=data, layout=layout, _validate=False)
+
+
+def buyback_heatmap(x, grid, impact, cache=FIGURE_CACHE):
+    """Mapa de calor del impacto por fecha (x) y porcentaje de recompra (y)."""
+    key = ("recompra_mapa", fingerprint(x, grid, impact))
+
+    def build():
+        fig = go.Figure(go.Heatmap(
+            x=x, y=grid, z=impact,
+            colorscale="RdYlGn",
+            zmid=0,
+            colorbar=dict(title="Impacto (%)"),
+            hovertemplate="Fecha: %{x}<br>Recompra: %{y}%<br>Impacto: %{z:.2f}%<extra></extra>"
+        ))
+        fig.update_layout(
+            title="Impacto de Recompra por Escenario",
+            xaxis_title="Fecha",
+            yaxis_title="Recompra (%)",
+            height=450
+        )
+        return fig
+
+    return cache.get_or_build(key, build)
+
+
+METRICAS_RADAR = ("Crecimiento Anual (%)", "Margen EBITDA (%)", "Volatilidad (%)")
+
+
+def rolling_metric_figure(x, y, title, yaxis_title, reference=None, color=COLOR_PRECIO,
+                          cache=FIGURE_CACHE):
+    """Serie móvil de una métrica (ROIC, beta) con línea de referencia opcional."""
+    key = ("metrica_movil", fingerprint(x, y), title, yaxis_title, reference)
+
+    def build():
+        fig = go.Figure(go.Scatter(x=x, y=y, mode="lines", line=dict(color=color), name=yaxis_title))
+        if reference is not None:
+            fig.add_hline(y=reference, line_dash="dash", line_color="#7f8c8d")
+        fig.update_layout(title=title, yaxis_title=yaxis_title, hovermode="x unified",
+                          showlegend=False, height=350)
+        return fig
+
+    return cache.get_or_build(key, build)
+
+
+def sector_radar_figure(tendencias, metrics=METRICAS_RADAR):
+    """Radar de las métricas promedio por sector."""
+    metrics = [m for m in metrics if m in tendencias.columns]
+    theta = [m.replace(" (%)", "") for m in metrics]
+    values = tendencias[metrics].to_numpy(dtype=np.float64)
+    fig = go.Figure()
+    for sector, r in zip(tendencias["Sector"], values):
+        fig.add_trace(go.Scatterpolar(
+            r=r,
+            theta=theta,
+            fill='toself',
+            name=sector
+        ))
+    # El crecimiento puede ser negativo: el rango se ajusta a los datos
+    low = min(0.0, float(np.floor(values.min()))) if values.size else 0.0
+    high = max(30.0, float(np.ceil(values.max()))) if values.size else 30.0
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[low, high]
+            )),
+        showlegend=True,
+        title="Comparativa de Sectores - Múltiples Métricas",
+        height=500
+    )
+    return fig
+
+
+def correlation_heatmap(corr, title="Correlación de Rendimientos entre Sectores"):
+    """Mapa de calor de una matriz de correlación (DataFrame cuadrado)."""
+    fig = go.Figure(go.Heatmap(
+        x=list(corr.columns), y=list(corr.index), z=corr.to_numpy(),
+        colorscale="RdBu",
+        zmin=-1, zmax=1,
+        colorbar=dict(title="ρ"),
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>"
+    ))
+    fig.update_layout(title=title, height=450)
+    return fig
+
+
+def revenue_waterfall_figure(periodos, ingresos, title="Flujo de Ingresos Trimestral"):
+    """Cascada de ingresos: primer período, variación contra el anterior y total."""
+    ingresos = np.asarray(ingresos, dtype=np.float64)
+    fig = go.Figure(go.Waterfall(
+        name="Flujo Financiero",
+        orientation="v",
+        measure=["absolute"] + ["relative"] * (len(periodos) - 1) + ["total"],
+        x=list(periodos) + ["Total"],
+        y=[ingresos[0], *np.diff(ingresos), 0],
+        connector={"line": {"color": "rgb(63, 63, 63)"}},
+    ))
+    fig.update_layout(
+        title=title,
+        showlegend=False,
+        height=400
+    )
+    return fig
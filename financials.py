@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección "Datos Financieros Interactivos" y del ROIC.
+
+``FinancialStatements`` guarda los estados de resultados en un arreglo
+``trimestre x segmento x concepto`` (ingresos, costos, EBITDA, capex). El
+consolidado es una suma sobre el eje de segmentos y la utilidad, el margen
+y las variaciones contra el trimestre anterior y contra el mismo trimestre
+del año previo se calculan con operaciones vectorizadas sobre el arreglo
+completo, así que el costo de la tabla no depende de cuántos años se
+muestren. ``annual`` agrega por año con ``np.add.reduceat`` para las vistas
+largas.
+
+El ROIC sale de los mismos estados que la tabla: ``operating_statements``
+deriva la utilidad operativa (EBITDA menos depreciación) y el capital
+invertido (activos fijos acumulados con el capex más capital de trabajo).
+"""
+
+import numpy as np
+import pandas as pd
+
+from metrics import COLUMNA_CAPITAL_INVERTIDO, COLUMNA_EBIT
+from price_engine import make_rng
+
+# Años de historia generados; la tabla muestra los últimos y el ROIC los últimos TRIMESTRES_HISTORIA
+ANIOS_HISTORIA = 25
+TRIMESTRES_HISTORIA = 40
+
+TRIMESTRES = ("Q1", "Q2", "Q3", "Q4")
+CONCEPTOS = ("Ingresos", "Costos", "EBITDA", "Capex")
+SEGMENTOS = ("Poliéster", "Plásticos y Químicos")
+CONSOLIDADO = "Consolidado"
+BASE_INGRESOS = 1200
+BASE_COSTOS = 800
+# Participación de cada segmento en los ingresos y costos consolidados
+PARTICIPACION_SEGMENTOS = (0.7, 0.3)
+CRECIMIENTO_ANUAL = 0.03
+
+# Rango de variación (mínimo, máximo) por trimestre
+VARIACION_INGRESOS = ((-0.05, 0.10), (-0.03, 0.12), (-0.07, 0.08), (-0.02, 0.15))
+VARIACION_COSTOS = ((-0.03, 0.08), (-0.05, 0.10), (-0.07, 0.07), (-0.04, 0.09))
+# Gastos de operación sobre ingresos (EBITDA = utilidad bruta - gastos) y capex sobre ingresos
+RANGO_GASTOS = (0.08, 0.12)
+RANGO_CAPEX = (0.03, 0.07)
+# Depreciación trimestral de los activos fijos y capital de trabajo sobre ingresos anualizados
+TASA_DEPRECIACION = 0.025
+CAPITAL_TRABAJO = 0.25
+
+# Con más trimestres que este límite la cascada se agrega por año
+MAX_BARRAS_CASCADA = 40
+
+
+class FinancialStatements:
+    """
+    Estados de resultados trimestrales por segmento.
+
+    ``values`` tiene forma ``(trimestres, segmentos, conceptos)``; ``periods``
+    es un ``PeriodIndex`` (trimestral, o anual tras ``annual``).
+    """
+
+    def __init__(self, values, periods, segments=SEGMENTOS, items=CONCEPTOS):
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(periods), len(segments), len(items)):
+            raise ValueError("values debe tener forma (períodos, segmentos, conceptos)")
+        self.values = values
+        self.periods = pd.PeriodIndex(periods)
+        self.segments = tuple(segments)
+        self.items = tuple(items)
+
+    def __len__(self):
+        return len(self.periods)
+
+    @classmethod
+    def from_long(cls, frame, period_column="Trimestre", segment_column="Segmento",
+                  item_column="Concepto", value_column="Monto (M MXN)", freq="Q"):
+        """
+        Construye el arreglo desde un DataFrame en formato largo (un renglón
+        por trimestre, segmento y concepto). Sin columna de segmento todo
+        se asigna a un solo segmento; los renglones repetidos se suman.
+        """
+        periods = pd.PeriodIndex(frame[period_column], freq=freq)
+        period_codes, period_index = pd.factorize(periods, sort=True)
+        if segment_column in frame:
+            segment_codes, segments = pd.factorize(frame[segment_column])
+        else:
+            segment_codes, segments = np.zeros(len(frame), dtype=np.intp), [CONSOLIDADO]
+        item_codes, items = pd.factorize(frame[item_column])
+        values = np.zeros((len(period_index), len(segments), len(items)))
+        np.add.at(values, (period_codes, segment_codes, item_codes),
+                  frame[value_column].to_numpy(dtype=np.float64))
+        return cls(values, period_index, segments=list(segments), items=list(items))
+
+    def to_long(self):
+        """Formato largo (Trimestre, Segmento, Concepto, Monto)."""
+        n_p, n_s, n_i = self.values.shape
+        return pd.DataFrame({
+            "Trimestre": np.repeat(self.periods.astype(str), n_s * n_i),
+            "Segmento": np.tile(np.repeat(self.segments, n_i), n_p),
+            "Concepto": np.tile(self.items, n_p * n_s),
+            "Monto (M MXN)": self.values.ravel(),
+        })
+
+    def matrix(self, segment=None):
+        """Arreglo ``(períodos, conceptos)`` de un segmento o del consolidado (``None``)."""
+        if segment is None or segment == CONSOLIDADO:
+            return self.values.sum(axis=1)
+        return self.values[:, self.segments.index(segment)]
+
+    def item(self, name, segment=None):
+        return self.matrix(segment)[:, self.items.index(name)]
+
+    def last(self, n_periods):
+        """Los últimos ``n_periods`` períodos."""
+        return FinancialStatements(self.values[-n_periods:], self.periods[-n_periods:],
+                                   self.segments, self.items)
+
+    def annual(self):
+        """
+        Suma por año calendario; un año incompleto suma solo los trimestres
+        disponibles.
+        """
+        years = self.periods.year.to_numpy()
+        starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        values = np.add.reduceat(self.values, starts, axis=0)
+        periods = pd.PeriodIndex(years[starts], freq="Y")
+        return FinancialStatements(values, periods, self.segments, self.items)
+
+    @property
+    def periods_per_year(self):
+        return 4 if self.periods.freqstr.startswith("Q") else 1
+
+    def summary(self, segment=None):
+        """
+        Tabla por período: conceptos, utilidad (ingresos - costos), márgenes,
+        flujo libre (EBITDA - capex) y variaciones de ingresos contra el
+        período anterior y contra el mismo período del año previo.
+        """
+        m = self.matrix(segment)
+        ingresos = m[:, self.items.index("Ingresos")]
+        costos = m[:, self.items.index("Costos")]
+        utilidad = ingresos - costos
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns = {
+                **{name: m[:, j] for j, name in enumerate(self.items)},
+                "Utilidad": utilidad,
+                "Margen": utilidad / ingresos * 100,
+            }
+            if "EBITDA" in self.items:
+                columns["Margen EBITDA"] = m[:, self.items.index("EBITDA")] / ingresos * 100
+                if "Capex" in self.items:
+                    columns["Flujo Libre"] = (m[:, self.items.index("EBITDA")]
+                                              - m[:, self.items.index("Capex")])
+            columns["Δ Ingresos (%)"] = period_change(ingresos, 1)
+            if self.periods_per_year > 1:
+                columns["Δ Ingresos a/a (%)"] = period_change(ingresos, self.periods_per_year)
+        name = "Trimestre" if self.periods_per_year > 1 else "Año"
+        return pd.DataFrame(columns, index=pd.Index(self.periods.astype(str), name=name))
+
+
+def period_change(values, lag=1):
+    """Variación porcentual contra ``lag`` períodos antes."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] > lag:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[lag:] = (values[lag:] / values[:-lag] - 1) * 100
+    return out
+
+
+def synthetic_financials(years=1, segments=SEGMENTOS, seed=None, end=None,
+                         base_ingresos=BASE_INGRESOS, base_costos=BASE_COSTOS,
+                         variacion_ingresos=VARIACION_INGRESOS, variacion_costos=VARIACION_COSTOS,
+                         participacion=PARTICIPACION_SEGMENTOS, crecimiento=CRECIMIENTO_ANUAL):
+    """
+    Estados trimestrales sintéticos de ``years`` años calendario completos
+    que terminan en el último año cerrado antes de ``end`` (hoy por defecto).
+    Ingresos y costos varían dentro del rango de su trimestre alrededor de
+    una base que crece ``crecimiento`` por año y corresponde al último año;
+    cada segmento recibe su participación de la base.
+    """
+    rng = make_rng(seed)
+    end = pd.Timestamp.today() if end is None else pd.Timestamp(end)
+    periods = pd.period_range(start=pd.Period(end.year - years, freq="Y").asfreq("Q", "start"),
+                              periods=4 * years, freq="Q")
+    shape = (4 * years, len(segments))
+    quarter = periods.quarter.to_numpy() - 1
+    tendencia = ((1 + crecimiento) ** np.arange(1 - years, 1)).repeat(4)[:, None]
+    share = np.resize(np.asarray(participacion, dtype=np.float64), len(segments))
+    share = (share / share.sum())[None, :]
+
+    bajo_i, alto_i = np.asarray(variacion_ingresos, dtype=np.float64)[quarter].T
+    bajo_c, alto_c = np.asarray(variacion_costos, dtype=np.float64)[quarter].T
+    ingresos = base_ingresos * tendencia * share * (1 + rng.uniform(bajo_i[:, None], alto_i[:, None], shape))
+    costos = base_costos * tendencia * share * (1 + rng.uniform(bajo_c[:, None], alto_c[:, None], shape))
+    ebitda = ingresos - costos - ingresos * rng.uniform(*RANGO_GASTOS, shape)
+    capex = ingresos * rng.uniform(*RANGO_CAPEX, shape)
+    return FinancialStatements(np.stack([ingresos, costos, ebitda, capex], axis=-1), periods,
+                               segments=segments, items=CONCEPTOS)
+
+
+def financial_summary(statements, segment=None):
+    """Tabla del tablero: ``FinancialStatements.summary`` del segmento elegido."""
+    return statements.summary(None if segment == CONSOLIDADO else segment)
+
+
+
+def operating_statements(statements, segment=None, depreciacion=TASA_DEPRECIACION,
+                         capital_trabajo=CAPITAL_TRABAJO):
+    """
+    Utilidad operativa y capital invertido por trimestre a partir de los
+    estados de ``statements``. Los activos fijos arrancan en el nivel estable
+    del primer capex (capex / depreciación), suman el capex de cada trimestre
+    y se deprecian ``depreciacion`` por trimestre; la utilidad operativa es el
+    EBITDA menos esa depreciación y el capital invertido suma los activos
+    fijos y ``capital_trabajo`` veces los ingresos anualizados.
+    """
+    if statements.periods_per_year != 4:
+        raise ValueError("operating_statements requiere estados trimestrales")
+    ingresos = statements.item("Ingresos", segment)
+    capex = statements.item("Capex", segment)
+    # A_t = r A_{t-1} + capex_t con A_{-1} = capex_0 / d, resuelta como suma acumulada descontada
+    r = 1 - depreciacion
+    t = np.arange(len(capex))
+    activos = r ** t * (capex[0] / depreciacion * r + np.cumsum(capex * r ** -t))
+    gasto_depreciacion = depreciacion * (activos - capex) / r
+    return pd.DataFrame({
+        COLUMNA_EBIT: statements.item("EBITDA", segment) - gasto_depreciacion,
+        COLUMNA_CAPITAL_INVERTIDO: activos + capital_trabajo * 4 * ingresos,
+    }, index=pd.Index(statements.periods, name="Trimestre"))
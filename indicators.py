@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de indicadores sobre la serie de precios.
+
+``IndicatorSet`` calcula una sola vez rendimientos, medias y desviaciones
+móviles y extremos de la serie, y los guarda como arreglos columnares que
+leen las métricas, las anotaciones, las bandas de confianza, la gráfica de
+recompra y el informe ejecutivo. ``append`` agrega precios nuevos con costo
+O(ventana) por punto, sin recorrer de nuevo el histórico.
+"""
+
+import numpy as np
+import pandas as pd
+
+from price_engine import PRICE_COLUMN, DATE_COLUMN
+
+VENTANA_BANDAS = 20
+VENTANA_RECOMPRA = 5
+
+
+class IndicatorSet:
+    """Indicadores columnares de una serie de precios."""
+
+    def __init__(self, prices, dates=None, band_window=VENTANA_BANDAS,
+                 impact_window=VENTANA_RECOMPRA):
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.ndim != 1 or prices.size == 0:
+            raise ValueError("prices debe ser un arreglo 1-D no vacío")
+        self.band_window = band_window
+        self.impact_window = impact_window
+        self._n = 0
+        self._cols = {}
+        self._dates = None
+        self._reserve(prices.size)
+        if dates is not None:
+            self._dates = np.empty(self._capacity, dtype='datetime64[ns]')
+        self._bulk_load(prices, dates)
+
+    @classmethod
+    def from_frame(cls, frame, price_column=PRICE_COLUMN, date_column=DATE_COLUMN, **kwargs):
+        dates = frame[date_column].to_numpy() if date_column in frame else None
+        return cls(frame[price_column].to_numpy(), dates=dates, **kwargs)
+
+    # Almacenamiento con capacidad creciente (append amortizado O(1))
+    _COLUMNS = ("price", "ret", "ma", "std", "impact_base")
+
+    def _reserve(self, size):
+        capacity = max(size, 16)
+        if self._cols and capacity <= self._capacity:
+            return
+        if self._cols:
+            capacity = max(capacity, 2 * self._capacity)
+        for name in self._COLUMNS:
+            buf = np.full(capacity, np.nan)
+            if name in self._cols:
+                buf[:self._n] = self._cols[name][:self._n]
+            self._cols[name] = buf
+        if self._dates is not None:
+            dates = np.empty(capacity, dtype='datetime64[ns]')
+            dates[:self._n] = self._dates[:self._n]
+            self._dates = dates
+        self._capacity = capacity
+
+    def _bulk_load(self, prices, dates):
+        n = prices.size
+        serie = pd.Series(prices)
+        ret = serie.pct_change()
+        banda = serie.rolling(window=self.band_window)
+        cols = self._cols
+        cols["price"][:n] = prices
+        cols["ret"][:n] = ret.to_numpy()
+        cols["ma"][:n] = banda.mean().to_numpy()
+        cols["std"][:n] = banda.std().to_numpy()
+        cols["impact_base"][:n] = ret.rolling(window=self.impact_window).mean().to_numpy() * 100
+        if dates is not None:
+            self._dates[:n] = np.asarray(dates, dtype='datetime64[ns]')
+        self._n = n
+
+        # Estadísticos acumulados de rendimientos (Welford) y extremos
+        validos = ret.to_numpy()[1:]
+        self._ret_count = validos.size
+        self._ret_mean = validos.mean() if validos.size else 0.0
+        self._ret_m2 = ((validos - self._ret_mean) ** 2).sum() if validos.size else 0.0
+        self._argmax = int(prices.argmax())
+        self._argmin = int(prices.argmin())
+
+    def append(self, new_prices, new_dates=None):
+        """Agrega precios al final actualizando solo las ventanas afectadas."""
+        new_prices = np.atleast_1d(np.asarray(new_prices, dtype=np.float64))
+        if (self._dates is None) != (new_dates is None):
+            raise ValueError("new_dates es obligatorio si y solo si la serie tiene fechas")
+        if new_dates is not None:
+            new_dates = np.atleast_1d(np.asarray(new_dates, dtype='datetime64[ns]'))
+        self._reserve(self._n + new_prices.size)
+        cols = self._cols
+        for k, price in enumerate(new_prices):
+            i = self._n
+            prev = cols["price"][i - 1]
+            cols["price"][i] = price
+            ret = price / prev - 1
+            cols["ret"][i] = ret
+            if new_dates is not None:
+                self._dates[i] = new_dates[k]
+
+            if i + 1 >= self.band_window:
+                ventana = cols["price"][i + 1 - self.band_window:i + 1]
+                cols["ma"][i] = ventana.mean()
+                cols["std"][i] = ventana.std(ddof=1)
+            if i >= self.impact_window:
+                cols["impact_base"][i] = cols["ret"][i + 1 - self.impact_window:i + 1].mean() * 100
+
+            self._ret_count += 1
+            delta = ret - self._ret_mean
+            self._ret_mean += delta / self._ret_count
+            self._ret_m2 += delta * (ret - self._ret_mean)
+            if price > cols["price"][self._argmax]:
+                self._argmax = i
+            if price < cols["price"][self._argmin]:
+                self._argmin = i
+            self._n = i + 1
+        return self
+
+    def __len__(self):
+        return self._n
+
+    # Columnas
+    @property
+    def prices(self):
+        return self._cols["price"][:self._n]
+
+    @property
+    def dates(self):
+        return None if self._dates is None else self._dates[:self._n]
+
+    @property
+    def returns(self):
+        return self._cols["ret"][:self._n]
+
+    @property
+    def rolling_mean(self):
+        return self._cols["ma"][:self._n]
+
+    @property
+    def rolling_std(self):
+        return self._cols["std"][:self._n]
+
+    @property
+    def upper_band(self):
+        return self.rolling_mean + self.rolling_std
+
+    @property
+    def lower_band(self):
+        return self.rolling_mean - self.rolling_std
+
+    def buyback_impact(self, buyback_percentage):
+        """Columna 'Recompra Impacto (%)' para un porcentaje de recompra."""
+        return self._cols["impact_base"][:self._n] * (1 + buyback_percentage / 10)
+
+    def mean_buyback_impact(self, buyback_percentage):
+        return float(np.nanmean(self._cols["impact_base"][:self._n])) * (1 + buyback_percentage / 10)
+
+    # Escalares
+    @property
+    def mean_return_pct(self):
+        return self._ret_mean * 100 if self._ret_count else np.nan
+
+    @property
+    def volatility_pct(self):
+        if self._ret_count < 2:
+            return np.nan
+        return np.sqrt(self._ret_m2 / (self._ret_count - 1)) * 100
+
+    @property
+    def max_price(self):
+        return float(self._cols["price"][self._argmax])
+
+    @property
+    def min_price(self):
+        return float(self._cols["price"][self._argmin])
+
+    @property
+    def max_date(self):
+        return None if self._dates is None else pd.Timestamp(self._dates[self._argmax])
+
+    @property
+    def min_date(self):
+        return None if self._dates is None else pd.Timestamp(self._dates[self._argmin])
+
+    @property
+    def first_price(self):
+        return float(self._cols["price"][0])
+
+    @property
+    def last_price(self):
+        return float(self._cols["price"][self._n - 1])
+
+    @property
+    def is_bullish(self):
+        return self.last_price > self.first_price
+
+    def to_frame(self):
+        """DataFrame con las columnas que usa el tablero."""
+        frame = pd.DataFrame({
+            PRICE_COLUMN: self.prices,
+            'MA_20': self.rolling_mean,
+            'Upper': self.upper_band,
+            'Lower': self.lower_band,
+        })
+        if self._dates is not None:
+            frame.insert(0, DATE_COLUMN, self.dates)
+        return frame
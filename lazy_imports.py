@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Importaciones diferidas.
+
+``lazy_import`` devuelve un módulo que se ejecuta al acceder a su primer
+atributo, para que los módulos de cálculo no paguen al importarse el costo
+de bibliotecas pesadas (Plotly) que solo usan algunas rutas.
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Módulo que se ejecuta al acceder al primero de sus atributos
+    (``importlib.util.LazyLoader``); si ya estaba importado lo devuelve.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
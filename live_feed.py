@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Cotizaciones en vivo: consumidor asyncio y buffer circular de capacidad fija.
+
+Una fuente (``SyntheticSource``, ``ReplaySource`` o ``SocketSource``) produce
+tuplas ``(fecha, precio)`` de forma asíncrona. ``LiveFeed`` las consume en un
+hilo con su propio event loop y las escribe en un ``QuoteRing``: arreglos
+NumPy preasignados para fecha, precio, rendimiento e impacto base de
+recompra. Cada tick actualiza en O(1) el rendimiento, la media móvil del
+impacto y los estadísticos acumulados (Welford) de la sesión, así que la
+memoria no crece con el número de ticks; al llenarse, el buffer sobrescribe
+los ticks más antiguos.
+
+El tablero lee ``QuoteRing.snapshot()`` (copias ordenadas de tamaño acotado)
+en un fragmento con ``run_every`` y no reconstruye ningún DataFrame.
+
+Para generar un archivo de repetición de prueba::
+
+    python live_feed.py ticks.csv --ticks 23400 --interval 1
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import threading
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from indicators import VENTANA_RECOMPRA
+from price_engine import PRECIO_BASE, make_rng
+
+# Fuente del modo en vivo: synthetic, replay:<ruta> o tcp:<host>:<puerto>
+FUENTE_EN_VIVO = os.environ.get("ALPEK_LIVE_SOURCE", "synthetic")
+# Una sesión de 6.5 h a un tick por segundo
+CAPACIDAD_BUFFER = 23_400
+INTERVALO_REFRESCO = 2.0
+# Ticks entre recálculos exactos de la suma móvil (acota el error de redondeo acumulado)
+RECALCULO_VENTANA = 10_000
+INTERVALO_SINTETICO = 0.5
+VOLATILIDAD_TICK = 0.0008
+COLUMNA_TIEMPO = "timestamp"
+COLUMNA_PRECIO = "price"
+
+
+def parse_quote(text):
+    """Convierte ``"fecha,precio"`` en ``(datetime64[ns], float)``."""
+    stamp, price = text.strip().split(",")[:2]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            date = np.datetime64(stamp, "ns")
+    except (ValueError, UserWarning):
+        # Formatos que NumPy no reconoce o con zona horaria: pandas los normaliza a UTC
+        parsed = pd.Timestamp(stamp)
+        if parsed.tzinfo is not None:
+            parsed = parsed.tz_convert("UTC").tz_localize(None)
+        date = parsed.as_unit("ns").to_datetime64()
+    return date, float(price)
+
+
+class SyntheticSource:
+    """Caminata aleatoria con marca de tiempo del reloj local."""
+
+    def __init__(self, start=PRECIO_BASE, interval=INTERVALO_SINTETICO,
+                 volatility=VOLATILIDAD_TICK, seed=None):
+        self.start = start
+        self.interval = interval
+        self.volatility = volatility
+        self.seed = seed
+
+    async def stream(self):
+        rng = make_rng(self.seed)
+        price = float(self.start)
+        while True:
+            price *= 1 + self.volatility * rng.standard_normal()
+            yield np.datetime64(pd.Timestamp.now().as_unit("ns").to_datetime64()), price
+            await asyncio.sleep(self.interval)
+
+
+class ReplaySource:
+    """
+    Repite un CSV con columnas ``timestamp,price`` respetando el espaciado
+    original entre ticks dividido entre ``speed`` (``speed=None`` no espera).
+    El archivo se lee línea por línea.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, time_column=COLUMNA_TIEMPO,
+                 price_column=COLUMNA_PRECIO):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.time_column = time_column
+        self.price_column = price_column
+
+    async def stream(self):
+        while True:
+            previous = None
+            with open(self.path, newline="", encoding="utf-8") as fh:
+                for row in csv.DictReader(fh):
+                    stamp, price = parse_quote(f"{row[self.time_column]},{row[self.price_column]}")
+                    if self.speed and previous is not None:
+                        gap = (stamp - previous) / np.timedelta64(1, "s") / self.speed
+                        await asyncio.sleep(max(gap, 0.0))
+                    else:
+                        await asyncio.sleep(0)
+                    previous = stamp
+                    yield stamp, price
+            if not self.loop:
+                return
+
+
+class SocketSource:
+    """Líneas ``fecha,precio`` desde un socket TCP."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = int(port)
+
+    async def stream(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    yield parse_quote(line.decode("utf-8"))
+        finally:
+            writer.close()
+
+
+def source_from_spec(spec):
+    """
+    Fuente a partir de una especificación de texto: ``synthetic``,
+    ``replay:<ruta>`` o ``tcp:<host>:<puerto>``.
+    """
+    kind, _, rest = spec.partition(":")
+    if kind == "synthetic":
+        return SyntheticSource()
+    if kind == "replay" and rest:
+        return ReplaySource(rest, loop=True)
+    if kind == "tcp" and rest:
+        host, _, port = rest.rpartition(":")
+        return SocketSource(host, port)
+    raise ValueError(f"Fuente de cotizaciones desconocida: {spec!r}")
+
+
+@dataclass
+class LiveSnapshot:
+    """Copia ordenada (del más antiguo al más reciente) del buffer."""
+    dates: np.ndarray
+    prices: np.ndarray
+    returns: np.ndarray
+    impact_base: np.ndarray
+    version: int
+
+
+class QuoteRing:
+    """Buffer circular de ticks con columnas paralelas preasignadas (seguro entre hilos)."""
+
+    def __init__(self, capacity=CAPACIDAD_BUFFER, impact_window=VENTANA_RECOMPRA):
+        if capacity < 2:
+            raise ValueError("capacity debe ser al menos 2")
+        if not 1 <= impact_window <= capacity:
+            raise ValueError("impact_window debe estar entre 1 y capacity")
+        self.capacity = capacity
+        self.impact_window = impact_window
+        self._dates = np.zeros(capacity, dtype="datetime64[ns]")
+        self._prices = np.full(capacity, np.nan)
+        self._returns = np.full(capacity, np.nan)
+        self._impact = np.full(capacity, np.nan)
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.version = 0
+        # Suma de los últimos ``impact_window`` rendimientos (media móvil en O(1))
+        self._window_sum = 0.0
+        self._window_count = 0
+        # Estadísticos acumulados de la sesión
+        self.first_price = np.nan
+        self.max_price = -np.inf
+        self.min_price = np.inf
+        self._ret_count = 0
+        self._ret_mean = 0.0
+        self._ret_m2 = 0.0
+
+    def __len__(self):
+        return self._size
+
+    def _at(self, back):
+        # Posición física del tick ``back`` lugares antes del más reciente
+        return (self._head - 1 - back) % self.capacity
+
+    def append(self, date, price):
+        price = float(price)
+        with self._lock:
+            i = self._head
+            ret = np.nan
+            if self._size:
+                ret = price / self._prices[self._at(0)] - 1
+                if self._window_count == self.impact_window:
+                    # Sale de la ventana el rendimiento de hace ``impact_window`` ticks
+                    self._window_sum -= self._returns[self._at(self.impact_window - 1)]
+                else:
+                    self._window_count += 1
+                self._window_sum += ret
+                self._ret_count += 1
+                delta = ret - self._ret_mean
+                self._ret_mean += delta / self._ret_count
+                self._ret_m2 += delta * (ret - self._ret_mean)
+            else:
+                self.first_price = price
+
+            self._dates[i] = date
+            self._prices[i] = price
+            self._returns[i] = ret
+            if self._window_count == self.impact_window and self._ret_count % RECALCULO_VENTANA == 0:
+                # La suma incremental acumula error de redondeo en sesiones largas
+                window = (i - np.arange(self.impact_window)) % self.capacity
+                self._window_sum = float(self._returns[window].sum())
+            self._impact[i] = (self._window_sum / self.impact_window * 100
+                               if self._window_count == self.impact_window else np.nan)
+            self.max_price = max(self.max_price, price)
+            self.min_price = min(self.min_price, price)
+            self._head = (i + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self.version += 1
+
+    def extend(self, dates, prices):
+        for date, price in zip(dates, prices):
+            self.append(date, price)
+
+    def snapshot(self):
+        """Copias ordenadas de las columnas; el costo depende de la capacidad, no de la sesión."""
+        with self._lock:
+            start = (self._head - self._size) % self.capacity
+            order = (start + np.arange(self._size)) % self.capacity
+            return LiveSnapshot(
+                dates=self._dates[order],
+                prices=self._prices[order],
+                returns=self._returns[order],
+                impact_base=self._impact[order],
+                version=self.version,
+            )
+
+    @property
+    def last_price(self):
+        with self._lock:
+            return self._prices[self._at(0)] if self._size else np.nan
+
+    @property
+    def change_pct(self):
+        """Variación (%) del último precio contra el primero de la sesión."""
+        return (self.last_price / self.first_price - 1) * 100
+
+    @property
+    def mean_return_pct(self):
+        return self._ret_mean * 100 if self._ret_count else np.nan
+
+    @property
+    def volatility_pct(self):
+        if self._ret_count < 2:
+            return np.nan
+        return np.sqrt(self._ret_m2 / (self._ret_count - 1)) * 100
+
+
+class LiveFeed:
+    """Consume una fuente asíncrona en un hilo de fondo y llena un ``QuoteRing``."""
+
+    def __init__(self, source, capacity=CAPACIDAD_BUFFER):
+        self.source = source
+        self.ring = QuoteRing(capacity)
+        self.error = None
+        self._thread = None
+        self._loop = None
+        self._task = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self.error = None
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._consume())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as exc:  # la falla se muestra en el tablero
+            self.error = exc
+        finally:
+            self._loop.close()
+
+    async def _consume(self):
+        async for date, price in self.source.stream():
+            self.ring.append(date, price)
+
+    def stop(self, timeout=5.0):
+        if self.running and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+            self._thread.join(timeout)
+
+
+def write_replay(path, n_ticks=CAPACIDAD_BUFFER, interval=1.0, start=PRECIO_BASE,
+                 volatility=VOLATILIDAD_TICK, seed=None, begin=None):
+    """Escribe un CSV de repetición ``timestamp,price`` con una caminata aleatoria."""
+    rng = make_rng(seed)
+    begin = pd.Timestamp.today().normalize() + pd.Timedelta(hours=8, minutes=30) if begin is None else begin
+    stamps = pd.date_range(begin, periods=n_ticks, freq=pd.Timedelta(seconds=interval))
+    prices = start * np.cumprod(1 + volatility * rng.standard_normal(n_ticks))
+    pd.DataFrame({COLUMNA_TIEMPO: stamps, COLUMNA_PRECIO: prices.round(4)}).to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un archivo de repetición de cotizaciones.")
+    parser.add_argument("path", help="CSV de salida")
+    parser.add_argument("--ticks", type=int, default=CAPACIDAD_BUFFER)
+    parser.add_argument("--interval", type=float, default=1.0, help="Segundos entre ticks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    write_replay(args.path, args.ticks, interval=args.interval, seed=args.seed)
+    print(f"{args.ticks} ticks escritos en {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Ingesta de datos de mercado históricos desde CSV.
+
+El CSV se lee una sola vez, por bloques, y se convierte a un almacén
+columnar: un archivo binario por columna (fechas como int64 en ns y valores
+como float64) más un ``meta.json`` por emisora. Después, ``MarketDataStore``
+abre las columnas como ``np.memmap`` y sirve rebanadas por rango de fechas
+con ``searchsorted``, sin volver a leer ni parsear el archivo original.
+
+Uso desde la terminal::
+
+    python market_data.py datos/alpek.csv --store data/store \\
+        --date-column Date --price-column Close --ticker ALPEKA
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from price_engine import PRICE_COLUMN, DATE_COLUMN
+
+STORE_DIR = os.environ.get("ALPEK_DATA_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "store"))
+# Emisora del almacén usada como índice de referencia para la beta
+BENCHMARK_TICKER = os.environ.get("ALPEK_BENCHMARK", "MEXBOL")
+CHUNK_ROWS = 1_000_000
+META_FILE = "meta.json"
+DATES_FILE = "__dates__.bin"
+
+
+def _column_file(column):
+    return f"{column}.bin"
+
+
+def _source_signature(path):
+    info = os.stat(path)
+    return {"path": os.path.abspath(path), "size": info.st_size, "mtime": info.st_mtime}
+
+
+def _read_meta(ticker_dir):
+    try:
+        with open(os.path.join(ticker_dir, META_FILE), encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+class _TickerWriter:
+    """Escribe bloques de una emisora anexando a los archivos por columna."""
+
+    def __init__(self, ticker_dir, columns):
+        os.makedirs(ticker_dir, exist_ok=True)
+        self.ticker_dir = ticker_dir
+        self.columns = columns
+        self.rows = 0
+        self.sorted = True
+        self._last = None
+        self._files = {
+            DATES_FILE: open(os.path.join(ticker_dir, DATES_FILE), "wb"),
+            **{c: open(os.path.join(ticker_dir, _column_file(c)), "wb") for c in columns},
+        }
+
+    def write(self, dates, values):
+        if dates.size == 0:
+            return
+        if self._last is not None and dates[0] < self._last:
+            self.sorted = False
+        if self.sorted and dates.size > 1 and (np.diff(dates) < 0).any():
+            self.sorted = False
+        self._last = dates[-1]
+        dates.tofile(self._files[DATES_FILE])
+        for c in self.columns:
+            values[c].tofile(self._files[c])
+        self.rows += dates.size
+
+    def abort(self):
+        for fh in self._files.values():
+            fh.close()
+
+    def close(self, meta):
+        for fh in self._files.values():
+            fh.close()
+        if not self.sorted:
+            self._sort()
+        meta = dict(meta, rows=self.rows, columns=self.columns)
+        with open(os.path.join(self.ticker_dir, META_FILE), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, ensure_ascii=False, indent=2)
+
+    def _sort(self):
+        # Orden estable por fecha; se reescribe cada columna una vez
+        dates_path = os.path.join(self.ticker_dir, DATES_FILE)
+        dates = np.fromfile(dates_path, dtype=np.int64)
+        order = np.argsort(dates, kind="stable")
+        dates[order].tofile(dates_path)
+        for c in self.columns:
+            path = os.path.join(self.ticker_dir, _column_file(c))
+            np.fromfile(path, dtype=np.float64)[order].tofile(path)
+
+
+def ingest_csv(csv_path, store_dir=STORE_DIR, date_column="Date", price_column="Close",
+               ticker=None, ticker_column=None, value_columns=None, chunk_rows=CHUNK_ROWS,
+               force=False, **read_csv_kwargs):
+    """
+    Convierte ``csv_path`` al almacén columnar y devuelve las emisoras escritas.
+
+    El CSV puede traer una sola emisora (``ticker``) o varias en formato largo
+    (``ticker_column``). Si el almacén ya se generó a partir del mismo archivo
+    (misma ruta, tamaño y fecha de modificación) no se vuelve a leer, salvo
+    con ``force=True``.
+    """
+    if (ticker is None) == (ticker_column is None):
+        raise ValueError("Indique exactamente uno de ticker o ticker_column")
+
+    source = _source_signature(csv_path)
+    if ticker is not None and not force:
+        meta = _read_meta(os.path.join(store_dir, ticker))
+        if meta is not None and meta.get("source") == source:
+            return [ticker]
+
+    writers = {}
+    reader = pd.read_csv(csv_path, chunksize=chunk_rows, **read_csv_kwargs)
+    try:
+        for chunk in reader:
+            if value_columns is None:
+                excluded = {date_column, ticker_column}
+                value_columns = [c for c in chunk.columns
+                                 if c not in excluded and pd.api.types.is_numeric_dtype(chunk[c])]
+                if price_column not in value_columns:
+                    raise KeyError(f"Columna de precio '{price_column}' no encontrada o no numérica")
+            chunk[date_column] = pd.to_datetime(chunk[date_column])
+            groups = [(ticker, chunk)] if ticker is not None else chunk.groupby(ticker_column, sort=False)
+            for name, group in groups:
+                name = str(name)
+                if name not in writers:
+                    ticker_dir = os.path.join(store_dir, name)
+                    shutil.rmtree(ticker_dir, ignore_errors=True)
+                    writers[name] = _TickerWriter(ticker_dir, list(value_columns))
+                dates = group[date_column].to_numpy(dtype="datetime64[ns]").view(np.int64)
+                values = {c: group[c].to_numpy(dtype=np.float64) for c in value_columns}
+                writers[name].write(dates, values)
+    except BaseException:
+        # Sin meta.json la emisora no se considera válida en el almacén
+        for writer in writers.values():
+            writer.abort()
+        raise
+    meta = {"source": source, "price_column": price_column}
+    for writer in writers.values():
+        writer.close(meta)
+    return list(writers)
+
+
+class MarketDataStore:
+    """Acceso por rango de fechas al almacén columnar (memoria mapeada)."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self._opened = {}
+
+    @property
+    def tickers(self):
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(d for d in os.listdir(self.store_dir)
+                      if _read_meta(os.path.join(self.store_dir, d)) is not None)
+
+    def _open(self, ticker):
+        if ticker not in self._opened:
+            ticker_dir = os.path.join(self.store_dir, ticker)
+            meta = _read_meta(ticker_dir)
+            if meta is None:
+                raise KeyError(f"Emisora '{ticker}' no está en el almacén {self.store_dir}")
+            rows = meta["rows"]
+
+            def mapped(name, dtype):
+                if rows == 0:
+                    return np.empty(0, dtype=dtype)
+                return np.memmap(os.path.join(ticker_dir, name), dtype=dtype, mode="r", shape=(rows,))
+
+            columns = {c: mapped(_column_file(c), np.float64) for c in meta["columns"]}
+            self._opened[ticker] = (meta, mapped(DATES_FILE, np.int64), columns)
+        return self._opened[ticker]
+
+    def rows(self, ticker):
+        return self._open(ticker)[0]["rows"]
+
+    def date_range(self, ticker):
+        """Primera y última fecha disponibles."""
+        _, dates, _ = self._open(ticker)
+        if dates.size == 0:
+            return None, None
+        return pd.Timestamp(dates[0]), pd.Timestamp(dates[-1])
+
+    def slice(self, ticker, start=None, end=None, columns=None):
+        """Filas con ``start <= fecha <= end`` como DataFrame (copia de la rebanada)."""
+        meta, dates, data = self._open(ticker)
+        lo = 0 if start is None else np.searchsorted(dates, pd.Timestamp(start).value, side="left")
+        hi = dates.size if end is None else np.searchsorted(dates, pd.Timestamp(end).value, side="right")
+        columns = meta["columns"] if columns is None else columns
+        frame = pd.DataFrame({c: np.array(data[c][lo:hi]) for c in columns})
+        frame.insert(0, DATE_COLUMN, np.array(dates[lo:hi]).view("datetime64[ns]"))
+        return frame
+
+    def prices_at(self, ticker, dates):
+        """Último precio en o antes de cada fecha de ``dates`` (NaN si no hay)."""
+        meta, stored, data = self._open(ticker)
+        keys = pd.DatetimeIndex(dates).as_unit("ns").asi8
+        idx = np.searchsorted(stored, keys, side="right") - 1
+        out = np.full(keys.size, np.nan)
+        valid = idx >= 0
+        out[valid] = data[meta["price_column"]][idx[valid]]
+        return out
+
+    def price_frame(self, ticker, days, end=None, all_columns=False):
+        """
+        Últimos ``days`` días de precio con las columnas del tablero; con
+        ``all_columns`` se incluyen también las demás columnas almacenadas.
+        """
+        meta, dates, _ = self._open(ticker)
+        if end is None:
+            _, end = self.date_range(ticker)
+            if end is None:
+                return pd.DataFrame({DATE_COLUMN: [], PRICE_COLUMN: []})
+        end = pd.Timestamp(end)
+        start = end.normalize() - pd.Timedelta(days=days - 1)
+        frame = self.slice(ticker, start, end, columns=None if all_columns else [meta["price_column"]])
+        return frame.rename(columns={meta["price_column"]: PRICE_COLUMN})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingesta de CSV al almacén columnar de precios")
+    parser.add_argument("csv")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--date-column", default="Date")
+    parser.add_argument("--price-column", default="Close")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--ticker")
+    group.add_argument("--ticker-column")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args(argv)
+    written = ingest_csv(args.csv, args.store, date_column=args.date_column,
+                         price_column=args.price_column, ticker=args.ticker,
+                         ticker_column=args.ticker_column, force=args.force)
+    store = MarketDataStore(args.store)
+    for ticker in written:
+        first, last = store.date_range(ticker)
+        print(f"{ticker}: {store.rows(ticker)} filas ({first} - {last})")
+
+
+if __name__ == "__main__":
+    main()
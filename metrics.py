@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de riesgo y rentabilidad como series móviles.
+
+La beta móvil es la pendiente de una regresión OLS de los rendimientos de
+cada emisora contra los del índice de referencia en una ventana deslizante.
+En lugar de ajustar la regresión en cada ventana, las sumas de la ventana
+(x, y, xy, x², y²) se obtienen como diferencias de sumas acumuladas, así que
+el costo es O(fechas x emisoras) sin importar el tamaño de la ventana. Las
+series se centran en su media global antes de acumular para evitar la
+cancelación numérica en historias largas (la pendiente no cambia).
+
+El ROIC se calcula a partir de estados financieros trimestrales: NOPAT de
+los últimos ``window`` trimestres sobre el capital invertido promedio del
+mismo período.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+VENTANA_BETA = 60
+TRIMESTRES_ROIC = 4
+TASA_IMPUESTOS = 0.30
+
+COLUMNA_EBIT = "Utilidad Operativa"
+COLUMNA_TASA = "Tasa Impuestos"
+COLUMNA_CAPITAL_INVERTIDO = "Capital Invertido"
+
+
+@dataclass
+class RollingRegression:
+    """Coeficientes por fecha de ``y = alpha + beta * x``; NaN antes de completar la ventana."""
+    alpha: np.ndarray
+    beta: np.ndarray
+    r_squared: np.ndarray
+    window: int
+
+
+def window_sums(x, window):
+    """Suma de cada ventana de ``window`` filas (primer eje), vía suma acumulada."""
+    x = np.asarray(x, dtype=np.float64)
+    c = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=c[1:])
+    return c[window:] - c[:-window]
+
+
+def rolling_ols(y, x, window=VENTANA_BETA):
+    """
+    Regresión móvil de cada columna de ``y`` (fecha x emisora, o una serie)
+    contra ``x`` (fecha,). Las primeras ``window - 1`` filas son NaN.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim != 1 or y.shape[0] != x.shape[0]:
+        raise ValueError("x debe ser una serie con las mismas fechas que y")
+    if window < 2:
+        raise ValueError("window debe ser al menos 2")
+
+    one_dim = y.ndim == 1
+    if one_dim:
+        y = y[:, None]
+    shape = y.shape
+    alpha = np.full(shape, np.nan)
+    beta = np.full(shape, np.nan)
+    r_squared = np.full(shape, np.nan)
+
+    if shape[0] >= window:
+        mean_x = x.mean()
+        mean_y = y.mean(axis=0)
+        xc = x - mean_x
+        yc = y - mean_y
+
+        s_x = window_sums(xc, window)
+        s_xx = window_sums(xc * xc, window)
+        s_y = window_sums(yc, window)
+        s_yy = window_sums(yc * yc, window)
+        s_xy = window_sums(xc[:, None] * yc, window)
+
+        var_x = s_xx - s_x * s_x / window
+        var_y = s_yy - s_y * s_y / window
+        cov = s_xy - s_x[:, None] * s_y / window
+        with np.errstate(divide="ignore", invalid="ignore"):
+            b = cov / var_x[:, None]
+            beta[window - 1:] = b
+            alpha[window - 1:] = (s_y / window + mean_y) - b * (s_x[:, None] / window + mean_x)
+            r_squared[window - 1:] = cov * cov / (var_x[:, None] * var_y)
+
+    if one_dim:
+        alpha, beta, r_squared = alpha[:, 0], beta[:, 0], r_squared[:, 0]
+    return RollingRegression(alpha=alpha, beta=beta, r_squared=r_squared, window=window)
+
+
+def rolling_beta(returns, benchmark_returns, window=VENTANA_BETA):
+    """Beta móvil de cada columna de ``returns`` contra el índice."""
+    return rolling_ols(returns, benchmark_returns, window).beta
+
+
+def price_returns(prices):
+    """Rendimientos simples; la primera fila se descarta."""
+    prices = np.asarray(prices, dtype=np.float64)
+    return prices[1:] / prices[:-1] - 1
+
+
+def beta_window(n_prices, window=VENTANA_BETA):
+    """Ventana que usa ``beta_from_prices`` para una serie de ``n_prices`` precios."""
+    return max(2, min(window, (n_prices - 1) // 2))
+
+
+def beta_from_prices(prices, benchmark, window=VENTANA_BETA):
+    """
+    Beta móvil a partir de precios, alineada con las fechas de ``prices``
+    (la primera fecha no tiene rendimiento y queda en NaN). En series cortas
+    la ventana se acota a la mitad de los rendimientos disponibles.
+    """
+    returns = price_returns(prices)
+    window = beta_window(returns.shape[0] + 1, window)
+    beta = rolling_beta(returns, price_returns(benchmark), window)
+    pad = np.full((1,) + beta.shape[1:], np.nan)
+    return np.concatenate([pad, beta])
+
+
+def rolling_roic(ebit, capital, tax_rate=TASA_IMPUESTOS, window=TRIMESTRES_ROIC):
+    """
+    ROIC móvil (%) por trimestre: NOPAT acumulado de ``window`` trimestres
+    (anualizado) sobre el capital invertido promedio de los mismos
+    trimestres. Las primeras ``window - 1`` posiciones son NaN.
+    """
+    ebit = np.asarray(ebit, dtype=np.float64)
+    capital = np.asarray(capital, dtype=np.float64)
+    nopat = ebit * (1 - np.asarray(tax_rate, dtype=np.float64))
+    out = np.full(ebit.shape, np.nan)
+    if ebit.shape[0] >= window:
+        annual_nopat = window_sums(nopat, window) * (TRIMESTRES_ROIC / window)
+        mean_capital = window_sums(capital, window) / window
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[window - 1:] = annual_nopat / mean_capital * 100
+    return out
+
+
+def roic_series(statements, window=TRIMESTRES_ROIC):
+    """
+    ROIC móvil como ``pd.Series`` con el índice de ``statements`` (un renglón
+    por trimestre). Usa la columna de tasa de impuestos si existe.
+    """
+    tax_rate = (statements[COLUMNA_TASA].to_numpy(dtype=np.float64)
+                if COLUMNA_TASA in statements else TASA_IMPUESTOS)
+    values = rolling_roic(statements[COLUMNA_EBIT], statements[COLUMNA_CAPITAL_INVERTIDO],
+                          tax_rate=tax_rate, window=window)
+    return pd.Series(values, index=statements.index, name="ROIC (%)")
+
+
+def latest_change(series, lag=1):
+    """Último valor válido de la serie y su cambio contra ``lag`` observaciones válidas antes."""
+    values = np.asarray(series, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.nan, np.nan
+    if values.size <= lag:
+        return float(values[-1]), np.nan
+    return float(values[-1]), float(values[-1] - values[-1 - lag])
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Simulación Monte Carlo de trayectorias de precio.
+
+Las trayectorias siguen un movimiento browniano geométrico calibrado con los
+rendimientos logarítmicos de la serie observada; ``confidence_bands`` las
+ancla al precio observado ``horizon`` días antes para obtener bandas por
+fecha. Se simulan por bloques de tamaño fijo con NumPy y los bloques se
+reparten en un pool de procesos: ``workers`` es un número de procesos (se
+crea un pool para la llamada) o un ``Executor`` ya creado que se reutiliza
+entre llamadas, como el del tablero. Cada bloque usa su propio generador
+derivado de ``SeedSequence(seed).spawn`` y su resultado se reduce a agregados
+(histogramas por fecha, sumas), así que la memoria no depende del número de
+trayectorias. Como la partición en bloques no depende del número de procesos
+y los agregados se combinan en el orden de los bloques, el resultado es
+idéntico con cualquier ``workers``.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+N_SIMULACIONES = 10_000
+PERCENTILES = (5, 25, 50, 75, 95)
+# Límite de elementos por bloque (trayectorias x días) para acotar memoria
+MAX_ELEMENTOS_BLOQUE = 4_000_000
+MAX_FECHAS_EVALUADAS = 500
+N_BINS = 512
+SIGMAS_RANGO = 8.0
+
+
+@dataclass
+class MonteCarloBands:
+    """Percentiles de precio por fecha evaluada."""
+    eval_idx: np.ndarray
+    percentiles: dict
+    mean: np.ndarray
+    n_paths: int
+
+    def band(self, lower=5, upper=95):
+        return self.percentiles[lower], self.percentiles[upper]
+
+
+def _chunk_sizes(n_total, chunk_size):
+    full, rest = divmod(n_total, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def _run_chunks(func, tasks, workers):
+    # executor.map conserva el orden de los bloques
+    if isinstance(workers, Executor):
+        return list(workers.map(func, tasks)) if len(tasks) > 1 else list(map(func, tasks))
+    if workers is None or workers <= 1 or len(tasks) == 1:
+        return list(map(func, tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, tasks))
+
+
+def _histogram_rows(values, lo, width, n_bins):
+    """Conteos por fila de ``values.T`` con rejilla propia por fila."""
+    n_rows = values.shape[1]
+    bins = np.floor((values - lo) / width).astype(np.int64)
+    np.clip(bins, 0, n_bins - 1, out=bins)
+    bins += np.arange(n_rows) * n_bins
+    return np.bincount(bins.ravel(), minlength=n_rows * n_bins).reshape(n_rows, n_bins)
+
+
+def _quantiles_from_counts(counts, lo, width, qs):
+    """Cuantiles interpolados linealmente dentro de cada cubeta."""
+    cum = np.cumsum(counts, axis=1)
+    total = cum[:, -1:]
+    out = {}
+    for q in qs:
+        target = total[:, 0] * q / 100
+        k = (cum < target[:, None]).sum(axis=1)
+        k = np.minimum(k, counts.shape[1] - 1)
+        rows = np.arange(counts.shape[0])
+        prev = np.where(k > 0, cum[rows, np.maximum(k - 1, 0)], 0)
+        inside = np.where(counts[rows, k] > 0, (target - prev) / np.maximum(counts[rows, k], 1), 0.5)
+        out[q] = lo + (k + inside) * width
+    return out
+
+
+def _path_chunk(task):
+    seed, n_paths, mu, sigma, n_steps, eval_idx, lo, width, n_bins = task
+    rng = np.random.default_rng(seed)
+    steps = rng.standard_normal((n_paths, n_steps))
+    steps *= sigma
+    steps += mu
+    log_paths = np.zeros((n_paths, n_steps + 1))
+    np.cumsum(steps, axis=1, out=log_paths[:, 1:])
+    selected = log_paths[:, eval_idx]
+    counts = _histogram_rows(selected, lo, width, n_bins)
+    return counts, np.exp(selected).sum(axis=0)
+
+
+def simulate_log_returns(mu, sigma, n_steps, n_paths=N_SIMULACIONES, seed=0, workers=None,
+                         percentiles=PERCENTILES, max_eval_points=MAX_FECHAS_EVALUADAS,
+                         n_bins=N_BINS):
+    """
+    Percentiles del rendimiento logarítmico acumulado de trayectorias con
+    pasos normales ``N(mu, sigma)``, evaluados en a lo sumo
+    ``max_eval_points`` pasos equiespaciados entre 0 y ``n_steps``.
+
+    Devuelve ``(eval_idx, {percentil: arreglo}, media de exp(acumulado))``.
+    """
+    eval_idx = np.unique(np.linspace(0, n_steps, min(n_steps + 1, max_eval_points)).astype(np.int64))
+    # Rejilla de histograma por paso: media +/- SIGMAS_RANGO desviaciones
+    t = eval_idx.astype(np.float64)
+    half = SIGMAS_RANGO * max(sigma, 1e-12) * np.sqrt(np.maximum(t, 1.0))
+    lo = mu * t - half
+    width = 2 * half / n_bins
+
+    chunk_size = max(1, MAX_ELEMENTOS_BLOQUE // max(n_steps, 1))
+    sizes = _chunk_sizes(n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, n, mu, sigma, n_steps, eval_idx, lo, width, n_bins)
+             for s, n in zip(seeds, sizes)]
+
+    counts = np.zeros((eval_idx.size, n_bins), dtype=np.int64)
+    total = np.zeros(eval_idx.size)
+    for chunk_counts, chunk_sum in _run_chunks(_path_chunk, tasks, workers):
+        counts += chunk_counts
+        total += chunk_sum
+
+    quantiles = _quantiles_from_counts(counts, lo, width, percentiles)
+    # En el paso 0 todas las trayectorias valen exactamente 0
+    for q in quantiles.values():
+        q[eval_idx == 0] = 0.0
+    return eval_idx, quantiles, total / n_paths
+
+
+def _calibrate(prices):
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.size < 3:
+        raise ValueError("Se requieren al menos 3 precios para calibrar la simulación")
+    log_ret = np.diff(np.log(prices))
+    return prices, float(log_ret.mean()), float(log_ret.std(ddof=1))
+
+
+def confidence_bands(prices, horizon=20, n_paths=N_SIMULACIONES, seed=0, workers=None,
+                     percentiles=PERCENTILES):
+    """
+    Bandas de confianza por fecha: distribución simulada del precio en ``t``
+    partiendo del precio observado ``horizon`` días antes (o del primero,
+    con horizonte ``t``, al inicio de la serie).
+    """
+    prices, mu, sigma = _calibrate(prices)
+    horizon = min(horizon, prices.size - 1)
+    _, log_q, mean = simulate_log_returns(
+        mu, sigma, horizon, n_paths=n_paths, seed=seed, workers=workers,
+        percentiles=percentiles, max_eval_points=horizon + 1)
+    t = np.arange(prices.size)
+    anchor = prices[np.maximum(t - horizon, 0)]
+    step = np.minimum(t, horizon)
+    return MonteCarloBands(
+        eval_idx=t,
+        percentiles={q: anchor * np.exp(v[step]) for q, v in log_q.items()},
+        mean=anchor * mean[step],
+        n_paths=n_paths,
+    )
+
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de generación de series de precios sintéticas.
+
+La tendencia y el ruido se calculan en una sola pasada vectorizada de NumPy,
+por lo que el costo es lineal en el número de puntos y no depende de Python
+por fila. Con la misma semilla el resultado es idéntico bit a bit.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMN = 'Precio Acción ($MXN)'
+DATE_COLUMN = 'Fecha'
+
+# Parámetros del modelo: precio base + tendencia raíz cuadrada + ruido normal
+PRECIO_BASE = 90.0
+AMPLITUD_TENDENCIA = 5.0
+DESVIACION_RUIDO = 2.0
+SEMILLA_DEFAULT = 42
+
+
+def make_rng(seed=None):
+    """Devuelve un ``np.random.Generator`` a partir de una semilla o generador."""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def trend_curve(periods, amplitude=AMPLITUD_TENDENCIA, dtype=np.float64):
+    """Tendencia ``amplitude * sqrt(x / periods)`` para x = 0..periods-1."""
+    trend = np.arange(periods, dtype=dtype)
+    trend /= periods
+    np.sqrt(trend, out=trend)
+    trend *= amplitude
+    return trend
+
+
+def generate_prices(periods, seed=None, n_tickers=1, base=PRECIO_BASE,
+                    amplitude=AMPLITUD_TENDENCIA, noise_std=DESVIACION_RUIDO,
+                    dtype=np.float64):
+    """
+    Genera precios sintéticos.
+
+    Devuelve un arreglo de forma ``(periods,)`` si ``n_tickers == 1`` o
+    ``(periods, n_tickers)`` en otro caso. El ruido se escribe en un único
+    buffer y la tendencia se suma en sitio para no crear temporales del
+    tamaño de la serie.
+    """
+    if periods <= 0:
+        raise ValueError("periods debe ser positivo")
+    if n_tickers <= 0:
+        raise ValueError("n_tickers debe ser positivo")
+
+    rng = make_rng(seed)
+    shape = (periods,) if n_tickers == 1 else (periods, n_tickers)
+    prices = rng.standard_normal(shape, dtype=dtype)
+    prices *= noise_std
+
+    trend = trend_curve(periods, amplitude, dtype=dtype)
+    trend += base
+    if n_tickers == 1:
+        prices += trend
+    else:
+        prices += trend[:, None]
+    return prices
+
+
+def date_index(periods, end=None, freq='D'):
+    """Fechas que terminan en ``end`` (hoy, normalizado, por defecto)."""
+    if end is None:
+        end = pd.Timestamp.today().normalize()
+    return pd.date_range(end=end, periods=periods, freq=freq)
+
+
+def build_price_frame(periods, seed=None, end=None, tickers=None, **kwargs):
+    """
+    DataFrame listo para el tablero con columnas ``Fecha`` y precio.
+
+    Con ``tickers`` se devuelve una columna por emisora en lugar de la
+    columna única de precio.
+    """
+    fechas = date_index(periods, end=end)
+    if tickers is None:
+        prices = generate_prices(periods, seed=seed, **kwargs)
+        return pd.DataFrame({DATE_COLUMN: fechas, PRICE_COLUMN: prices})
+
+    prices = generate_prices(periods, seed=seed, n_tickers=len(tickers), **kwargs)
+    if prices.ndim == 1:
+        prices = prices[:, None]
+    frame = pd.DataFrame(prices, columns=list(tickers))
+    frame.insert(0, DATE_COLUMN, fechas)
+    return frame
+
+
+# Índice de referencia sintético: correlación y beta objetivo contra la emisora
+CORRELACION_INDICE = 0.6
+BETA_OBJETIVO = 1.1
+DERIVA_INDICE = 0.0003
+
+
+def generate_benchmark(prices, seed=None, correlation=CORRELACION_INDICE, beta=BETA_OBJETIVO,
+                       drift=DERIVA_INDICE, start=100.0):
+    """
+    Índice sintético cuyos rendimientos tienen correlación ``correlation``
+    con los de ``prices`` y escala tal que la beta esperada de la emisora
+    contra el índice sea ``beta``.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = prices[1:] / prices[:-1] - 1
+    std = returns.std()
+    z = (returns - returns.mean()) / std if std > 0 else np.zeros_like(returns)
+    rng = make_rng(seed)
+    shock = correlation * z + np.sqrt(1 - correlation ** 2) * rng.standard_normal(returns.size)
+    sigma = correlation * std / beta
+    index = np.empty(prices.size)
+    index[0] = start
+    np.cumprod(1 + drift + sigma * shock, out=index[1:])
+    index[1:] *= start
+    return index
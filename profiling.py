@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación de tiempos por sección del tablero.
+
+``RerunTimer`` marca el inicio de cada sección del script; al llegar a la
+siguiente marca (o a ``finish``) la duración se registra en ``REGISTRY``, un
+registro por proceso compartido por todas las sesiones. El registro guarda
+las últimas ``VENTANA_MUESTRAS`` duraciones por sección (para percentiles
+recientes) y un histograma acumulado con cubetas fijas que se exporta como
+JSON o en formato de texto de Prometheus.
+
+``start_profile``/``stop_profile`` capturan un rerun completo con
+pyinstrument si está instalado, o con cProfile en otro caso.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+VENTANA_MUESTRAS = 1000
+# Límites superiores (segundos) de las cubetas del histograma
+CUBETAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_DIR = os.environ.get("ALPEK_METRICS_DIR",
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics"))
+RERUN_TOTAL = "Rerun total"
+
+
+class _SectionStats:
+    def __init__(self):
+        self.recent = deque(maxlen=VENTANA_MUESTRAS)
+        self.buckets = np.zeros(len(CUBETAS) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.recent.append(seconds)
+        self.buckets[np.searchsorted(CUBETAS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+class TimingRegistry:
+    """Duraciones por sección acumuladas en el proceso (seguro entre hilos)."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def observe(self, section, seconds):
+        with self._lock:
+            self._stats.setdefault(section, _SectionStats()).observe(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+    def summary(self):
+        """Lista de dicts por sección con conteo, media y percentiles recientes."""
+        with self._lock:
+            rows = []
+            for section, stats in self._stats.items():
+                recent = np.fromiter(stats.recent, dtype=np.float64)
+                p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if recent.size else (np.nan,) * 3
+                rows.append({
+                    "section": section,
+                    "count": stats.count,
+                    "mean_ms": stats.total / stats.count * 1e3,
+                    "p50_ms": p50 * 1e3,
+                    "p95_ms": p95 * 1e3,
+                    "p99_ms": p99 * 1e3,
+                    "last_ms": recent[-1] * 1e3 if recent.size else np.nan,
+                })
+            return rows
+
+    def histogram(self, section):
+        """Duraciones recientes de una sección, en milisegundos."""
+        with self._lock:
+            stats = self._stats.get(section)
+            return [] if stats is None else [s * 1e3 for s in stats.recent]
+
+    def to_json(self):
+        with self._lock:
+            data = {
+                section: {
+                    "count": stats.count,
+                    "sum_seconds": stats.total,
+                    "buckets": {("+Inf" if i == len(CUBETAS) else str(CUBETAS[i])): int(c)
+                                for i, c in enumerate(stats.buckets)},
+                }
+                for section, stats in self._stats.items()
+            }
+        return json.dumps({"generated": time.time(), "sections": data}, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, name="alpek_section_seconds"):
+        lines = [f"# HELP {name} Duración de las secciones del tablero por rerun.",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for section, stats in sorted(self._stats.items()):
+                label = section.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = np.cumsum(stats.buckets)
+                for le, c in zip(CUBETAS, cumulative[:-1]):
+                    lines.append(f'{name}_bucket{{section="{label}",le="{le}"}} {int(c)}')
+                lines.append(f'{name}_bucket{{section="{label}",le="+Inf"}} {int(cumulative[-1])}')
+                lines.append(f'{name}_sum{{section="{label}"}} {stats.total}')
+                lines.append(f'{name}_count{{section="{label}"}} {stats.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, fmt="json", directory=METRICS_DIR):
+        """Escribe el registro en ``directory`` y devuelve la ruta."""
+        os.makedirs(directory, exist_ok=True)
+        if fmt == "json":
+            path, text = os.path.join(directory, "rendimiento.json"), self.to_json()
+        elif fmt == "prometheus":
+            path, text = os.path.join(directory, "rendimiento.prom"), self.to_prometheus()
+        else:
+            raise ValueError(f"Formato desconocido: {fmt!r}")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.replace(tmp, path)
+        return path
+
+
+REGISTRY = TimingRegistry()
+
+
+class RerunTimer:
+    """Marca secciones consecutivas de un rerun."""
+
+    def __init__(self, registry=REGISTRY, total_label=RERUN_TOTAL):
+        self.registry = registry
+        self.total_label = total_label
+        self.start = time.perf_counter()
+        self._section = None
+        self._section_start = self.start
+        self.durations = {}
+
+    def section(self, name):
+        """Cierra la sección en curso (si la hay) e inicia ``name``."""
+        now = time.perf_counter()
+        self._close(now)
+        self._section = name
+        self._section_start = now
+
+    def _close(self, now):
+        if self._section is not None:
+            elapsed = now - self._section_start
+            self.durations[self._section] = self.durations.get(self._section, 0.0) + elapsed
+            self.registry.observe(self._section, elapsed)
+            self._section = None
+
+    def finish(self):
+        now = time.perf_counter()
+        self._close(now)
+        total = now - self.start
+        self.durations[self.total_label] = total
+        self.registry.observe(self.total_label, total)
+        return self.durations
+
+
+def start_profile():
+    """Inicia la captura de perfil del rerun (pyinstrument o cProfile)."""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    profiler = Profiler()
+    profiler.start()
+    return profiler
+
+
+def stop_profile(profiler, limit=40):
+    """Detiene la captura y devuelve el reporte como texto."""
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+    profiler.stop()
+    return profiler.output_text(unicode=True, color=False)
+
+
+def histogram_counts(values_ms, bins=20):
+    """Conteos por intervalo, indexados por el límite inferior en ms."""
+    if not values_ms:
+        return {}
+    counts, edges = np.histogram(values_ms, bins=min(bins, len(values_ms)))
+    return {round(float(lo), 1): int(c) for c, lo in zip(counts, edges[:-1])}
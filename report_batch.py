@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Generación por lotes del informe ejecutivo, sin la interfaz de Streamlit.
+
+Cada combinación (emisora, período) es una tarea independiente que se
+ejecuta en un ``ProcessPoolExecutor``. La tarea obtiene los datos con los
+mismos loaders de ``data_layer`` que usa el tablero (cada proceso conserva
+su propio caché en memoria, así que el universo sectorial se calcula una
+vez por proceso), arma el contexto con ``reports.report_context`` y escribe
+en ``<salida>/<emisora>/<días>d/``:
+
+- ``informe.html``: los tres informes y las gráficas como imágenes PNG.
+- ``informe.pdf``: los informes como texto y una página por gráfica.
+
+Las gráficas estáticas se dibujan con matplotlib (backend Agg). Las
+plantillas se cargan al iniciar cada proceso y quedan en caché.
+
+Uso::
+
+    python report_batch.py --tickers SIMULADA ALPEKA --periods 90 180 365 \\
+        --out informes --formats html pdf --workers 4
+"""
+
+import argparse
+import os
+import sys
+import textwrap
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+from startup import quiet_streamlit_logs
+
+quiet_streamlit_logs(bare=True)
+
+from cross_section import SECTORES
+from data_layer import (load_buyback_scenarios, load_indicators, load_market_indicators,
+                        load_sector_trends)
+from market_data import STORE_DIR, MarketDataStore
+from price_engine import SEMILLA_DEFAULT
+from reports import (PLANTILLA_DOCUMENTO, TIPOS_INFORME, html_to_text, load_template,
+                     render_document, render_report, report_context)
+
+EMISORA_SIMULADA = "SIMULADA"
+PERIODOS_INFORME = {90: "Últimos 3 meses", 180: "Últimos 6 meses", 365: "Último año"}
+SECTORES_INFORME = ("Químico", "Plásticos", "Empaque")
+RECOMPRA_INFORME = 5.0
+SALIDA_INFORMES = os.environ.get("ALPEK_REPORTS_DIR",
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), "informes"))
+FORMATOS = ("html", "pdf")
+DPI_GRAFICAS = 110
+
+
+def period_label(periods):
+    return PERIODOS_INFORME.get(periods, f"Últimos {periods} días")
+
+
+def _init_worker():
+    # Precarga las plantillas en el caché del proceso
+    for name in (*TIPOS_INFORME.values(), PLANTILLA_DOCUMENTO):
+        load_template(name)
+
+
+def _price_chart(indicadores):
+    fig, ax = plt.subplots(figsize=(10, 4.5))
+    ax.fill_between(indicadores.dates, indicadores.lower_band, indicadores.upper_band,
+                    color="#3498db", alpha=0.15, linewidth=0, label="Banda ±1σ")
+    ax.plot(indicadores.dates, indicadores.prices, color="#3498db", linewidth=1.2, label="Precio")
+    for date, price, text in ((indicadores.max_date, indicadores.max_price, "Máximo"),
+                              (indicadores.min_date, indicadores.min_price, "Mínimo")):
+        ax.annotate(f"{text}: {price:.2f}", (date, price), textcoords="offset points",
+                    xytext=(0, 8), ha="center", fontsize=8)
+    ax.set_title("Desempeño de la Acción")
+    ax.set_ylabel("Precio ($MXN)")
+    ax.legend(loc="upper left", fontsize=8)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
+
+
+def _buyback_chart(indicadores, impacto, buyback_percentage):
+    fig, ax = plt.subplots(figsize=(10, 4.5))
+    ax.plot(indicadores.dates, indicadores.prices, color="#3498db", linewidth=1.2)
+    ax.set_ylabel("Precio ($MXN)", color="#3498db")
+    ax2 = ax.twinx()
+    ax2.plot(indicadores.dates, impacto, color="#e74c3c", linewidth=1.0)
+    ax2.set_ylabel("Impacto (%)", color="#e74c3c")
+    ax.set_title(f"Impacto Estimado de Recompra ({buyback_percentage}% de acciones) en Precio")
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
+
+
+def _sector_chart(tendencias):
+    fig, ax = plt.subplots(figsize=(10, 4))
+    y = range(len(tendencias))
+    ax.barh([i + 0.2 for i in y], tendencias["Crecimiento Anual (%)"], height=0.4,
+            color="#3498db", label="Crecimiento Anual (%)")
+    ax.barh([i - 0.2 for i in y], tendencias["Margen EBITDA (%)"], height=0.4,
+            color="#27ae60", label="Margen EBITDA (%)")
+    ax.set_yticks(list(y), tendencias["Sector"])
+    ax.axvline(0, color="#7f8c8d", linewidth=0.8)
+    ax.set_title("Comparativa de Sectores")
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    return fig
+
+
+def _text_page(title, body):
+    fig = plt.figure(figsize=(8.27, 11.69))
+    fig.text(0.08, 0.95, title, fontsize=15, weight="bold", va="top")
+    lines = []
+    for paragraph in body.splitlines():
+        lines.extend(textwrap.wrap(paragraph, 95) or [""])
+        lines.append("")
+    fig.text(0.08, 0.91, "\n".join(lines), fontsize=9, va="top", family="DejaVu Sans")
+    return fig
+
+
+def generate_report(task):
+    """Genera los archivos de una (emisora, período); devuelve ``(tarea, rutas, segundos)``."""
+    start = time.perf_counter()
+    emisora, periods = task["ticker"], task["periods"]
+    if emisora == EMISORA_SIMULADA:
+        indicadores = load_indicators(periods, task["seed"], end=task["end"])
+    else:
+        indicadores = load_market_indicators(task["store"], emisora, periods)
+    escenarios = load_buyback_scenarios(indicadores.buyback_impact(0.0))
+    tendencias = load_sector_trends(tuple(task["sectors"]), task["seed"])
+    contexto = report_context(period_label(periods), indicadores, tendencias, task["buyback"],
+                              escenarios.mean(task["buyback"]))
+
+    directory = os.path.join(task["out"], emisora, f"{periods}d")
+    os.makedirs(directory, exist_ok=True)
+    charts = {
+        "precio.png": ("Desempeño de la Acción", _price_chart(indicadores)),
+        "recompra.png": ("Impacto de Recompra",
+                         _buyback_chart(indicadores, escenarios.row(task["buyback"]), task["buyback"])),
+        "sectores.png": ("Comparativa de Sectores", _sector_chart(tendencias)),
+    }
+    written = []
+    try:
+        for name, (_, fig) in charts.items():
+            path = os.path.join(directory, name)
+            fig.savefig(path, dpi=DPI_GRAFICAS)
+            written.append(path)
+
+        generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+        if "html" in task["formats"]:
+            path = os.path.join(directory, "informe.html")
+            html = render_document(emisora, contexto,
+                                   images=[(name, alt) for name, (alt, _) in charts.items()],
+                                   generated=generated)
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(html)
+            written.append(path)
+
+        if "pdf" in task["formats"]:
+            path = os.path.join(directory, "informe.pdf")
+            body = "\n\n".join(html_to_text(render_report(tipo, contexto)) for tipo in TIPOS_INFORME)
+            with PdfPages(path) as pdf:
+                page = _text_page(f"Informe Ejecutivo - {emisora} - {contexto['periodo']}", body)
+                pdf.savefig(page)
+                plt.close(page)
+                for _, fig in charts.values():
+                    pdf.savefig(fig)
+            written.append(path)
+    finally:
+        for _, fig in charts.values():
+            plt.close(fig)
+    return task, written, time.perf_counter() - start
+
+
+def build_tasks(tickers, periods, out, formats=FORMATOS, seed=SEMILLA_DEFAULT,
+                buyback=RECOMPRA_INFORME, sectors=SECTORES_INFORME, store=STORE_DIR, end=None):
+    """Una tarea por combinación (emisora, período)."""
+    end = datetime.today().date() if end is None else end
+    return [
+        {"ticker": ticker, "periods": p, "out": out, "formats": tuple(formats), "seed": seed,
+         "buyback": buyback, "sectors": tuple(sectors), "store": store, "end": end}
+        for ticker in tickers for p in periods
+    ]
+
+
+def run_batch(tasks, workers=None):
+    """Ejecuta las tareas en paralelo; devuelve ``(resultados, fallas)``."""
+    results, failures = [], []
+    if workers == 1:
+        _init_worker()
+        for task in tasks:
+            try:
+                results.append(generate_report(task))
+            except Exception:
+                failures.append((task, traceback.format_exc()))
+        return results, failures
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(generate_report, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception:
+                failures.append((futures[future], traceback.format_exc()))
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera informes ejecutivos HTML/PDF por lotes")
+    parser.add_argument("--tickers", nargs="+", default=None,
+                        help=f"Emisoras del almacén o {EMISORA_SIMULADA} (por defecto: todas)")
+    parser.add_argument("--periods", nargs="+", type=int, default=list(PERIODOS_INFORME))
+    parser.add_argument("--out", default=SALIDA_INFORMES)
+    parser.add_argument("--formats", nargs="+", choices=FORMATOS, default=list(FORMATOS))
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--seed", type=int, default=SEMILLA_DEFAULT)
+    parser.add_argument("--buyback", type=float, default=RECOMPRA_INFORME)
+    parser.add_argument("--sectors", nargs="+", choices=SECTORES, default=list(SECTORES_INFORME))
+    parser.add_argument("--store", default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers or [EMISORA_SIMULADA, *MarketDataStore(args.store).tickers]
+    tasks = build_tasks(tickers, args.periods, args.out, formats=args.formats, seed=args.seed,
+                        buyback=args.buyback, sectors=args.sectors, store=args.store)
+    start = time.perf_counter()
+    results, failures = run_batch(tasks, workers=args.workers)
+    for task, written, seconds in sorted(results, key=lambda r: (r[0]["ticker"], r[0]["periods"])):
+        print(f"{task['ticker']} {task['periods']}d: {len(written)} archivos en {seconds:.2f} s")
+    for task, error in failures:
+        print(f"ERROR {task['ticker']} {task['periods']}d:\n{error}", file=sys.stderr)
+    print(f"{len(results)} informes, {len(failures)} fallas en {time.perf_counter() - start:.2f} s "
+          f"-> {os.path.abspath(args.out)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Informe ejecutivo: contexto, plantillas y renderizado.
+
+El tablero y el generador por lotes (``report_batch``) comparten este
+módulo: ``report_context`` reduce los indicadores, las tendencias por
+sector y el escenario de recompra a los valores que muestran los informes,
+y ``render_report`` los sustituye en las plantillas HTML de
+``TEMPLATES_DIR``. Cada plantilla se lee y se compila una sola vez por
+proceso (``load_template`` con ``lru_cache``).
+"""
+
+import os
+import re
+from functools import lru_cache
+from html import unescape
+from string import Template
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Tipo de informe -> plantilla
+TIPOS_INFORME = {
+    "Resumen Ejecutivo": "resumen_ejecutivo.html",
+    "Análisis Detallado": "analisis_detallado.html",
+    "Recomendaciones Estratégicas": "recomendaciones.html",
+}
+PLANTILLA_DOCUMENTO = "documento.html"
+SIN_DATOS = "N/D"
+
+
+def format_percentage(value):
+    return f"{value:.2f}%"
+
+
+@lru_cache(maxsize=None)
+def load_template(name, directory=TEMPLATES_DIR):
+    """Plantilla compilada (``string.Template``), leída una vez por proceso."""
+    with open(os.path.join(directory, name), encoding="utf-8") as fh:
+        return Template(fh.read())
+
+
+def _leader(tendencias, column):
+    if tendencias is None or tendencias.empty:
+        return SIN_DATOS, SIN_DATOS
+    row = tendencias[column].idxmax()
+    return tendencias.loc[row, "Sector"], format_percentage(tendencias.loc[row, column])
+
+
+def report_context(analysis_period, indicadores, tendencias, buyback_percentage, impacto_promedio):
+    """Valores de los informes a partir de los mismos objetos que usa el tablero."""
+    sector_crecimiento, crecimiento_max = _leader(tendencias, "Crecimiento Anual (%)")
+    sector_margen, margen_max = _leader(tendencias, "Margen EBITDA (%)")
+    return {
+        "periodo": analysis_period,
+        "rendimiento": format_percentage(indicadores.mean_return_pct),
+        "volatilidad": format_percentage(indicadores.volatility_pct),
+        "recompra": buyback_percentage,
+        "recompra_min": f"{buyback_percentage - 1:.1f}",
+        "recompra_max": f"{buyback_percentage + 1:.1f}",
+        "impacto": format_percentage(impacto_promedio),
+        "precio_min": f"{indicadores.min_price:.2f}",
+        "precio_max": f"{indicadores.max_price:.2f}",
+        "tendencia": "alcista" if indicadores.is_bullish else "bajista",
+        "sector_crecimiento": sector_crecimiento,
+        "crecimiento_max": crecimiento_max,
+        "sector_margen": sector_margen,
+        "margen_max": margen_max,
+    }
+
+
+def render_report(report_type, context):
+    """HTML del informe ``report_type`` (una de las llaves de ``TIPOS_INFORME``)."""
+    return load_template(TIPOS_INFORME[report_type]).substitute(context)
+
+
+def render_document(emisora, context, images=(), generated=""):
+    """Documento HTML completo con los tres informes y las imágenes (rutas relativas)."""
+    informes = "\n".join(render_report(tipo, context) for tipo in TIPOS_INFORME)
+    graficas = "\n".join(f'<img src="{src}" alt="{alt}">' for src, alt in images)
+    return load_template(PLANTILLA_DOCUMENTO).substitute(
+        emisora=emisora, periodo=context["periodo"], informes=informes,
+        graficas=graficas, generado=generated)
+
+
+def html_to_text(html):
+    """Texto plano de un fragmento HTML (para el PDF): un párrafo por bloque."""
+    text = re.sub(r"<li[^>]*>", "• ", html)
+    text = re.sub(r"</(p|h\d|li|ul|div)>", "\n", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    lines = (" ".join(line.split()) for line in unescape(text).splitlines())
+    return "\n".join(line for line in lines if line)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Agregados OHLC (y volumen) a varias resoluciones.
+
+``RollupSet`` construye una vez las barras diarias y, a partir de ellas, las
+semanales y mensuales con ``np.maximum.reduceat``/``np.minimum.reduceat``
+sobre los límites de cada período (la serie ya está ordenada por fecha), sin
+agrupar con pandas. ``for_span`` elige la resolución más fina cuyo número de
+barras no excede ``MAX_BARRAS`` para el período mostrado, de modo que las
+vistas largas grafican cientos de barras en lugar de miles de días.
+
+Si la fuente solo trae precio de cierre, la apertura de cada día es el
+cierre anterior y el máximo/mínimo diario es el mayor/menor de ambos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from price_engine import DATE_COLUMN, PRICE_COLUMN
+
+# Código de resolución -> etiqueta en el tablero
+RESOLUCIONES = {"D": "Diaria", "W": "Semanal", "M": "Mensual"}
+MAX_BARRAS = 180
+
+# Nombres de columna reconocidos en los datos históricos
+COLUMNAS_OHLC = {
+    "open": ("Open", "Apertura"),
+    "high": ("High", "Máximo"),
+    "low": ("Low", "Mínimo"),
+    "volume": ("Volume", "Volumen"),
+}
+
+
+@dataclass
+class Rollup:
+    """Barras OHLC de una resolución; ``last_idx`` es el último día de cada barra."""
+    freq: str
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    last_idx: np.ndarray
+
+    def __len__(self):
+        return self.dates.size
+
+    def to_frame(self):
+        frame = pd.DataFrame({
+            DATE_COLUMN: self.dates,
+            "Apertura": self.open,
+            "Máximo": self.high,
+            "Mínimo": self.low,
+            "Cierre": self.close,
+        })
+        if self.volume is not None:
+            frame["Volumen"] = self.volume
+        return frame
+
+
+def period_keys(dates, freq):
+    """Llave entera del período (día, semana que inicia en lunes, mes) de cada fecha."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if freq == "D":
+        return days.astype(np.int64)
+    if freq == "W":
+        # El 1970-01-01 fue jueves: se desplaza 3 días para que las semanas inicien en lunes
+        return (days.astype(np.int64) + 3) // 7
+    if freq == "M":
+        return days.astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Resolución desconocida: {freq!r}")
+
+
+def _aggregate(freq, dates, open_, high, low, close, volume, day_idx):
+    keys = period_keys(dates, freq)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], keys.size] - 1
+    return Rollup(
+        freq=freq,
+        dates=dates[ends],
+        open=open_[starts],
+        high=np.maximum.reduceat(high, starts),
+        low=np.minimum.reduceat(low, starts),
+        close=close[ends],
+        volume=None if volume is None else np.add.reduceat(volume, starts),
+        last_idx=day_idx[ends],
+    )
+
+
+def daily_bars(dates, close, open_=None, high=None, low=None, volume=None):
+    """Barras diarias; sin apertura se usa el cierre anterior."""
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    close = np.asarray(close, dtype=np.float64)
+    if open_ is None:
+        open_ = np.r_[close[:1], close[:-1]]
+    open_ = np.asarray(open_, dtype=np.float64)
+    high = np.maximum(open_, close) if high is None else np.asarray(high, dtype=np.float64)
+    low = np.minimum(open_, close) if low is None else np.asarray(low, dtype=np.float64)
+    if volume is not None:
+        volume = np.asarray(volume, dtype=np.float64)
+    # Varios registros por día (p. ej. intradía) se agregan a un día
+    return _aggregate("D", dates, open_, high, low, close, volume, np.arange(close.size))
+
+
+class RollupSet:
+    """Barras precalculadas a todas las resoluciones de ``RESOLUCIONES``."""
+
+    def __init__(self, dates, close, open_=None, high=None, low=None, volume=None,
+                 resolutions=tuple(RESOLUCIONES)):
+        daily = daily_bars(dates, close, open_, high, low, volume)
+        self.rollups = {"D": daily}
+        for freq in resolutions:
+            if freq != "D":
+                self.rollups[freq] = _aggregate(freq, daily.dates, daily.open, daily.high,
+                                                daily.low, daily.close, daily.volume, daily.last_idx)
+
+    @classmethod
+    def from_frame(cls, frame, price_column=PRICE_COLUMN, date_column=DATE_COLUMN, **kwargs):
+        """Construye las barras desde un DataFrame; reconoce columnas OHLC y de volumen."""
+        extra = {}
+        for field, names in COLUMNAS_OHLC.items():
+            column = next((c for c in frame.columns if c in names), None)
+            if column is not None:
+                extra["open_" if field == "open" else field] = frame[column].to_numpy()
+        return cls(frame[date_column].to_numpy(), frame[price_column].to_numpy(), **extra, **kwargs)
+
+    def get(self, freq):
+        return self.rollups[freq]
+
+    def resolution_for(self, span_days, max_bars=MAX_BARRAS):
+        """Resolución más fina con a lo sumo ``max_bars`` barras en ``span_days`` días."""
+        period_days = {"D": 1, "W": 7, "M": 30.4}
+        for freq in self.rollups:
+            if span_days / period_days[freq] <= max_bars:
+                return freq
+        return list(self.rollups)[-1]
+
+    def for_span(self, span_days, max_bars=MAX_BARRAS):
+        return self.get(self.resolution_for(span_days, max_bars))
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Arranque del tablero: recursos estáticos y precalentamiento.
+
+Streamlit importa los módulos una vez por proceso, pero el primer rerun
+después de un arranque en frío paga además la importación de pandas y el
+cálculo de todos los conjuntos de datos por defecto. ``python startup.py``
+importa los módulos, llena los cachés del data layer con los valores
+iniciales del tablero en un hilo de fondo y, mientras tanto, levanta el
+servidor en el mismo proceso (``streamlit run``), de modo que la primera
+sesión ya encuentra los datos en caché. Los argumentos se pasan tal cual a
+``streamlit run``::
+
+    python startup.py --server.port 8501
+    python startup.py --measure          # solo mide el arranque y sale
+
+El logo (ya reducido al ancho de la barra lateral) y la hoja de estilos
+se leen una vez por proceso. Las duraciones del arranque se registran en
+``profiling.REGISTRY`` (secciones ``Arranque: ...``) y aparecen en el
+panel de rendimiento.
+"""
+
+import importlib
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+# Inicio del proceso (o de la primera importación de este módulo con ``streamlit run``)
+PROCESO_INICIO = time.perf_counter()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+APP = os.path.join(BASE_DIR, "app1.py")
+LOGO = os.path.join(BASE_DIR, "logo.png")
+ANCHO_LOGO = 150
+HOJA_ESTILOS = "estilos.css"
+PRECALENTAR = os.environ.get("ALPEK_PREWARM", "1") != "0"
+
+# Módulos que importa el primer rerun (los de terceros los cargan Streamlit o el tablero)
+MODULOS_TABLERO = (
+    "pandas", "pandas.io.formats.style", "PIL.Image", "data_layer", "downsampling", "figures",
+    "live_feed", "profiling", "reports", "rollups", "table_view",
+)
+# Trazas de Plotly del tablero; la primera instancia de cada tipo construye sus validadores
+TRAZAS_TABLERO = ("Scatter", "Bar", "Candlestick", "Heatmap", "Scatterpolar", "Waterfall")
+
+# Valores iniciales de los controles del tablero
+PERIODOS_INICIALES = 90
+SECTORES_INICIALES = ("Químico", "Plásticos", "Empaque")
+ANIOS_INICIALES = 1
+
+_primer_rerun = threading.Event()
+
+
+@lru_cache(maxsize=None)
+def asset_bytes(path, width=None):
+    """
+    Contenido de una imagen estática, leído una vez por proceso. Con
+    ``width`` se reduce a ese ancho (PNG) para que ``st.image`` no la
+    redimensione en cada rerun.
+    """
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if width is None:
+        return data
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    if image.width <= width:
+        return data
+    image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+@lru_cache(maxsize=None)
+def stylesheet(name=HOJA_ESTILOS, directory=ASSETS_DIR):
+    """Bloque ``<style>`` con la hoja ``name``, listo para ``st.markdown``."""
+    with open(os.path.join(directory, name), encoding="utf-8") as fh:
+        return f"<style>\n{fh.read()}</style>"
+
+
+def record(stage, seconds):
+    from profiling import REGISTRY
+
+    REGISTRY.observe(f"Arranque: {stage}", seconds)
+
+
+def mark_first_rerun():
+    """Registra (una vez por proceso) el tiempo hasta el final del primer rerun."""
+    if not _primer_rerun.is_set():
+        _primer_rerun.set()
+        record("primer rerun", time.perf_counter() - PROCESO_INICIO)
+
+
+def import_modules():
+    """Importa los módulos del tablero y Plotly; devuelve los segundos que tomó."""
+    start = time.perf_counter()
+    quiet_streamlit_logs()
+    for name in MODULOS_TABLERO:
+        importlib.import_module(name)
+    go = importlib.import_module("plotly.graph_objects")
+    for trace in TRAZAS_TABLERO:
+        getattr(go, trace)()
+    elapsed = time.perf_counter() - start
+    record("importaciones", elapsed)
+    return elapsed
+
+
+def _sin_runtime(record):
+    return "No runtime found" not in record.getMessage()
+
+
+def quiet_streamlit_logs(bare=False):
+    """
+    Silencia las advertencias de Streamlit que no aplican fuera de una sesión.
+
+    Antes de que exista el runtime, Streamlit advierte al crear cada caché; se
+    usa un filtro porque ``streamlit run`` restablece el nivel de sus loggers.
+    Con ``bare=True`` (scripts sin servidor: lotes, benchmarks, ``AppTest``)
+    el nivel de Streamlit baja además a "error".
+    """
+    import logging
+
+    for name in ("cache_data_api", "cache_resource_api"):
+        logger = logging.getLogger(f"streamlit.runtime.caching.{name}")
+        if _sin_runtime not in logger.filters:
+            logger.addFilter(_sin_runtime)
+    if bare:
+        import streamlit.logger
+
+        streamlit.logger.set_log_level("error")
+
+
+def prewarm(seed=None, periods=PERIODOS_INICIALES, sectors=SECTORES_INICIALES, years=ANIOS_INICIALES):
+    """
+    Calcula los conjuntos de datos que pide la primera vista del tablero
+    para dejarlos en caché. ``st.cache_data`` usa los argumentos tal como se
+    pasan (posicionales o por nombre), así que cada llamada repite la forma
+    exacta en que la hace ``app1.py``.
+    """
+    start = time.perf_counter()
+    from data_layer import (get_market_store, load_benchmark, load_beta_series,
+                            load_buyback_scenarios, load_financial_table, load_financials,
+                            load_indicators, load_price_data, load_roic_series, load_rollups,
+                            load_sector_correlation, load_sector_trends)
+    from financials import CONSOLIDADO
+    from market_data import STORE_DIR
+    from price_engine import SEMILLA_DEFAULT
+
+    seed = SEMILLA_DEFAULT if seed is None else seed
+    asset_bytes(LOGO, ANCHO_LOGO)
+    stylesheet()
+    fecha_fin = datetime.today().date()
+    get_market_store(STORE_DIR)
+    load_price_data(periods, seed, end=fecha_fin)
+    indicadores = load_indicators(periods, seed, end=fecha_fin)
+    load_rollups(periods, seed, end=fecha_fin)
+    load_benchmark(periods, seed, end=fecha_fin)
+    load_beta_series(periods, seed, end=fecha_fin)
+    load_roic_series(seed)
+    load_buyback_scenarios(indicadores.buyback_impact(0.0))
+    load_sector_trends(tuple(sectors), seed)
+    load_sector_correlation(tuple(sectors), seed)
+    load_financials(seed, years=years)
+    load_financial_table(seed, years=years, segment=CONSOLIDADO)
+    elapsed = time.perf_counter() - start
+    record("precalentamiento", elapsed)
+    return elapsed
+
+
+def _warm():
+    try:
+        prewarm()
+    except Exception as exc:  # el tablero calcula lo que falte en el primer rerun
+        print(f"Precalentamiento incompleto: {exc!r}", file=sys.stderr)
+
+
+def start_prewarm():
+    """
+    Precalienta los datos en un hilo de fondo para no retrasar el arranque
+    del servidor. Los módulos se importan antes en el hilo principal: algunos
+    (Plotly) consultan ``sys.modules`` y fallan si ven un módulo a medio importar.
+    """
+    import_modules()
+    thread = threading.Thread(target=_warm, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def measure():
+    """Importación, precalentamiento y un rerun completo, medidos en este proceso."""
+    quiet_streamlit_logs(bare=True)
+    from streamlit.testing.v1 import AppTest
+
+    importaciones = import_modules()
+    precalentamiento = prewarm()
+    start = time.perf_counter()
+    AppTest.from_file(APP, default_timeout=300).run()
+    rerun = time.perf_counter() - start
+    print(f"Importaciones:     {importaciones * 1e3:8.0f} ms")
+    print(f"Precalentamiento:  {precalentamiento * 1e3:8.0f} ms")
+    print(f"Primer rerun:      {rerun * 1e3:8.0f} ms")
+    print(f"Total:             {(time.perf_counter() - PROCESO_INICIO) * 1e3:8.0f} ms")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if "--measure" in argv:
+        measure()
+        return
+    from streamlit.web import cli
+
+    if PRECALENTAR:
+        start_prewarm()
+    cli.main(["run", APP, *argv], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    # El tablero importa ``startup``: comparte este módulo (y su marca de inicio)
+    sys.modules.setdefault("startup", sys.modules[__name__])
+    main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Vista paginada de tablas con estilo.
+
+``Styler.background_gradient``/``highlight_max`` recorren la tabla celda
+por celda y generan HTML/CSS para todas las filas en cada rerun.
+``StyledTable`` calcula una sola vez los estilos de toda la tabla como un
+arreglo (el gradiente con una sola llamada al mapa de colores sobre la
+columna completa) y se guarda en caché junto con los datos; en cada rerun
+solo se arma el ``Styler`` de la página visible, así que el costo y lo que
+se envía al navegador dependen del tamaño de página, no del de la tabla.
+
+La descarga completa se escribe por bloques de filas (CSV) o por grupos de
+filas (Parquet) en un archivo temporal, sin copias intermedias del texto
+completo; el resultado se devuelve como bytes porque ``st.download_button``
+lo lee completo en memoria de todas formas. Parquet requiere ``pyarrow``,
+que no es dependencia del tablero: sin él solo se ofrece CSV.
+"""
+
+import importlib.util
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+FILAS_POR_PAGINA = 20
+FILAS_POR_BLOQUE = 5_000
+# Mismo umbral de luminancia que usa ``Styler.background_gradient`` para el texto
+UMBRAL_TEXTO = 0.408
+COLOR_MAXIMO = "#27ae60"
+COLOR_MINIMO = "#e74c3c"
+FORMATOS_DESCARGA = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def gradient_styles(values, cmap="RdYlGn"):
+    """CSS de fondo y color de texto para cada valor; NaN queda sin estilo."""
+    from matplotlib import colormaps
+
+    values = np.asarray(values, dtype=np.float64)
+    styles = np.full(values.shape, "", dtype=object)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return styles
+    low, high = values[valid].min(), values[valid].max()
+    scaled = (values[valid] - low) / (high - low) if high > low else np.full(valid.sum(), 0.5)
+    rgba = colormaps[cmap](scaled)
+    # Luminancia relativa (sRGB) para elegir texto claro u oscuro
+    rgb = rgba[:, :3]
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    dark = linear @ np.array([0.2126, 0.7152, 0.0722]) < UMBRAL_TEXTO
+    packed = np.round(rgb * 255).astype(np.int64) @ np.array([1 << 16, 1 << 8, 1])
+    hex_colors = np.char.mod("#%06x", packed)
+    text = np.where(dark, "#f1f1f1", "#000000")
+    styles[valid] = np.char.add(np.char.add(np.char.add("background-color: ", hex_colors),
+                                            "; color: "), text)
+    return styles
+
+
+def extreme_styles(values, max_color=COLOR_MAXIMO, min_color=COLOR_MINIMO):
+    """Resalta el máximo y el mínimo (todas sus ocurrencias)."""
+    values = np.asarray(values, dtype=np.float64)
+    styles = np.full(values.shape, "", dtype=object)
+    if np.isnan(values).all():
+        return styles
+    styles[values == np.nanmin(values)] = f"background-color: {min_color}"
+    styles[values == np.nanmax(values)] = f"background-color: {max_color}"
+    return styles
+
+
+@dataclass
+class StyledTable:
+    """Datos y estilos por celda (arreglo de cadenas CSS con la forma de ``frame``)."""
+    frame: object
+    styles: np.ndarray
+    number_format: str = "{:.1f}"
+
+    @classmethod
+    def build(cls, frame, gradient=(), highlight=(), cmap="RdYlGn", number_format="{:.1f}"):
+        styles = np.full(frame.shape, "", dtype=object)
+        for column in gradient:
+            styles[:, frame.columns.get_loc(column)] = gradient_styles(frame[column], cmap)
+        for column in highlight:
+            styles[:, frame.columns.get_loc(column)] = extreme_styles(frame[column])
+        return cls(frame=frame, styles=styles, number_format=number_format)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def n_pages(self, page_size=FILAS_POR_PAGINA):
+        return max(1, -(-len(self.frame) // page_size))
+
+    def page_bounds(self, page, page_size=FILAS_POR_PAGINA):
+        """Filas ``[inicio, fin)`` de la página ``page`` (desde 1, acotada al rango)."""
+        page = min(max(int(page), 1), self.n_pages(page_size))
+        start = (page - 1) * page_size
+        return start, min(start + page_size, len(self.frame))
+
+    def page(self, page, page_size=FILAS_POR_PAGINA):
+        """``Styler`` solo con las filas de la página, usando los estilos precalculados."""
+        start, stop = self.page_bounds(page, page_size)
+        styles = self.styles[start:stop]
+        return (self.frame.iloc[start:stop].style
+                .format(self.number_format, na_rep="—")
+                .apply(lambda _: styles, axis=None))
+
+
+def iter_csv_chunks(frame, chunk_rows=FILAS_POR_BLOQUE):
+    """Texto CSV de ``frame`` por bloques de ``chunk_rows`` filas (encabezado en el primero)."""
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(header=start == 0)
+
+
+@lru_cache(maxsize=None)
+def download_formats():
+    """Formatos de descarga disponibles (Parquet solo si ``pyarrow`` está instalado)."""
+    return {fmt: mime for fmt, mime in FORMATOS_DESCARGA.items()
+            if fmt != "parquet" or importlib.util.find_spec("pyarrow") is not None}
+
+
+def export_table(frame, fmt="csv", chunk_rows=FILAS_POR_BLOQUE):
+    """Contenido de ``frame`` completo en formato ``fmt``, escrito por bloques en un archivo temporal."""
+    if fmt not in FORMATOS_DESCARGA:
+        raise ValueError(f"Formato de descarga desconocido: {fmt!r}")
+    with tempfile.TemporaryFile() as fh:
+        if fmt == "csv":
+            for chunk in iter_csv_chunks(frame, chunk_rows):
+                fh.write(chunk.encode("utf-8"))
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.Schema.from_pandas(frame.iloc[:0])
+            with pq.ParquetWriter(fh, schema) as writer:
+                for start in range(0, max(len(frame), 1), chunk_rows):
+                    writer.write_table(pa.Table.from_pandas(frame.iloc[start:start + chunk_rows],
+                                                            schema=schema))
+        fh.seek(0)
+        return fh.read()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import numpy as np
+import pytest
+
+from disk_cache import DiskCache, content_key
+
+TAMANO_VALOR = len(pickle.dumps(b"x" * 1_000, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(tmp_path, max_bytes=10 * TAMANO_VALOR)
+
+
+def test_desaloja_las_entradas_menos_usadas(cache):
+    for i in range(10):
+        cache.set(f"k{i}", b"x" * 1_000)
+    # Se lee k0: pasa a ser la más reciente
+    assert cache.get("k0") == b"x" * 1_000
+    for i in range(10, 13):
+        cache.set(f"k{i}", b"x" * 1_000)
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes
+    assert stats["entries"] == 10
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None and cache.get("k3") is None
+    assert cache.get("k12") is not None
+
+
+def test_tamano_acotado_con_muchas_escrituras(cache):
+    for i in range(1_000):
+        cache.set(f"k{i}", b"x" * 1_000)
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_valor_mayor_al_limite_no_se_guarda(cache):
+    cache.set("grande", b"x" * (11 * TAMANO_VALOR))
+    assert cache.get("grande") is None
+
+
+def test_memoize_por_contenido(cache):
+    calls = []
+
+    @cache.memoize("suma")
+    def suma(values, scale=1.0):
+        calls.append(1)
+        return float(np.sum(values) * scale)
+
+    assert suma(np.arange(5.0)) == 10.0
+    # Mismo contenido (otro arreglo) y el valor por defecto explícito: misma llave
+    assert suma(np.arange(5.0).copy(), scale=1.0) == 10.0
+    assert len(calls) == 1
+    assert suma(np.arange(5.0), scale=2.0) == 20.0
+    assert len(calls) == 2
+
+
+def test_llave_distingue_tipo_y_contenido():
+    assert content_key("n", np.arange(3)) == content_key("n", np.arange(3))
+    assert content_key("n", np.arange(3)) != content_key("n", np.arange(3.0))
+    assert content_key("n", (1, 2)) != content_key("n", (2, 1))
+
+
+def test_figuras_se_escriben_en_segundo_plano(tmp_path):
+    go = pytest.importorskip("plotly.graph_objects")
+    from figures import FigureCache
+
+    store = DiskCache(tmp_path)
+    fig = go.Figure(go.Scatter(x=[1, 2, 3], y=[3, 1, 2]))
+    writer = FigureCache(store=store)
+    writer.put(("prueba",), fig)
+    writer.flush()
+    restored = FigureCache(store=store).get(("prueba",))
+    assert restored is not None
+    assert list(restored.data[0].y) == [3, 1, 2]
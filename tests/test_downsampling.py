@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from downsampling import downsample_indices, lttb
+
+
+@pytest.fixture
+def serie():
+    x = np.datetime64("2020-01-01") + np.arange(5_000)
+    y = np.cumsum(np.random.default_rng(5).normal(0, 1, x.size))
+    return x, y
+
+
+@pytest.mark.parametrize("n_out", [3, 10, 500])
+def test_lttb_conserva_extremos_de_la_serie(serie, n_out):
+    x, y = serie
+    idx = lttb(x, y, n_out)
+    assert idx.size == n_out
+    assert idx[0] == 0 and idx[-1] == x.size - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_serie_corta_sin_cambios(serie):
+    x, y = serie
+    np.testing.assert_array_equal(lttb(x[:50], y[:50], 100), np.arange(50))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_incluye_maximo_y_minimo(serie, method):
+    x, y = serie
+    idx = downsample_indices(x, y, max_points=200, method=method)
+    assert {0, x.size - 1, int(y.argmax()), int(y.argmin())} <= set(idx.tolist())
+    assert idx.size <= 204
+
+
+def test_lttb_con_nan_al_inicio(serie):
+    x, y = serie
+    y = y.copy()
+    y[:30] = np.nan
+    idx = lttb(x, y, 100)
+    assert idx[0] == 0 and idx[-1] == x.size - 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from financials import (CAPITAL_TRABAJO, TASA_DEPRECIACION, operating_statements,
+                        synthetic_financials)
+from metrics import COLUMNA_CAPITAL_INVERTIDO, COLUMNA_EBIT, roic_series
+
+
+@pytest.fixture
+def historia():
+    return synthetic_financials(10, seed=[7, 2], end="2025-06-30")
+
+
+def test_tabla_es_el_final_de_la_historia(historia):
+    tabla = historia.last(4)
+    assert list(tabla.periods.astype(str)) == ["2024Q1", "2024Q2", "2024Q3", "2024Q4"]
+    np.testing.assert_array_equal(tabla.values, historia.values[-4:])
+
+
+def test_capital_invertido_igual_a_la_recurrencia(historia):
+    capex = historia.item("Capex")
+    activos, esperado, depreciacion = capex[0] / TASA_DEPRECIACION, [], []
+    for monto in capex:
+        depreciacion.append(TASA_DEPRECIACION * activos)
+        activos = activos * (1 - TASA_DEPRECIACION) + monto
+        esperado.append(activos)
+    operativo = operating_statements(historia)
+    np.testing.assert_allclose(
+        operativo[COLUMNA_CAPITAL_INVERTIDO] - CAPITAL_TRABAJO * 4 * historia.item("Ingresos"), esperado)
+    np.testing.assert_allclose(operativo[COLUMNA_EBIT], historia.item("EBITDA") - np.array(depreciacion))
+
+
+def test_roic_usa_los_estados_de_la_tabla(historia):
+    roic = roic_series(operating_statements(historia))
+    assert list(roic.index) == list(historia.periods)
+    assert np.isnan(roic.iloc[:3]).all() and np.isfinite(roic.iloc[3:]).all()
+    # Un EBITDA mayor en el último trimestre sube el ROIC del último período
+    alterada = synthetic_financials(10, seed=[7, 2], end="2025-06-30")
+    alterada.values[-1, :, alterada.items.index("EBITDA")] += 100
+    assert roic_series(operating_statements(alterada)).iloc[-1] > roic.iloc[-1]
+
+
+def test_requiere_estados_trimestrales(historia):
+    with pytest.raises(ValueError):
+        operating_statements(historia.annual())
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from live_feed import QuoteRing
+
+
+def _ticks(n, seed=0):
+    dates = np.datetime64("2024-01-02T09:30:00", "ns") + np.arange(n) * np.timedelta64(1, "s")
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n)))
+    return dates, prices
+
+
+def test_buffer_conserva_los_ultimos_ticks_en_orden():
+    dates, prices = _ticks(23)
+    ring = QuoteRing(capacity=8, impact_window=3)
+    ring.extend(dates, prices)
+    snapshot = ring.snapshot()
+    assert len(ring) == 8
+    assert snapshot.version == 23
+    np.testing.assert_array_equal(snapshot.dates, dates[-8:])
+    np.testing.assert_array_equal(snapshot.prices, prices[-8:])
+    np.testing.assert_allclose(snapshot.returns, prices[-8:] / prices[-9:-1] - 1)
+    assert ring.last_price == prices[-1]
+    # Los estadísticos de la sesión incluyen los ticks ya sobrescritos
+    assert ring.first_price == prices[0]
+    assert ring.max_price == prices.max() and ring.min_price == prices.min()
+
+
+@pytest.mark.parametrize("capacity", [5, 8, 50])
+def test_media_movil_del_impacto_tras_dar_la_vuelta(capacity):
+    window = 5
+    dates, prices = _ticks(137, seed=1)
+    ring = QuoteRing(capacity=capacity, impact_window=window)
+    ring.extend(dates, prices)
+    returns = prices[1:] / prices[:-1] - 1
+    expected = np.convolve(returns, np.ones(window), "valid") / window * 100
+    np.testing.assert_allclose(ring.snapshot().impact_base, expected[-capacity:], rtol=1e-9)
+
+
+def test_buffer_parcial_sin_ventana_completa():
+    dates, prices = _ticks(3)
+    ring = QuoteRing(capacity=8, impact_window=5)
+    ring.extend(dates, prices)
+    snapshot = ring.snapshot()
+    assert len(ring) == 3
+    assert np.isnan(snapshot.returns[0])
+    assert np.isnan(snapshot.impact_base).all()
+
+
+@pytest.mark.parametrize("capacity, window", [(1, 1), (4, 5), (8, 0)])
+def test_configuracion_invalida(capacity, window):
+    with pytest.raises(ValueError):
+        QuoteRing(capacity=capacity, impact_window=window)
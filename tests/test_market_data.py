@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import market_data
+from market_data import MarketDataStore, ingest_csv
+from price_engine import DATE_COLUMN, PRICE_COLUMN
+
+
+@pytest.fixture
+def precios():
+    dates = pd.date_range("2024-01-01", periods=60, freq="D")
+    rng = np.random.default_rng(2)
+    return pd.DataFrame({"Date": dates, "Close": np.round(100 + rng.normal(0, 1, dates.size).cumsum(), 4),
+                         "Volume": rng.integers(100, 1_000, dates.size).astype(np.float64)})
+
+
+def test_csv_desordenado_se_ordena_por_fecha(tmp_path, precios):
+    path = tmp_path / "alpek.csv"
+    precios.sample(frac=1, random_state=0).to_csv(path, index=False)
+    store_dir = tmp_path / "store"
+    # Bloques pequeños: el desorden también cruza límites de bloque
+    assert ingest_csv(path, store_dir, ticker="ALPEKA", chunk_rows=7) == ["ALPEKA"]
+
+    frame = MarketDataStore(store_dir).slice("ALPEKA")
+    np.testing.assert_array_equal(frame[DATE_COLUMN].to_numpy(), precios["Date"].to_numpy())
+    np.testing.assert_array_equal(frame["Close"].to_numpy(), precios["Close"].to_numpy())
+    np.testing.assert_array_equal(frame["Volume"].to_numpy(), precios["Volume"].to_numpy())
+
+
+def test_csv_formato_largo_varias_emisoras(tmp_path, precios):
+    largo = pd.concat([precios.assign(Ticker="ALPEKA"),
+                       precios.assign(Ticker="MEXBOL", Close=precios["Close"] * 10)])
+    path = tmp_path / "largo.csv"
+    largo.to_csv(path, index=False)
+    store_dir = tmp_path / "store"
+    assert sorted(ingest_csv(path, store_dir, ticker_column="Ticker", chunk_rows=25)) == ["ALPEKA",
+                                                                                        "MEXBOL"]
+
+    store = MarketDataStore(store_dir)
+    assert store.tickers == ["ALPEKA", "MEXBOL"]
+    assert store.rows("ALPEKA") == store.rows("MEXBOL") == len(precios)
+    np.testing.assert_allclose(store.slice("MEXBOL")["Close"], precios["Close"] * 10)
+
+
+def test_ticker_y_ticker_column_son_excluyentes(tmp_path):
+    with pytest.raises(ValueError):
+        ingest_csv(tmp_path / "x.csv", tmp_path, ticker="A", ticker_column="Ticker")
+
+
+def test_no_reingesta_si_el_archivo_no_cambia(tmp_path, precios, monkeypatch):
+    path = tmp_path / "alpek.csv"
+    precios.to_csv(path, index=False)
+    store_dir = tmp_path / "store"
+    ingest_csv(path, store_dir, ticker="ALPEKA")
+
+    def no_leer(*args, **kwargs):
+        raise AssertionError("el CSV no debía volver a leerse")
+
+    monkeypatch.setattr(market_data.pd, "read_csv", no_leer)
+    assert ingest_csv(path, store_dir, ticker="ALPEKA") == ["ALPEKA"]
+    with pytest.raises(AssertionError):
+        ingest_csv(path, store_dir, ticker="ALPEKA", force=True)
+
+
+def test_rebanadas_y_price_frame_inclusivos(tmp_path, precios):
+    path = tmp_path / "alpek.csv"
+    precios.to_csv(path, index=False)
+    ingest_csv(path, tmp_path, ticker="ALPEKA")
+    store = MarketDataStore(tmp_path)
+
+    assert store.date_range("ALPEKA") == (precios["Date"].iloc[0], precios["Date"].iloc[-1])
+    rebanada = store.slice("ALPEKA", "2024-01-10", "2024-01-20", columns=["Close"])
+    assert list(rebanada.columns) == [DATE_COLUMN, "Close"]
+    assert rebanada[DATE_COLUMN].iloc[0] == pd.Timestamp("2024-01-10")
+    assert rebanada[DATE_COLUMN].iloc[-1] == pd.Timestamp("2024-01-20")
+    assert len(store.slice("ALPEKA", "2023-01-01", "2023-12-31")) == 0
+
+    ultimos = store.price_frame("ALPEKA", 30)
+    assert list(ultimos.columns) == [DATE_COLUMN, PRICE_COLUMN]
+    assert len(ultimos) == 30
+    assert ultimos[DATE_COLUMN].iloc[-1] == precios["Date"].iloc[-1]
+    assert len(store.price_frame("ALPEKA", 500)) == len(precios)
+    assert len(store.price_frame("ALPEKA", 10, end="2024-01-05")) == 5
+
+
+def test_prices_at_usa_el_ultimo_precio_conocido(tmp_path, precios):
+    semanal = precios.iloc[::7]
+    path = tmp_path / "alpek.csv"
+    semanal.to_csv(path, index=False)
+    ingest_csv(path, tmp_path, ticker="ALPEKA")
+    store = MarketDataStore(tmp_path)
+
+    fechas = pd.to_datetime(["2023-12-31", "2024-01-01", "2024-01-03", "2024-01-08", "2024-03-31"])
+    out = store.prices_at("ALPEKA", fechas)
+    assert np.isnan(out[0])
+    np.testing.assert_array_equal(out[1:], semanal["Close"].to_numpy()[[0, 0, 1, -1]])
+
+
+def test_emisora_inexistente(tmp_path):
+    with pytest.raises(KeyError):
+        MarketDataStore(tmp_path).slice("NOEXISTE")
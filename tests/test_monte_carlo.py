@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from monte_carlo import MAX_ELEMENTOS_BLOQUE, confidence_bands, simulate_log_returns
+
+N_PASOS = 1_000
+# Varios bloques para que el reparto entre procesos importe
+N_TRAYECTORIAS = 3 * MAX_ELEMENTOS_BLOQUE // N_PASOS + 17
+
+
+def _simulate(workers):
+    return simulate_log_returns(0.0002, 0.01, N_PASOS, n_paths=N_TRAYECTORIAS, seed=7,
+                                workers=workers)
+
+
+def _assert_same(a, b):
+    eval_a, q_a, mean_a = a
+    eval_b, q_b, mean_b = b
+    np.testing.assert_array_equal(eval_a, eval_b)
+    assert q_a.keys() == q_b.keys()
+    for q in q_a:
+        np.testing.assert_array_equal(q_a[q], q_b[q])
+    np.testing.assert_array_equal(mean_a, mean_b)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_mismo_resultado_con_cualquier_numero_de_procesos(workers):
+    _assert_same(_simulate(1), _simulate(workers))
+
+
+def test_pool_reutilizado_da_el_mismo_resultado():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        _assert_same(_simulate(1), _simulate(pool))
+        _assert_same(_simulate(1), _simulate(pool))
+
+
+def test_bandas_ordenadas_y_ancladas():
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 250)))
+    bands = confidence_bands(prices, n_paths=5_000, seed=1, workers=1)
+    lower, upper = bands.band(5, 95)
+    assert lower.shape == upper.shape == prices.shape
+    assert np.all(lower <= bands.percentiles[50]) and np.all(bands.percentiles[50] <= upper)
+    # El primer día no tiene incertidumbre: todas las trayectorias parten del precio observado
+    assert lower[0] == pytest.approx(prices[0]) and upper[0] == pytest.approx(prices[0])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from rollups import RollupSet
+
+PERIODOS_PANDAS = {"D": "D", "W": "W-SUN", "M": "M"}
+
+
+@pytest.fixture
+def diario():
+    dates = pd.bdate_range("2023-01-02", periods=400)
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, dates.size)))
+    open_ = close * (1 + rng.normal(0, 0.002, dates.size))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, dates.size))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, dates.size))
+    volume = rng.integers(1_000, 10_000, dates.size).astype(np.float64)
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close,
+                         "Volume": volume}, index=dates)
+
+
+@pytest.mark.parametrize("freq", ["D", "W", "M"])
+def test_ohlc_igual_a_pandas(diario, freq):
+    rollups = RollupSet(diario.index.to_numpy(), diario["Close"].to_numpy(),
+                        open_=diario["Open"].to_numpy(), high=diario["High"].to_numpy(),
+                        low=diario["Low"].to_numpy(), volume=diario["Volume"].to_numpy())
+    bars = rollups.get(freq)
+    periods = diario.index.to_period(PERIODOS_PANDAS[freq])
+    expected = diario.groupby(periods).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+    last_day = diario.index.to_series().groupby(periods).max()
+
+    np.testing.assert_array_equal(bars.open, expected["Open"].to_numpy())
+    np.testing.assert_array_equal(bars.high, expected["High"].to_numpy())
+    np.testing.assert_array_equal(bars.low, expected["Low"].to_numpy())
+    np.testing.assert_array_equal(bars.close, expected["Close"].to_numpy())
+    np.testing.assert_allclose(bars.volume, expected["Volume"].to_numpy())
+    np.testing.assert_array_equal(bars.dates, last_day.to_numpy())
+    np.testing.assert_array_equal(diario.index[bars.last_idx], last_day.to_numpy())
+
+
+def test_solo_cierre_usa_cierre_anterior_como_apertura(diario):
+    close = diario["Close"].to_numpy()
+    daily = RollupSet(diario.index.to_numpy(), close).get("D")
+    np.testing.assert_array_equal(daily.open[1:], close[:-1])
+    np.testing.assert_array_equal(daily.high, np.maximum(daily.open, close))
+    np.testing.assert_array_equal(daily.low, np.minimum(daily.open, close))